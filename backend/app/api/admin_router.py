@@ -0,0 +1,34 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.services.profiling import PROFILE_DIR, is_admin, list_profiles, profile_path
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/profiles")
+def recent_profiles(limit: int = 50):
+    """
+    최근 요청 프로파일 목록 (X-Profile 헤더 또는 PROFILE_SAMPLE_RATE 로 수집된 것)
+    """
+    items = list_profiles(limit)
+    return {"count": len(items), "dir": PROFILE_DIR, "items": items}
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    """
+    프로파일 파일 다운로드 (.prof: pstats/snakeviz, .txt: 상위 N 요약, .html: pyinstrument)
+    """
+    path = profile_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=name)
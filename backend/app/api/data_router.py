@@ -1,20 +1,16 @@
 from fastapi import APIRouter
-from app.services.fss_service import fetch_fss_deposit_products
-from app.db.db_conn import save_financial_products
+from app.api.jobs_router import submit
+from app.services.serialization import FastJSONResponse
 
 router = APIRouter()
 
 @router.get("/refresh/fss")
 def refresh_fss_products():
     """
-    FSS 금융감독원 API를 통해 예적금 상품 데이터 수집 및 DB 갱신
+    FSS 금융감독원 API를 통해 예적금 상품 데이터 수집 및 DB 갱신.
+    요청 안에서 돌리지 않고 백그라운드 작업으로 넘긴다 (POST /jobs/refresh/fss 와 같고, 진행 중이면 그 작업).
     """
-    data = fetch_fss_deposit_products()
-    if not data:
-        return {"status": "error", "message": "No data fetched from FSS API"}
-    
-    save_financial_products(data)
-    return {"status": "success", "updated_count": len(data)}
+    return submit("refresh.fss", dedup_key="refresh.fss")
 
 @router.get("/products")
 def get_products():
@@ -24,4 +20,5 @@ def get_products():
     from app.db.db_conn import engine, financial_products
     with engine.connect() as conn:
         rows = conn.execute(financial_products.select()).fetchall()
-    return {"count": len(rows), "data": [dict(r._mapping) for r in rows]}
+    # 행 dict 는 그대로 직렬화 가능하므로 jsonable_encoder 를 거치지 않고 바로 응답
+    return FastJSONResponse({"count": len(rows), "data": [dict(r._mapping) for r in rows]})
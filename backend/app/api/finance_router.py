@@ -1,9 +1,27 @@
-from typing import Optional
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, Field, validator
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError, validator
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.finance_recommendation import AssetFormData, build_finance_switching
+from app.db.db_conn import get_async_db
+from app.services.finance_batch import FINANCE_BATCH_MAX, BatchItem, resolve_batch_catalogs, stream_batch
+from app.services import finance_search
+from app.services.finance_catalog import CATALOG_STORE, LOAN_FAMILIES, TERM_FAMILIES
+from app.services.finance_recommendation import AssetFormData, required_families, resolve_catalogs, score_switching
+from app.services.finance_sweep import axis_values, sweep_saving
+from app.services.rate_history import HISTORY_DEFAULT_POINTS, HISTORY_MAX_POINTS, product_history
+from app.services.response_cache import RESPONSE_CACHE, cached_response, request_key
+from app.services.metrics import SEARCH_LATENCY
+from app.services.serialization import FastJSONResponse, trusted_body, trusted_response
+
+FINANCE_SWEEP_MAX_POINTS = int(os.getenv("FINANCE_SWEEP_MAX_POINTS", "20000"))
 
 
 class LoanDraftSchema(BaseModel):
@@ -90,18 +108,289 @@ class SavingSwitchResponse(BaseModel):
     summary: SavingSummary
 
 
+class DepositRecommendation(BaseModel):
+    product_name: str
+    company_name: Optional[str] = None
+    fin_prdt_cd: Optional[str] = None
+    rate: Optional[float] = None
+    base_rate: Optional[float] = None
+    save_term: Optional[int] = None
+    interest: Optional[float] = None
+    description: Optional[str] = None
+    join_method: Optional[str] = None
+    join_member: Optional[str] = None
+    max_limit: Optional[float] = None
+    reasons: list[str] = Field(default_factory=list)
+
+
+class DepositSummary(BaseModel):
+    recommendation_count: int
+    expected_interest: float
+    decision: str
+
+
+class DepositPlacementResponse(BaseModel):
+    amount: float
+    target_term: int
+    best: Optional[DepositRecommendation] = None
+    alternatives: list[DepositRecommendation] = Field(default_factory=list)
+    summary: DepositSummary
+
+
+class LoanRecommendation(BaseModel):
+    product_name: str
+    company_name: Optional[str] = None
+    fin_prdt_cd: Optional[str] = None
+    rate: Optional[float] = None
+    rate_min: Optional[float] = None
+    rate_max: Optional[float] = None
+    rate_type: Optional[str] = None
+    repay_type: Optional[str] = None
+    interest: Optional[float] = None
+    interest_saving: Optional[float] = None
+    reasons: list[str] = Field(default_factory=list)
+
+
+class LoanRefinanceResponse(BaseModel):
+    lender: Optional[str] = None
+    purpose: Optional[str] = None
+    family: str
+    family_label: str
+    amount: float
+    annual_rate: float
+    remaining_months: int
+    current_interest: float
+    best: Optional[LoanRecommendation] = None
+    alternatives: list[LoanRecommendation] = Field(default_factory=list)
+    decision: str
+
+
 class FinanceSwitchResponse(BaseModel):
     saving: Optional[SavingSwitchResponse] = None
+    deposit: Optional[DepositPlacementResponse] = None
+    loans: list[LoanRefinanceResponse] = Field(default_factory=list)
+
+
+class SweepAxis(BaseModel):
+    """start..stop 양끝 포함 steps 개, 또는 values 직접 지정. 생략한 값은 assets.savings 값"""
+    start: Optional[float] = Field(default=None, ge=0)
+    stop: Optional[float] = Field(default=None, ge=0)
+    steps: int = Field(default=1, ge=1, le=500)
+    values: Optional[list[float]] = None
+
+
+class SweepRequest(BaseModel):
+    assets: AssetRequest = Field(default_factory=AssetRequest)
+    principal: Optional[SweepAxis] = None
+    monthsRemaining: Optional[SweepAxis] = None
+    penalty: Optional[SweepAxis] = None
+
+
+class SweepProduct(BaseModel):
+    fin_prdt_cd: str
+    company_name: Optional[str] = None
+    product_name: Optional[str] = None
+    rate: float
+    save_term: int
+
+
+class SweepResponse(BaseModel):
+    axes: dict[str, list[float]]
+    shape: list[int]
+    net_gain: list[float]
+    match_score: list[int]
+    best: list[int]
+    switch: list[bool]
+    products: list[SweepProduct]
+    catalog_version: str
+    elapsed_ms: float
 
 
 router = APIRouter()
 
 
 @router.post("/recommendations", response_model=FinanceSwitchResponse)
-async def recommend_finance_products(payload: AssetRequest) -> FinanceSwitchResponse:
+async def recommend_finance_products(payload: AssetRequest, request: Request) -> Response:
+    """적금/예금/대출 추천. 같은 입력 + 같은 카탈로그 버전이면 캐시된 본문(또는 304)을 돌려준다."""
     try:
         data: AssetFormData = payload.dict()
-        recos = await build_finance_switching(data)
-        return FinanceSwitchResponse(**recos)
+        catalogs = await resolve_catalogs(required_families(data), CATALOG_STORE)
+        # 일부 상품군 조회에 실패한 부분 결과는 캐시하지 않는다
+        version = None
+        if all(c is not None for c in catalogs.values()):
+            version = ",".join(f"{family}:{c.version}" for family, c in sorted(catalogs.items()))
+        key = request_key("finance", payload, version) if version else None
+        entry = RESPONSE_CACHE.get(key) if key else None
+        hit = entry is not None
+        if entry is None:
+            recos = score_switching(data, catalogs)
+            body = trusted_body(FinanceSwitchResponse, recos)
+            if key is None:
+                return Response(content=body, media_type="application/json")
+            entry = RESPONSE_CACHE.put(key, body)
+        return cached_response(request, entry, "finance", hit)
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+def _sweep_axis(axis: Optional[SweepAxis], current: float) -> list[float]:
+    if axis is None:
+        return [current]
+    start = current if axis.start is None else axis.start
+    stop = start if axis.stop is None else axis.stop
+    values = axis_values(start, stop, axis.steps, axis.values)
+    if any(v < 0 for v in values):
+        raise HTTPException(status_code=400, detail="Sweep values must be non-negative")
+    return values
+
+
+@router.post("/recommendations/sweep", response_model=SweepResponse)
+async def sweep_finance_products(payload: SweepRequest) -> Response:
+    """원금 × 잔여개월 × 패널티 격자 전체의 적금 갈아타기 순이익/최적 상품 (슬라이더용).
+
+    결과 배열은 shape 순서(principal, monthsRemaining, penalty)의 row-major 평탄화이고
+    best 는 products 인덱스(-1 = 가입 가능한 상품 없음)다.
+    """
+    savings = payload.assets.savings
+    principals = _sweep_axis(payload.principal, savings.principal)
+    months = sorted({int(round(v)) for v in _sweep_axis(payload.monthsRemaining, savings.monthsRemaining)})
+    penalties = _sweep_axis(payload.penalty, savings.penalty)
+    points = len(principals) * len(months) * len(penalties)
+    if points > FINANCE_SWEEP_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Sweep grid too large ({points} > {FINANCE_SWEEP_MAX_POINTS} points)")
+    try:
+        catalog = await CATALOG_STORE.get("saving")
+        result = await asyncio.to_thread(sweep_saving, payload.assets.dict(), catalog, principals, months, penalties)
+        return trusted_response(SweepResponse, result)
+    except Exception as exc:  # pragma: no cover
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+def _parse_batch_body(body: bytes, content_type: str) -> List[BatchItem]:
+    """JSON 배열 또는 NDJSON(한 줄에 AssetRequest 하나) → 검증된 항목 목록.
+
+    개별 항목의 검증 오류는 해당 위치의 error 로 남기고 배치는 계속 처리한다.
+    """
+    try:
+        text = body.decode("utf-8-sig").strip()
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Body must be UTF-8: {exc}") from exc
+    if "ndjson" in content_type or "jsonl" in content_type or not text.startswith("["):
+        raw_items = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                raw_items.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raw_items.append(exc)
+    else:
+        try:
+            raw_items = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {exc}") from exc
+
+    if len(raw_items) > FINANCE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {FINANCE_BATCH_MAX})")
+
+    items: List[BatchItem] = []
+    for index, raw in enumerate(raw_items):
+        if isinstance(raw, Exception):
+            items.append((index, None, f"invalid JSON: {raw}"))
+        elif not isinstance(raw, dict):
+            items.append((index, None, "each item must be a JSON object"))
+        else:
+            try:
+                items.append((index, AssetRequest(**raw).dict(), None))
+            except ValidationError as exc:
+                items.append((index, None, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())))
+    return items
+
+
+@router.post("/recommendations/batch")
+async def recommend_finance_products_batch(request: Request) -> StreamingResponse:
+    """AssetRequest 배열(JSON) 또는 NDJSON 업로드 → 입력 순서대로 NDJSON 결과 스트림.
+
+    각 줄은 `{"index", "result"}` 또는 `{"index", "error"}`, 마지막 줄은 `{"meta": {...customers_per_second}}`.
+    """
+    started = time.perf_counter()
+    body = await request.body()
+    # 최대 FINANCE_BATCH_MAX 건 디코딩/검증은 초 단위라 이벤트 루프 밖에서 한다
+    items = await asyncio.to_thread(_parse_batch_body, body, request.headers.get("content-type", ""))
+    try:
+        catalogs = await resolve_batch_catalogs(items)
     except Exception as exc:  # pragma: no cover
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return StreamingResponse(stream_batch(items, catalogs, started), media_type="application/x-ndjson")
+
+
+@router.get("/products/search")
+async def search_products(
+    family: str = Query(default="saving", description="saving / deposit / credit / mortgage / rent"),
+    q: Optional[str] = Query(default=None, max_length=50, description="상품명 부분 문자열 (공백/대소문자 무시)"),
+    company: List[str] = Query(default=[], description="금융회사명 (여러 개면 OR)"),
+    term: List[int] = Query(default=[], description="만기(개월), 적금/예금만"),
+    join_way: List[str] = Query(default=[], description="가입경로 (영업점/인터넷/스마트폰 …)"),
+    join_member: List[str] = Query(default=[], description="가입대상"),
+    min_rate: Optional[float] = Query(default=None, ge=0),
+    max_rate: Optional[float] = Query(default=None, ge=0),
+    order: Optional[Literal["asc", "desc"]] = Query(default=None, description="금리순 (기본: 적금/예금 desc, 대출 asc)"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+):
+    """
+    Finlife 상품 패싯 검색 (갱신 때 만든 비트맵 색인)
+
+    - 필터: 같은 항목 안의 여러 값은 OR, 항목끼리는 AND
+    - facets: 항목별 값과 개수 (그 항목 자신의 필터는 빼고 센다)
+    """
+    if family not in TERM_FAMILIES + LOAN_FAMILIES:
+        raise HTTPException(status_code=400, detail=f"family must be one of {list(TERM_FAMILIES + LOAN_FAMILIES)}")
+    if min_rate is not None and max_rate is not None and min_rate > max_rate:
+        raise HTTPException(status_code=400, detail="min_rate must not exceed max_rate")
+    try:
+        catalog = await CATALOG_STORE.get(family)
+    except Exception as exc:
+        raise HTTPException(status_code=503, detail=f"Finlife catalog unavailable: {exc}") from exc
+    index = await finance_search.facet_index(catalog)
+    started = time.perf_counter()
+    result = finance_search.search(
+        index,
+        name=q,
+        filters={"company": company, "term": term, "join_way": join_way, "join_member": join_member},
+        min_rate=min_rate,
+        max_rate=max_rate,
+        order=order,
+        limit=limit,
+        offset=offset,
+    )
+    elapsed = time.perf_counter() - started
+    SEARCH_LATENCY.observe(elapsed, "finance")
+    result["meta"]["took_us"] = round(elapsed * 1e6, 1)
+    return FastJSONResponse(result)
+
+
+def _naive_local(value: Optional[datetime]) -> Optional[datetime]:
+    # observed_at 은 서버 로컬 시각(naive)으로 저장되므로 ...Z / +09:00 같은 입력은 로컬 시각으로 바꿔 비교한다
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@router.get("/products/{fin_prdt_cd}/history")
+async def product_rate_history(
+    fin_prdt_cd: str,
+    term: Optional[int] = Query(default=None, ge=1, description="만기(개월), 없으면 전체"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    points: int = Query(default=HISTORY_DEFAULT_POINTS, ge=2, le=HISTORY_MAX_POINTS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """상품의 만기/금리유형별 금리 변화 이력. 변화가 points 보다 많으면 구간별로 줄여서 돌려준다."""
+    start, end = _naive_local(start), _naive_local(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    history = await product_history(db, fin_prdt_cd, term=term, start=start, end=end, max_points=points)
+    if not history["series"]:
+        raise HTTPException(status_code=404, detail="No rate history for this product")
+    return history
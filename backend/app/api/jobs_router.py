@@ -0,0 +1,139 @@
+import asyncio
+import json
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from app.api.finance_router import _parse_batch_body
+from app.services import jobs
+from app.services.finance_batch import FINANCE_BATCH_MAX
+from app.services.finance_catalog import LOAN_FAMILIES, TERM_FAMILIES
+from app.services.serialization import FastJSONResponse
+from app.services.welfare_service import WelfareInput
+
+router = APIRouter()
+
+FINANCE_FAMILIES = TERM_FAMILIES + LOAN_FAMILIES
+
+
+def accepted(submission: jobs.Submission) -> FastJSONResponse:
+    """202 + job id (중복 제출이면 이미 대기/실행 중인 작업)"""
+    url = f"/jobs/{submission.job_id}"
+    return FastJSONResponse(
+        {
+            "job_id": submission.job_id,
+            "status": submission.status,
+            "deduplicated": submission.deduplicated,
+            "status_url": url,
+            "result_url": f"{url}/result",
+        },
+        status_code=202,
+        headers={"Location": url},
+    )
+
+
+def submit(kind: str, params=None, payload=None, dedup_key: Optional[str] = None) -> FastJSONResponse:
+    try:
+        return accepted(jobs.submit(kind, params, payload, dedup_key))
+    except jobs.JobQueueFull as exc:
+        raise HTTPException(status_code=503, detail=f"Job queue full: {exc}", headers={"Retry-After": "5"}) from exc
+
+
+@router.post("/refresh/fss")
+def submit_fss_refresh():
+    """FSS 예금 상품 수집 + financial_products 갱신 + 금리 이력 적재 (진행 중이면 그 작업을 돌려준다)"""
+    return submit("refresh.fss", dedup_key="refresh.fss")
+
+
+class CatalogRefreshRequest(BaseModel):
+    families: List[str] = list(FINANCE_FAMILIES)
+
+
+@router.post("/refresh/finance-catalog")
+def submit_finance_catalog_refresh(payload: Optional[CatalogRefreshRequest] = None):
+    """Finlife 상품군 스냅샷 강제 갱신 (기본: 전체 상품군)"""
+    families = (payload or CatalogRefreshRequest()).families
+    unknown = [f for f in families if f not in FINANCE_FAMILIES]
+    if unknown or not families:
+        raise HTTPException(status_code=400, detail=f"families must be a non-empty subset of {list(FINANCE_FAMILIES)}")
+    families = sorted(set(families), key=FINANCE_FAMILIES.index)
+    return submit(
+        "refresh.finance_catalog",
+        {"families": families},
+        dedup_key="refresh.finance_catalog:" + ",".join(families),
+    )
+
+
+@router.post("/refresh/welfare-catalog")
+def submit_welfare_catalog_refresh():
+    """복지 전체 목록 재조회 → 카탈로그 버전 갱신 (바뀌면 저장된 사용자 추천 재계산 작업이 이어진다)"""
+    return submit("refresh.welfare_catalog", dedup_key="refresh.welfare_catalog")
+
+
+def _parse_diagnose_body(body: bytes) -> list:
+    """WelfareInput JSON 배열 → [(index, WelfareInput 또는 None, 오류 또는 None)] (이벤트 루프 밖에서 호출)"""
+    try:
+        raw_items = json.loads(body.decode("utf-8-sig"))
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Body must be UTF-8: {exc}") from exc
+    except json.JSONDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON array: {exc}") from exc
+    if not isinstance(raw_items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array")
+    if len(raw_items) > FINANCE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {FINANCE_BATCH_MAX})")
+    items = []
+    for index, raw in enumerate(raw_items):
+        try:
+            items.append((index, WelfareInput(**raw), None))
+        except (TypeError, ValidationError) as exc:
+            items.append((index, None, str(exc) if isinstance(exc, TypeError) else "; ".join(
+                f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()
+            )))
+    return items
+
+
+@router.post("/welfare/diagnose-batch")
+async def submit_diagnose_batch(request: Request):
+    """WelfareInput 배열 → 복지 자격 진단 결과 목록 (항목별 검증 오류는 해당 위치의 error)"""
+    # 최대 FINANCE_BATCH_MAX 건 디코딩/검증은 이벤트 루프를 막지 않도록 스레드에서 한다
+    items = await asyncio.to_thread(_parse_diagnose_body, await request.body())
+    return await asyncio.to_thread(submit, "welfare.diagnose_batch", {"items": len(items)}, items)
+
+
+@router.post("/finance/switching-batch")
+async def submit_switching_batch(request: Request):
+    """/finance/recommendations/batch 와 같은 본문(JSON 배열 또는 NDJSON)을 백그라운드로 채점"""
+    body = await request.body()
+    items = await asyncio.to_thread(_parse_batch_body, body, request.headers.get("content-type", ""))
+    return await asyncio.to_thread(submit, "finance.switching_batch", {"items": len(items)}, items)
+
+
+@router.get("")
+def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """최근 작업 목록 (결과 본문 제외)"""
+    items = [jobs.describe(job) for job in jobs.recent(kind, status, max(1, min(limit, 500)))]
+    return FastJSONResponse({"count": len(items), "items": items})
+
+
+@router.get("/{job_id}")
+def job_status(job_id: str):
+    """상태/진행률 (0~1)/메시지"""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return FastJSONResponse(jobs.describe(job))
+
+
+@router.get("/{job_id}/result")
+def job_result(job_id: str):
+    """끝난 작업의 결과. 아직이면 202 + 상태, 실패했으면 409 + 오류"""
+    job = jobs.get(job_id, with_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status in jobs.ACTIVE_STATUSES:
+        return FastJSONResponse(jobs.describe(job), status_code=202)
+    if job.status == jobs.FAILED:
+        return FastJSONResponse(jobs.describe(job), status_code=409)
+    return FastJSONResponse({"job_id": job.id, "kind": job.kind, "result": job.result})
@@ -1,30 +1,24 @@
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
-from sqlalchemy.orm import Session
-from app.db.db_conn import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.db_conn import get_async_db
 from app.db.models import User, UserProfile
 from app.services.security import decode_token
+from app.services import welfare_personalized
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_current_user(authorization: Optional[str] = Header(default=None), db: Session = Depends(get_db)) -> User:
+async def get_current_user(authorization: Optional[str] = Header(default=None), db: AsyncSession = Depends(get_async_db)) -> User:
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing token")
     token = authorization.split(" ", 1)[1]
     sub = decode_token(token)
     if not sub:
         raise HTTPException(status_code=401, detail="Invalid token")
-    user = db.query(User).get(int(sub))
+    user = await db.get(User, int(sub))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -38,8 +32,8 @@ class ProfilePayload(BaseModel):
 
 
 @router.get("/profile")
-def get_profile(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    p = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+async def get_profile(user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    p = await db.scalar(select(UserProfile).where(UserProfile.user_id == user.id))
     if not p:
         return {"region_code": None, "job_category": None, "age": None, "preferences": []}
     return {
@@ -51,8 +45,13 @@ def get_profile(user: User = Depends(get_current_user), db: Session = Depends(ge
 
 
 @router.post("/profile")
-def save_profile(payload: ProfilePayload, user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    p = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+async def save_profile(
+    payload: ProfilePayload,
+    background_tasks: BackgroundTasks,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    p = await db.scalar(select(UserProfile).where(UserProfile.user_id == user.id))
     if not p:
         p = UserProfile(user_id=user.id)
         db.add(p)
@@ -60,5 +59,7 @@ def save_profile(payload: ProfilePayload, user: User = Depends(get_current_user)
     p.job_category = payload.job_category
     p.age = payload.age
     p.preferences = payload.preferences or []
-    db.commit()
+    await db.commit()
+    # /welfare/recommendations/me 가 캐시 읽기로 끝나도록 저장 직후 추천을 미리 계산
+    background_tasks.add_task(welfare_personalized.refresh_in_background, user.id)
     return {"status": "ok"}
@@ -1,11 +1,19 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.db_conn import get_async_db
+from app.db.models import User
+from app.api.user_router import get_current_user
+from app.services import welfare_personalized, welfare_search
 from app.services.welfare_service import WelfareInput, calculate_income_recognition
 from app.services.welfare_recommendation import recommend_welfare
 from app.services.welfare_provider import USE_MOCK as WELFARE_USE_MOCK
 from app.services.welfare_provider import WELFARE_API_BASE, WELFARE_API_LIST_PATH
-from app.services.welfare_provider import provider_status
+from app.services.welfare_provider import catalog_version, provider_status
+from app.services.response_cache import RESPONSE_CACHE, cached_response, request_key
+from app.services.serialization import dumps
 
 router = APIRouter()
 
@@ -29,14 +37,7 @@ class RecommendationRequest(BaseModel):
     )
 
 
-@router.post("/recommendations")
-def get_recommendations(payload: RecommendationRequest):
-    """
-    사용자 지역/직업/나이/선호도 기반 복지 서비스 추천
-
-    - 입력: region_code, job_category, age, preferences
-    - 출력: 점수순 정렬된 복지 리스트
-    """
+def _recommendation_content(payload: RecommendationRequest) -> dict:
     items = recommend_welfare(
         region_code=payload.region_code,
         job_category=payload.job_category,
@@ -54,6 +55,7 @@ def get_recommendations(payload: RecommendationRequest):
             "api_base": WELFARE_API_BASE,
             "list_path": WELFARE_API_LIST_PATH,
             "mock_reason": status.get("last_error"),
+            "sources": status.get("sources"),
             "filters": {
                 "region_code": payload.region_code,
                 "job_category": payload.job_category,
@@ -63,3 +65,77 @@ def get_recommendations(payload: RecommendationRequest):
             },
         },
     }
+
+
+@router.get("/search")
+def search_programs(
+    q: str = Query(..., min_length=1, max_length=100, description="검색어 (프로그램명/분야/제공기관/요약)"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    복지 프로그램 전문 검색 (로컬 FTS5 색인, 한글 바이그램)
+
+    - 업스트림을 부르지 않고 이미 받은 카탈로그에서 찾는다 (카탈로그가 바뀌면 바뀐 항목만 다시 색인)
+    - 관련도(score) 순, limit/offset 페이지
+    """
+    try:
+        return welfare_search.search(q, limit=limit, offset=offset)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/recommendations")
+def get_recommendations(payload: RecommendationRequest, request: Request):
+    """
+    사용자 지역/직업/나이/선호도 기반 복지 서비스 추천
+
+    - 입력: region_code, job_category, age, preferences
+    - 출력: 점수순 정렬된 복지 리스트
+    - 같은 입력 + 같은 카탈로그 버전이면 캐시된 본문, If-None-Match 가 맞으면 304
+    """
+    version = catalog_version()
+    entry = RESPONSE_CACHE.get(request_key("welfare", payload, version)) if version else None
+    if entry is not None:
+        return cached_response(request, entry, "welfare", True)
+
+    content = _recommendation_content(payload)
+    body = dumps(content)
+    # 업스트림 실패로 mock 으로 대체됐거나 일부 출처가 빠진 응답은 캐시하지 않는다 (다음 요청에서 다시 시도)
+    version = catalog_version()
+    status = provider_status()
+    degraded = (status.get("last_error") or status.get("partial")) and not WELFARE_USE_MOCK
+    if not version or degraded:
+        return Response(content=body, media_type="application/json")
+    entry = RESPONSE_CACHE.put(request_key("welfare", payload, version), body)
+    return cached_response(request, entry, "welfare", False)
+
+
+@router.get("/recommendations/me")
+async def get_my_recommendations(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    저장된 사용자 프로필(POST /user/profile) 기반 복지 추천
+
+    - 프로필 저장 시 미리 계산된 결과를 읽어 반환
+    - 카탈로그 버전이 바뀌었거나 결과가 없으면 이 요청에서 다시 계산
+    """
+    row, items, cache_hit = await welfare_personalized.load(db, user.id)
+    status = provider_status()
+    return {
+        "count": len(items),
+        "items": items,
+        "meta": {
+            "used_mock": bool(WELFARE_USE_MOCK or status.get("last_error")),
+            "api_base": WELFARE_API_BASE,
+            "list_path": WELFARE_API_LIST_PATH,
+            "mock_reason": status.get("last_error"),
+            "materialized": {
+                "cache_hit": cache_hit,
+                "catalog_version": row.catalog_version,
+                "computed_at": row.computed_at.isoformat() if row.computed_at else None,
+            },
+        },
+    }
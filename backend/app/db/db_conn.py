@@ -1,15 +1,89 @@
 import os
-from sqlalchemy import create_engine, MetaData, Table, Column, String, Float, DateTime
+from typing import AsyncIterator, Dict
+from sqlalchemy import create_engine, event, MetaData, Table, Column, String, Float, DateTime
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 from dotenv import load_dotenv
+from app.services.metrics import DB_SESSION_LATENCY
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./backend.db")
+# 비동기 드라이버 URL을 직접 지정하지 않으면 DATABASE_URL에서 유도
+# (sqlite → sqlite+aiosqlite, mysql/mysql+pymysql → mysql+aiomysql)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=False, future=True)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, MySQL wait_timeout 대비
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def _to_async_url(url: str) -> URL:
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(
+            f"No async driver configured for {parsed.drivername}. Set ASYNC_DATABASE_URL explicitly."
+        )
+    return parsed.set(drivername=driver)
+
+
+def _is_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite"
+
+
+def _pool_kwargs(url: URL) -> Dict[str, int]:
+    # 인메모리 SQLite는 단일 커넥션 풀(StaticPool 등)을 쓰므로 크기 옵션을 받지 않음
+    if _is_sqlite(url) and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": not _is_sqlite(url),
+    }
+
+
+def _set_sqlite_pragmas(dbapi_conn, _record) -> None:
+    # WAL: 읽기가 쓰기에 막히지 않음 / NORMAL: WAL에서는 커밋마다 fsync 하지 않아도 안전
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+_sync_url = make_url(DATABASE_URL)
+_async_url = make_url(ASYNC_DATABASE_URL) if ASYNC_DATABASE_URL else _to_async_url(DATABASE_URL)
+
+engine = create_engine(_sync_url, echo=False, future=True, **_pool_kwargs(_sync_url))
 SessionLocal = sessionmaker(bind=engine)
+
+async_engine = create_async_engine(_async_url, echo=False, **_pool_kwargs(_async_url))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+if _is_sqlite(_sync_url):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+if _is_sqlite(_async_url):
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: 요청 단위 AsyncSession"""
+    with DB_SESSION_LATENCY.time("async"):
+        async with AsyncSessionLocal() as db:
+            yield db
+
+
 metadata = MetaData()
 
 financial_products = Table(
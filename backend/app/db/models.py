@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, Text
 from datetime import datetime
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
 
 Base = declarative_base()
 
@@ -47,3 +47,55 @@ class UserProfile(Base):
     age = Column(Integer)
     preferences = Column(JSON)
     __table_args__ = (UniqueConstraint('user_id', name='uq_user_profile_user'),)
+
+class UserWelfareRecommendation(Base):
+    """프로필 기반 복지 추천 결과 (id/점수만 저장, 조회 시 카탈로그로 확장)"""
+    __tablename__ = "user_welfare_recommendations"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    catalog_version = Column(String(64))
+    ranking = Column(JSON)  # [[program_id, score], ...] 점수순
+    computed_at = Column(DateTime, default=datetime.now)
+    __table_args__ = (UniqueConstraint('user_id', name='uq_user_welfare_reco_user'),)
+
+class RateHistory(Base):
+    """예금/적금 옵션 금리 변화 시점 (갱신 때 값이 바뀐 (상품, 만기, 금리유형)만 추가)"""
+    __tablename__ = "rate_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    family = Column(String(10), nullable=False)  # deposit / saving
+    fin_prdt_cd = Column(String(40), nullable=False)
+    save_trm = Column(Integer, nullable=False)
+    rate_type = Column(String(2), nullable=False, default="")  # intr_rate_type (S 단리 / M 복리)
+    intr_rate = Column(Float)  # 기본금리
+    intr_rate2 = Column(Float)  # 최고우대금리
+    observed_at = Column(DateTime, nullable=False, default=datetime.now)
+    __table_args__ = (
+        Index("ix_rate_history_product_term_time", "fin_prdt_cd", "save_trm", "observed_at"),
+        Index("ix_rate_history_family_time", "family", "observed_at"),
+    )
+
+class Job(Base):
+    """백그라운드 작업 (app/services/jobs.py). 끝난 작업은 expires_at 이 지나면 삭제"""
+    __tablename__ = "jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(40), nullable=False)
+    status = Column(String(12), nullable=False, default="queued")  # queued / running / succeeded / failed
+    dedup_key = Column(String(120))
+    params = Column(JSON)
+    progress = Column(Float, default=0.0)
+    message = Column(String(255))
+    result = Column(JSON)
+    error = Column(Text)
+    worker = Column(String(120))  # host:pid:process start (epoch)
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    expires_at = Column(DateTime)
+    __table_args__ = (
+        Index("ix_jobs_dedup_status", "dedup_key", "status"),
+        Index("ix_jobs_created", "created_at"),
+        Index("ix_jobs_expires", "expires_at"),
+    )
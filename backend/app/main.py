@@ -1,16 +1,33 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from app.api import welfare_router, data_router
 from app.api import auth_router
 from app.api import user_router
 from app.api import chat_router
 from app.api import finance_router
+from app.api import admin_router
+from app.api import jobs_router
+from app.services import finance_batch, jobs
 from app.services.scheduler import start_scheduler
+from app.db.db_conn import async_engine
+from app.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS_REGISTRY, MetricsMiddleware
+from app.services.profiling import ProfilingMiddleware
+from app.services.readiness import WARMUP, readiness
+from app.services.rate_limit import RateLimitMiddleware
+from app.services.serialization import FastJSONResponse, add_compression
+from utils import http_client
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Welfare-Finance Integration API")
+app = FastAPI(title="Welfare-Finance Integration API", default_response_class=FastJSONResponse)
+
+# RESPONSE_COMPRESS_MIN_BYTES 이상 응답은 Accept-Encoding 에 따라 br/gzip 압축 (가장 안쪽 미들웨어)
+add_compression(app)
+
+# 클라이언트별 토큰 버킷 + 경로 그룹별 동시 처리 상한 → 429 (CORS 안쪽이라 거절 응답에도 CORS 헤더가 붙는다)
+app.add_middleware(RateLimitMiddleware, skip_paths=("/", "/metrics", "/healthz", "/readyz"))
 
 # CORS (프론트엔드 로컬 개발 지원)
 app.add_middleware(
@@ -19,19 +36,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Retry-After"],  # 추천 응답 재검증(If-None-Match), 429 재시도 간격
+)
+
+# 라우트별 지연/상태코드/동시 처리 수 (GET /metrics 로 노출)
+app.add_middleware(
+    MetricsMiddleware,
+    groups=["/welfare", "/data", "/auth", "/user", "/chat", "/finance", "/admin"],
 )
 
+# 관리자 헤더(X-Profile) 또는 PROFILE_SAMPLE_RATE 로 선택된 요청만 프로파일링
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(welfare_router.router, prefix="/welfare", tags=["Welfare"])
 app.include_router(data_router.router, prefix="/data", tags=["Data"])
 app.include_router(auth_router.router, prefix="/auth", tags=["Auth"])
 app.include_router(user_router.router, prefix="/user", tags=["User"])
 app.include_router(chat_router.router, prefix="/chat", tags=["Chat"])
 app.include_router(finance_router.router, prefix="/finance", tags=["Finance"])
+app.include_router(admin_router.router, prefix="/admin", tags=["Admin"])
+app.include_router(jobs_router.router, prefix="/jobs", tags=["Jobs"])
 
 @app.on_event("startup")
 async def startup_event():
+    await http_client.startup()  # 업스트림 공용 연결 풀
+    jobs.startup()  # 죽은 워커가 남긴 작업 정리, 만료 작업 삭제
     start_scheduler()  # FSS 데이터 자동 갱신 스케줄러
+    WARMUP.start()  # 카탈로그/DB 풀 워밍업 (끝나거나 WARMUP_TIMEOUT 이 지나면 /readyz 가 200)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    WARMUP.stop()
+    jobs.shutdown()
+    finance_batch.shutdown()  # 배치 채점 프로세스 풀
+    await http_client.shutdown()
+    await async_engine.dispose()
 
 @app.get("/")
 async def root():
     return {"message": "Welfare-Finance Integration Backend Running"}
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: 프로세스와 이벤트 루프가 살아 있으면 200 (I/O 없음)"""
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: 워밍업이 끝났고 DB 에 연결되면 200, 아니면 503 (본문은 카탈로그/캐시/DB/breaker 상태)"""
+    ready, report = await readiness()
+    return FastJSONResponse(report, status_code=200 if ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition"""
+    return Response(content=METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
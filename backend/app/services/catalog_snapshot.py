@@ -0,0 +1,289 @@
+"""Memory-mapped catalog snapshots shared across uvicorn workers.
+
+워커마다 Finlife/복지 카탈로그를 따로 받아 파싱하지 않도록, 갱신한 워커가 카탈로그 한 버전을
+CATALOG_SNAPSHOT_DIR/<name>.snap 파일 하나로 쓰고 다른 워커는 그 파일을 mmap 으로 읽어 교체한다.
+
+파일 형식 (네이티브 바이트 순서, 섹션은 8바이트 정렬):
+
+    magic "WFCAT001" | u32 헤더 길이 | JSON 헤더 | 고정폭 컬럼들 | 문자열 오프셋(u32) | UTF-8 문자열 데이터
+
+- 컬럼 종류: f8 (float64, None 은 NaN), i4 (int32), s (문자열 테이블 번호 u32, None 은 0xFFFFFFFF)
+- 문자열은 중복 없이 한 번만 저장한다 (회사명/가입방법처럼 반복되는 값이 많다).
+- 헤더에는 meta(버전, 작성 시각 등)와 테이블별 행 수/컬럼 위치가 들어 있다.
+
+한 번 쓴 파일은 고치지 않는다. 새 버전은 임시 파일에 쓰고 fsync 후 os.replace 로 바꿔치기하므로
+읽는 쪽은 항상 완전한 파일만 보고, 이미 열어 둔 mmap 은 이전 inode 를 계속 가리킨다.
+새 버전이 나왔는지는 파일의 (inode, mtime) 으로 판단한다 (snapshot_key).
+"""
+import array
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import CATALOG_SNAPSHOTS
+
+CATALOG_SNAPSHOT_DIR = os.getenv("CATALOG_SNAPSHOT_DIR", "")  # 비어 있으면 끈다
+CATALOG_SNAPSHOT_POLL = float(os.getenv("CATALOG_SNAPSHOT_POLL", "5"))  # seconds between new-version checks
+
+MAGIC = b"WFCAT001"
+NULL_STRING = 0xFFFFFFFF
+_TYPECODES = {"f8": "d", "i4": "i", "s": "I"}
+_ALIGN = 8
+
+SnapshotKey = Tuple[int, int]  # (st_ino, st_mtime_ns)
+Column = Tuple[str, Sequence[Any]]  # (kind, values)
+
+
+class SnapshotFormatError(ValueError):
+    """Raised for a file that is not a readable catalog snapshot."""
+
+
+def enabled() -> bool:
+    return bool(CATALOG_SNAPSHOT_DIR)
+
+
+def snapshot_path(name: str) -> str:
+    return os.path.join(CATALOG_SNAPSHOT_DIR, f"{name}.snap")
+
+
+def snapshot_key(name: str) -> Optional[SnapshotKey]:
+    """현재 파일의 (inode, mtime). 없으면 None"""
+    try:
+        st = os.stat(snapshot_path(name))
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns)
+
+
+def _pad(size: int) -> int:
+    return -size % _ALIGN
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[bytes] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL_STRING
+        value = str(value)
+        found = self.ids.get(value)
+        if found is None:
+            found = self.ids[value] = len(self.values)
+            self.values.append(value.encode("utf-8"))
+        return found
+
+
+def _encode_column(kind: str, values: Sequence[Any], strings: _StringTable) -> bytes:
+    if kind == "s":
+        data = array.array("I", (strings.intern(v) for v in values))
+    elif kind == "f8":
+        data = array.array("d", (math.nan if v is None else float(v) for v in values))
+    elif kind == "i4":
+        data = array.array("i", (int(v) for v in values))
+    else:
+        raise ValueError(f"unknown column kind {kind!r}")
+    return data.tobytes()
+
+
+def encode(meta: Dict[str, Any], tables: Dict[str, Dict[str, Column]]) -> bytes:
+    """meta + {테이블: {컬럼: (종류, 값 목록)}} → 스냅샷 바이트"""
+    strings = _StringTable()
+    sections: List[bytes] = []
+    layout: Dict[str, Dict[str, Any]] = {}
+    offset = 0
+    for table, columns in tables.items():
+        rows = {len(values) for _, values in columns.values()}
+        if len(rows) > 1:
+            raise ValueError(f"table {table!r} has columns of different lengths")
+        placed = {}
+        for column, (kind, values) in columns.items():
+            blob = _encode_column(kind, values, strings)
+            placed[column] = [kind, offset]
+            sections.append(blob + b"\0" * _pad(len(blob)))
+            offset += len(sections[-1])
+        layout[table] = {"rows": rows.pop() if rows else 0, "columns": placed}
+
+    string_offsets = array.array("I", [0])
+    for value in strings.values:
+        string_offsets.append(string_offsets[-1] + len(value))
+    offsets_blob = string_offsets.tobytes()
+    header = {
+        "meta": meta,
+        "byteorder": sys.byteorder,
+        "tables": layout,
+        "strings": {
+            "count": len(strings.values),
+            "offsets": offset,
+            "data": offset + len(offsets_blob) + _pad(len(offsets_blob)),
+        },
+    }
+    header_blob = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header_blob)) + header_blob
+    # 본문 오프셋은 prefix 정렬 이후 기준이라 헤더 크기와 무관하다
+    prefix += b"\0" * _pad(len(prefix))
+    return b"".join(
+        [prefix, *sections, offsets_blob, b"\0" * _pad(len(offsets_blob)), *strings.values]
+    )
+
+
+def write(name: str, meta: Dict[str, Any], tables: Dict[str, Dict[str, Column]]) -> Optional[SnapshotKey]:
+    """임시 파일에 쓰고 원자적으로 교체. 새 파일의 키를 돌려준다 (꺼져 있으면 None)"""
+    if not enabled():
+        return None
+    os.makedirs(CATALOG_SNAPSHOT_DIR, exist_ok=True)
+    meta = dict(meta, written_at=time.time())
+    blob = encode(meta, tables)
+    path = snapshot_path(name)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    CATALOG_SNAPSHOTS.inc(name, "written")
+    return snapshot_key(name)
+
+
+class Snapshot:
+    """mmap 으로 연 스냅샷 하나. 컬럼은 복사 없이 memoryview 로 읽는다."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.key: SnapshotKey = (st.st_ino, st.st_mtime_ns)
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        if bytes(self._view[: len(MAGIC)]) != MAGIC:
+            self.close()
+            raise SnapshotFormatError(f"{path}: not a catalog snapshot")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(self._view[start : start + header_len]))
+        if header.get("byteorder") != sys.byteorder:
+            self.close()
+            raise SnapshotFormatError(f"{path}: written with {header.get('byteorder')} byte order")
+        self._base = start + header_len + _pad(start + header_len)
+        self.meta: Dict[str, Any] = header["meta"]
+        self._tables: Dict[str, Dict[str, Any]] = header["tables"]
+        strings = header["strings"]
+        self._string_count = strings["count"]
+        begin = self._base + strings["offsets"]
+        self._string_offsets = self._view[begin : begin + 4 * (self._string_count + 1)].cast("I")
+        self._string_data = self._base + strings["data"]
+
+    def rows(self, table: str) -> int:
+        return self._tables[table]["rows"] if table in self._tables else 0
+
+    def column(self, table: str, column: str) -> memoryview:
+        kind, offset = self._tables[table]["columns"][column]
+        typecode = _TYPECODES[kind]
+        begin = self._base + offset
+        size = array.array(typecode).itemsize * self.rows(table)
+        return self._view[begin : begin + size].cast(typecode)
+
+    def string(self, index: int) -> Optional[str]:
+        if index == NULL_STRING:
+            return None
+        begin = self._string_data + self._string_offsets[index]
+        end = self._string_data + self._string_offsets[index + 1]
+        return str(self._view[begin:end], "utf-8")
+
+    def strings(self, table: str, column: str) -> List[Optional[str]]:
+        # 같은 번호는 한 번만 디코드해서 같은 str 객체를 공유한다
+        decoded: Dict[int, Optional[str]] = {}
+        out = []
+        for index in self.column(table, column):
+            value = decoded.get(index)
+            if value is None and index not in decoded:
+                value = decoded[index] = self.string(index)
+            out.append(value)
+        return out
+
+    def floats(self, table: str, column: str) -> List[Optional[float]]:
+        return [None if math.isnan(v) else v for v in self.column(table, column)]
+
+    def close(self) -> None:
+        # 컬럼 memoryview 를 모두 놓은 뒤에 닫을 수 있다 (디코드한 값은 복사본이라 닫아도 남는다)
+        offsets = getattr(self, "_string_offsets", None)
+        if offsets is not None:
+            offsets.release()
+        self._view.release()
+        self._mm.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_snapshot(name: str) -> Optional[Snapshot]:
+    """현재 스냅샷을 연다. 없거나 꺼져 있으면 None"""
+    if not enabled():
+        return None
+    try:
+        snap = Snapshot(snapshot_path(name))
+    except FileNotFoundError:
+        return None
+    CATALOG_SNAPSHOTS.inc(name, "loaded")
+    return snap
+
+
+class Watcher:
+    """CATALOG_SNAPSHOT_POLL 간격으로만 파일 키를 확인해 새 버전이 나왔는지 알려준다."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.key: Optional[SnapshotKey] = None
+        self._checked_at: Optional[float] = None
+
+    def changed(self) -> bool:
+        if not enabled():
+            return False
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < CATALOG_SNAPSHOT_POLL:
+            return False
+        self._checked_at = now
+        key = snapshot_key(self.name)
+        return key is not None and key != self.key
+
+
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-snapshot")
+_pending: Dict[str, Callable[[], None]] = {}
+_pending_lock = threading.Lock()
+
+
+def _drain(name: str) -> None:
+    with _pending_lock:
+        job = _pending.pop(name, None)
+    if job is None:
+        return
+    try:
+        job()
+    except Exception as exc:  # pragma: no cover - 디스크 오류 등은 다음 갱신에서 다시 시도
+        print(f"[CatalogSnapshot] {name} not written: {exc}")
+
+
+def write_later(name: str, job: Callable[[], None]) -> None:
+    """백그라운드 스레드에서 job 실행. 아직 밀린 같은 이름의 작업이 있으면 최신 것으로 바꾼다."""
+    if not enabled():
+        return
+    with _pending_lock:
+        queued = name in _pending
+        _pending[name] = job
+    if not queued:
+        _writer.submit(_drain, name)
@@ -8,6 +8,8 @@ from google.generativeai import types as genai_types
 from fastapi import HTTPException
 from pydantic import BaseModel
 
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+
 DEFAULT_MODEL_NAME = "gemini-2.0-flash-lite-preview"
 
 
@@ -70,7 +72,12 @@ def _get_model() -> genai.GenerativeModel:
     if not api_key:
         raise RuntimeError("Environment variable GEMINI_API_KEY is not set.")
 
-    genai.configure(api_key=api_key)
+    endpoint = os.getenv("GEMINI_API_ENDPOINT")
+    if endpoint:
+        # 로컬 대역(부하 테스트용 가짜 모델 서버 등)으로 보낼 때는 REST 전송 사용
+        genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+    else:
+        genai.configure(api_key=api_key)
     model_name = os.getenv("GEMINI_MODEL_NAME", DEFAULT_MODEL_NAME)
     # Temperature tuned for reliable factual responses with some personalization.
     generation_config = genai_types.GenerationConfig(
@@ -178,8 +185,10 @@ async def generate_chat_reply(
         raise HTTPException(status_code=400, detail="At least one message is required.")
 
     try:
-        response = await asyncio.to_thread(model.generate_content, contents)
+        with UPSTREAM_LATENCY.time("gemini", "generate_content"):
+            response = await asyncio.to_thread(model.generate_content, contents)
     except Exception as exc:  # broad: surface meaningful message to caller
+        UPSTREAM_ERRORS.inc("gemini", "generate_content")
         raise ChatModelError("Failed to generate response from Gemini.") from exc
 
     if not getattr(response, "text", None):
@@ -0,0 +1,187 @@
+"""Per-upstream circuit breakers and negative caching.
+
+업스트림(data.go.kr 복지 API, 금융감독원 Finlife)이 죽어 있을 때 요청마다 타임아웃까지 기다리지 않도록
+연속 실패가 CIRCUIT_FAILURE_THRESHOLD 번 쌓이면 회로를 연다(open). 열린 동안은 호출하지 않고
+CircuitOpenError 로 바로 실패해 호출 측이 mock/이전 스냅샷으로 대체한다. CIRCUIT_RESET_TIMEOUT 이 지나면
+half-open 으로 시험 호출 하나만 통과시키고, 성공하면 닫고 실패하면 다시 연다.
+
+4xx 처럼 요청 자체가 잘못된 실패는 회로를 열지 않는다. 대신 NegativeCache 에 짧게(NEGATIVE_CACHE_TTL)
+기록해 같은 질의를 곧바로 반복하지 않는다.
+
+업스트림별 설정은 CIRCUIT_<NAME>_THRESHOLD / CIRCUIT_<NAME>_RESET_TIMEOUT 로 덮어쓴다
+(NAME 은 대문자, '.' 은 '_', 예: CIRCUIT_WELFARE_CENTRAL_THRESHOLD).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from .metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE, CIRCUIT_TRANSITIONS, NEGATIVE_CACHE_HITS
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))  # seconds open before a trial call
+NEGATIVE_CACHE_TTL = float(os.getenv("NEGATIVE_CACHE_TTL", "30"))
+NEGATIVE_CACHE_SIZE = int(os.getenv("NEGATIVE_CACHE_SIZE", "1024"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"circuit '{name}' open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class NegativeCachedError(RuntimeError):
+    """Raised for a query that failed recently (within NEGATIVE_CACHE_TTL)."""
+
+
+def counts_as_failure(exc: BaseException) -> bool:
+    """업스트림 장애로 볼 실패인지 (연결/타임아웃/5xx). 4xx 는 요청 문제라 회로에 반영하지 않는다."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is None or status >= 500
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(_STATE_VALUES[CLOSED], name)
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], self.name)
+        CIRCUIT_TRANSITIONS.inc(self.name, state)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """호출 직전에 부른다. 열려 있으면 CircuitOpenError"""
+        with self._lock:
+            if self._state == OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < self.reset_timeout:
+                    CIRCUIT_REJECTIONS.inc(self.name)
+                    raise CircuitOpenError(self.name, self.reset_timeout - waited)
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                # 시험 호출은 하나만, 나머지는 결과가 나올 때까지 계속 거절
+                if self._trial_in_flight:
+                    CIRCUIT_REJECTIONS.inc(self.name)
+                    raise CircuitOpenError(self.name, 0)
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, exc: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            if exc is not None:
+                self._last_error = f"{type(exc).__name__}: {exc}"[:200]
+            if exc is not None and not counts_as_failure(exc):
+                return
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != OPEN:
+                    self._transition(OPEN)
+
+    def status(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error,
+            }
+
+
+class NegativeCache:
+    """최근 실패한 질의 → 오류 메시지 (TTL 동안 같은 질의는 호출하지 않는다)"""
+
+    def __init__(self, ttl: float = NEGATIVE_CACHE_TTL, max_size: int = NEGATIVE_CACHE_SIZE) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, upstream: str, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.get((upstream, key))
+            if entry is None:
+                return
+            expires_at, message = entry
+            if expires_at < time.monotonic():
+                del self._entries[(upstream, key)]
+                return
+        NEGATIVE_CACHE_HITS.inc(upstream)
+        raise NegativeCachedError(f"recently failed ({upstream}): {message}")
+
+    def put(self, upstream: str, key: Hashable, exc: BaseException) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(upstream, key)] = (time.monotonic() + self.ttl, f"{type(exc).__name__}: {exc}"[:200])
+            self._entries.move_to_end((upstream, key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+NEGATIVE_CACHE = NegativeCache()
+
+
+def breaker(name: str) -> CircuitBreaker:
+    """업스트림 이름별 breaker (처음 부를 때 환경변수 설정으로 만든다)"""
+    with _REGISTRY_LOCK:
+        found = _BREAKERS.get(name)
+        if found is None:
+            env = name.upper().replace(".", "_")
+            found = CircuitBreaker(
+                name,
+                int(os.getenv(f"CIRCUIT_{env}_THRESHOLD", str(CIRCUIT_FAILURE_THRESHOLD))),
+                float(os.getenv(f"CIRCUIT_{env}_RESET_TIMEOUT", str(CIRCUIT_RESET_TIMEOUT))),
+            )
+            _BREAKERS[name] = found
+        return found
+
+
+def breaker_status(prefix: str = "") -> Dict[str, Dict[str, Any]]:
+    with _REGISTRY_LOCK:
+        breakers = [b for name, b in sorted(_BREAKERS.items()) if name.startswith(prefix)]
+    return {b.name: b.status() for b in breakers}
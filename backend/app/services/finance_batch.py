@@ -0,0 +1,196 @@
+"""Batch finance switching: 많은 자산 프로필을 하나의 카탈로그 스냅샷으로 채점.
+
+- 필요한 상품군 스냅샷은 배치 시작 시 한 번만 확보한다 (요청마다 재조회하지 않음).
+- FINANCE_BATCH_PROCESS_THRESHOLD 건 이상이면 spawn 프로세스 풀로 청크를 나눠 채점한다.
+  풀은 앱 수명 동안 하나를 두고(처음 쓸 때 만들고 shutdown() 에서 닫는다) 요청마다 인터프리터를 새로 띄우지 않는다.
+  스냅샷은 버전 조합별로 임시 파일에 한 번 pickle 해 두고, 워커는 버전이 바뀌었을 때만 그 파일을 읽는다.
+  직렬화(JSON 인코딩)도 워커에서 한다.
+- 결과는 입력 순서대로 NDJSON 한 줄씩 내보내고, 마지막 줄에 처리량(customers/sec) 메타를 붙인다.
+"""
+import asyncio
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .finance_catalog import CATALOG_STORE, FamilyCatalog, FinanceCatalogStore
+from .finance_recommendation import required_families, resolve_catalogs, score_switching
+from .serialization import dumps
+
+FINANCE_BATCH_MAX = int(os.getenv("FINANCE_BATCH_MAX", "50000"))
+FINANCE_BATCH_PROCESS_THRESHOLD = int(os.getenv("FINANCE_BATCH_PROCESS_THRESHOLD", "2000"))
+FINANCE_BATCH_CHUNK = int(os.getenv("FINANCE_BATCH_CHUNK", "500"))
+FINANCE_BATCH_WORKERS = int(os.getenv("FINANCE_BATCH_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+# (입력 위치, 검증된 입력 또는 None, 검증 오류 또는 None)
+BatchItem = Tuple[int, Optional[Dict], Optional[str]]
+
+CatalogKey = Tuple[Tuple[str, Optional[str]], ...]  # ((상품군, 버전), ...)
+
+_worker_catalogs: Dict[str, Optional[FamilyCatalog]] = {}
+_worker_catalog_key: Optional[CatalogKey] = None
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_catalog_dir: Optional[str] = None
+_catalog_files: "OrderedDict[CatalogKey, str]" = OrderedDict()
+_CATALOG_FILES_KEPT = 4  # 진행 중인 배치가 아직 읽을 수 있도록 최근 버전 조합 몇 개는 남긴다
+
+
+def _score_lines(items: List[BatchItem], catalogs: Dict[str, Optional[FamilyCatalog]]) -> Tuple[bytes, int]:
+    """청크 하나 → (NDJSON 블록, 오류 건수)"""
+    lines: List[bytes] = []
+    errors = 0
+    for index, data, error in items:
+        if data is not None:
+            try:
+                lines.append(dumps({"index": index, "result": score_switching(data, catalogs)}))
+                continue
+            except Exception as exc:  # 한 명의 실패가 배치 전체를 멈추지 않도록
+                error = str(exc)
+        errors += 1
+        lines.append(dumps({"index": index, "error": error}))
+    return b"".join(line + b"\n" for line in lines), errors
+
+
+def _score_chunk_in_worker(items: List[BatchItem], key: CatalogKey, path: str) -> Tuple[bytes, int]:
+    global _worker_catalogs, _worker_catalog_key
+    if key != _worker_catalog_key:
+        with open(path, "rb") as f:
+            _worker_catalogs = pickle.load(f)
+        _worker_catalog_key = key
+    return _score_lines(items, _worker_catalogs)
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=FINANCE_BATCH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _catalog_file(catalogs: Dict[str, Optional[FamilyCatalog]]) -> Tuple[CatalogKey, str]:
+    """버전 조합별 pickle 파일 (같은 조합이면 다시 쓰지 않는다)"""
+    global _catalog_dir
+    key: CatalogKey = tuple(sorted((f, c.version if c is not None else None) for f, c in catalogs.items()))
+    with _pool_lock:
+        path = _catalog_files.get(key)
+        if path is not None:
+            _catalog_files.move_to_end(key)
+            return key, path
+        if _catalog_dir is None:
+            _catalog_dir = tempfile.mkdtemp(prefix="finance-batch-")
+        fd, path = tempfile.mkstemp(dir=_catalog_dir, suffix=".pkl")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(catalogs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _catalog_files[key] = path
+        while len(_catalog_files) > _CATALOG_FILES_KEPT:
+            _, old = _catalog_files.popitem(last=False)
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+        return key, path
+
+
+def _discard_pool() -> None:
+    # 워커가 비정상 종료하면 풀 전체가 못 쓰게 되므로 다음 배치에서 새로 만든다
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown() -> None:
+    """앱 종료 시 프로세스 풀과 스냅샷 임시 파일 정리"""
+    global _catalog_dir
+    _discard_pool()
+    with _pool_lock:
+        _catalog_files.clear()
+        if _catalog_dir is not None:
+            shutil.rmtree(_catalog_dir, ignore_errors=True)
+            _catalog_dir = None
+
+
+def _chunks(items: List[BatchItem], size: int) -> List[List[BatchItem]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def resolve_batch_catalogs(
+    items: List[BatchItem],
+    store: Optional[FinanceCatalogStore] = None,
+) -> Dict[str, Optional[FamilyCatalog]]:
+    """배치 전체에 필요한 상품군 스냅샷을 한 번에 확보 (스트리밍 시작 전에 호출해 실패를 상태 코드로 돌려준다)"""
+    families: List[str] = []
+    for _, data, _ in items:
+        if data is None:
+            continue
+        for family in required_families(data):
+            if family not in families:
+                families.append(family)
+    if not families:
+        return {}
+    return await resolve_catalogs(families, store or CATALOG_STORE)
+
+
+async def stream_batch(
+    items: List[BatchItem],
+    catalogs: Dict[str, Optional[FamilyCatalog]],
+    started: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """입력 순서대로 NDJSON 줄(개행 포함)을 생성. started 는 처리량 계산 기준 시각(perf_counter)"""
+    started = started if started is not None else time.perf_counter()
+
+    chunks = _chunks(items, max(1, FINANCE_BATCH_CHUNK))
+    use_pool = len(items) >= FINANCE_BATCH_PROCESS_THRESHOLD and FINANCE_BATCH_WORKERS > 1 and len(chunks) > 1
+    errors = 0
+
+    if use_pool:
+        key, path = await asyncio.to_thread(_catalog_file, catalogs)
+        executor = _process_pool()
+        futures = []
+        try:
+            # 전부 제출해 두고 앞 청크부터 기다리면 순서를 지키면서도 워커는 계속 돈다
+            futures = [asyncio.wrap_future(executor.submit(_score_chunk_in_worker, chunk, key, path)) for chunk in chunks]
+            for future in futures:
+                block, failed = await future
+                errors += failed
+                yield block
+        except BrokenProcessPool:
+            _discard_pool()
+            raise
+        finally:
+            # 클라이언트가 끊겨 중간에 끝나면 아직 시작 안 한 청크는 공용 풀에서 빼낸다
+            for future in futures:
+                future.cancel()
+    else:
+        for chunk in chunks:
+            block, failed = await asyncio.to_thread(_score_lines, chunk, catalogs)
+            errors += failed
+            yield block
+
+    elapsed = time.perf_counter() - started
+    yield dumps(
+        {
+            "meta": {
+                "customers": len(items),
+                "errors": errors,
+                "elapsed_ms": round(elapsed * 1000, 1),
+                "customers_per_second": round(len(items) / elapsed, 1) if elapsed > 0 else None,
+                "workers": min(FINANCE_BATCH_WORKERS, len(chunks)) if use_pool else 1,
+                "catalog_versions": {f: c.version for f, c in catalogs.items() if c is not None},
+            }
+        }
+    ) + b"\n"
@@ -0,0 +1,508 @@
+"""Versioned Finlife catalog snapshots with precomputed rate leaderboards.
+
+상품군(적금/예금/대출)별 원본 응답을 받아올 때 한 번만 파싱/정렬해 두고,
+요청은 이 스냅샷의 앞부분만 훑는다.
+
+- 적금/예금: `save_trm` 별 버킷. 버킷 안 옵션은 최고금리 내림차순이고
+  가입한도(max_limit)·가입대상/경로는 상품 정보로 함께 붙어 있다.
+  버킷마다 양수 한도를 정렬해 두어 "이 금액으로 가입 가능한 옵션 수"를 bisect 로 센다.
+- 대출: 상품별 최저금리 옵션을 금리 오름차순으로 정렬한 리더보드.
+
+스냅샷은 불변이고 FINANCE_CATALOG_TTL 이 지나면 통째로 교체된다.
+버전은 원본 응답의 내용 해시라서, 갱신했는데 내용이 같으면 버전도 같다.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+from . import catalog_snapshot
+from .finlife_client import FinlifeClient
+from .single_flight import SingleFlight
+
+BANK_GROUP = "020000"
+FINANCE_CATALOG_TTL = float(os.getenv("FINANCE_CATALOG_TTL", "600"))  # seconds
+
+TERM_FAMILIES = ("saving", "deposit")
+LOAN_FAMILIES = ("credit", "mortgage", "rent")
+
+
+def _parse_float(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_int(value) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_currency(value) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^0-9.\-]", "", str(value))
+    if cleaned in {"", "-", ".", "-.", ".-"}:
+        return None
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def _index_options(option_list: List[Dict]) -> Dict[str, List[Dict]]:
+    mapping: Dict[str, List[Dict]] = {}
+    for opt in option_list:
+        prod = opt.get("fin_prdt_cd")
+        if not prod:
+            continue
+        mapping.setdefault(prod, []).append(opt)
+    return mapping
+
+
+def _loan_option_rate(family: str, opt: Dict) -> Optional[float]:
+    if family == "credit":
+        # crdt_lend_rate_type: A=대출금리, B=기준금리, C=가산금리 … 대출금리 행만 사용
+        if opt.get("crdt_lend_rate_type") not in (None, "", "A"):
+            return None
+        return _parse_float(opt.get("crdt_grad_avg"))
+    return _parse_float(opt.get("lend_rate_avg") or opt.get("lend_rate_min"))
+
+
+@dataclass(frozen=True)
+class Product:
+    code: str
+    company_name: Optional[str]
+    product_name: Optional[str]
+    join_way: Optional[str]
+    join_member: Optional[str]
+    description: Optional[str]
+    max_limit: Optional[float]
+
+    def accepts(self, amount: float) -> bool:
+        return not (self.max_limit and self.max_limit > 0 and amount > self.max_limit)
+
+
+@dataclass(frozen=True)
+class TermOption:
+    # ordinal: 원본 (baseList, optionList) 순회 순서. 동점일 때 기존 정렬 안정성을 재현한다.
+    ordinal: int
+    product: Product
+    term: int
+    top_rate: float
+    base_rate: Optional[float]
+
+
+@dataclass(frozen=True)
+class LoanOption:
+    product: Product
+    rate: float
+    rate_min: Optional[float]
+    rate_max: Optional[float]
+    rate_type: Optional[str]
+    repay_type: Optional[str]
+
+
+@dataclass
+class TermBucket:
+    term: int
+    options: List[TermOption] = field(default_factory=list)  # top_rate 내림차순
+    unlimited: int = 0
+    limits: List[float] = field(default_factory=list)  # 양수 max_limit 오름차순
+
+    def eligible_count(self, amount: float) -> int:
+        return self.unlimited + len(self.limits) - bisect.bisect_left(self.limits, amount)
+
+    def head(self, amount: float, k: int) -> List[TermOption]:
+        """가입 가능한 옵션 중 금리 상위 k개"""
+        picked: List[TermOption] = []
+        for opt in self.options:
+            if opt.product.accepts(amount):
+                picked.append(opt)
+                if len(picked) >= k:
+                    break
+        return picked
+
+
+@dataclass
+class FamilyCatalog:
+    family: str
+    version: str
+    fetched_at: float
+    base_count: int = 0
+    option_count: int = 0
+    products: Dict[str, Product] = field(default_factory=dict)
+    options_by_product: Dict[str, List[TermOption]] = field(default_factory=dict)
+    buckets: Dict[int, TermBucket] = field(default_factory=dict)
+    loan_board: List[LoanOption] = field(default_factory=list)  # 금리 오름차순
+
+    def eligible_count(self, amount: float) -> int:
+        return sum(b.eligible_count(amount) for b in self.buckets.values())
+
+    def heads(self, amount: float, k: int) -> Iterator[TermOption]:
+        for bucket in self.buckets.values():
+            yield from bucket.head(amount, k)
+
+
+def _content_version(raw: Dict[str, List[Dict]]) -> str:
+    payload = json.dumps(raw, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _product(base: Dict) -> Product:
+    return Product(
+        code=base["fin_prdt_cd"],
+        company_name=base.get("kor_co_nm"),
+        product_name=base.get("fin_prdt_nm"),
+        join_way=base.get("join_way"),
+        join_member=base.get("join_member"),
+        description=base.get("spcl_cnd") or base.get("etc_note"),
+        max_limit=_parse_currency(base.get("max_limit")),
+    )
+
+
+def _build_term_family(catalog: FamilyCatalog, raw: Dict[str, List[Dict]]) -> None:
+    options_by_code = _index_options(raw.get("optionList") or [])
+    ordinal = 0
+    for base in raw.get("baseList") or []:
+        if not base.get("fin_prdt_cd"):
+            continue
+        product = _product(base)
+        catalog.products.setdefault(product.code, product)
+        for opt in options_by_code.get(product.code) or []:
+            term = _parse_int(opt.get("save_trm"))
+            top_rate = _parse_float(opt.get("intr_rate2") or opt.get("intr_rate"))
+            if not term or term <= 0 or top_rate is None:
+                continue
+            entry = TermOption(ordinal, product, term, top_rate, _parse_float(opt.get("intr_rate")))
+            ordinal += 1
+            catalog.options_by_product.setdefault(product.code, []).append(entry)
+            bucket = catalog.buckets.setdefault(term, TermBucket(term))
+            bucket.options.append(entry)
+            if product.max_limit and product.max_limit > 0:
+                bucket.limits.append(product.max_limit)
+            else:
+                bucket.unlimited += 1
+    for bucket in catalog.buckets.values():
+        bucket.options.sort(key=lambda o: (-o.top_rate, o.ordinal))
+        bucket.limits.sort()
+
+
+def _build_loan_family(catalog: FamilyCatalog, raw: Dict[str, List[Dict]]) -> None:
+    for base in raw.get("baseList") or []:
+        if base.get("fin_prdt_cd"):
+            catalog.products[base["fin_prdt_cd"]] = _product(base)
+    # 상품별 최저금리 옵션 (같은 금리면 먼저 나온 옵션), 순서는 처음 등장한 순
+    best: Dict[str, LoanOption] = {}
+    for opt in raw.get("optionList") or []:
+        product = catalog.products.get(opt.get("fin_prdt_cd"))
+        rate = _loan_option_rate(catalog.family, opt)
+        if product is None or rate is None or rate <= 0:
+            continue
+        current = best.get(product.code)
+        if current is not None and round(current.rate, 3) <= rate:
+            continue
+        best[product.code] = LoanOption(
+            product=product,
+            rate=rate,
+            rate_min=_parse_float(opt.get("lend_rate_min")),
+            rate_max=_parse_float(opt.get("lend_rate_max")),
+            rate_type=opt.get("lend_rate_type_nm") or opt.get("crdt_lend_rate_type_nm"),
+            repay_type=opt.get("rpay_type_nm"),
+        )
+    catalog.loan_board = sorted(best.values(), key=lambda o: (round(o.rate, 3), o.rate))
+
+
+def build_catalog(family: str, raw: Dict[str, List[Dict]], fetched_at: Optional[float] = None) -> FamilyCatalog:
+    """원본 baseList/optionList → 불변 스냅샷 (CPU 작업이므로 호출 측에서 스레드로 넘긴다)"""
+    catalog = FamilyCatalog(
+        family=family,
+        version=_content_version(raw),
+        fetched_at=fetched_at if fetched_at is not None else time.time(),
+        base_count=len(raw.get("baseList") or []),
+        option_count=len(raw.get("optionList") or []),
+    )
+    if family in LOAN_FAMILIES:
+        _build_loan_family(catalog, raw)
+    else:
+        _build_term_family(catalog, raw)
+    return catalog
+
+
+_PRODUCT_STRINGS = ("code", "company_name", "product_name", "join_way", "join_member", "description")
+
+
+def catalog_tables(catalog: FamilyCatalog) -> Dict[str, Dict[str, catalog_snapshot.Column]]:
+    """스냅샷 → 컬럼 테이블 (catalog_snapshot 형식). 옵션은 버킷 순서, 버킷 안에서는 정렬된 순서로 적는다."""
+    products = list(catalog.products.values())
+    index = {p.code: i for i, p in enumerate(products)}
+    tables: Dict[str, Dict[str, catalog_snapshot.Column]] = {
+        "products": {
+            **{name: ("s", [getattr(p, name) for p in products]) for name in _PRODUCT_STRINGS},
+            "max_limit": ("f8", [p.max_limit for p in products]),
+        }
+    }
+    options = [opt for bucket in catalog.buckets.values() for opt in bucket.options]
+    tables["term_options"] = {
+        "ordinal": ("i4", [o.ordinal for o in options]),
+        "product": ("i4", [index[o.product.code] for o in options]),
+        "term": ("i4", [o.term for o in options]),
+        "top_rate": ("f8", [o.top_rate for o in options]),
+        "base_rate": ("f8", [o.base_rate for o in options]),
+    }
+    board = catalog.loan_board
+    tables["loan_board"] = {
+        "product": ("i4", [index[o.product.code] for o in board]),
+        "rate": ("f8", [o.rate for o in board]),
+        "rate_min": ("f8", [o.rate_min for o in board]),
+        "rate_max": ("f8", [o.rate_max for o in board]),
+        "rate_type": ("s", [o.rate_type for o in board]),
+        "repay_type": ("s", [o.repay_type for o in board]),
+    }
+    return tables
+
+
+def catalog_meta(catalog: FamilyCatalog) -> Dict:
+    return {
+        "family": catalog.family,
+        "version": catalog.version,
+        "fetched_at": catalog.fetched_at,
+        "base_count": catalog.base_count,
+        "option_count": catalog.option_count,
+        "bucket_terms": list(catalog.buckets),
+    }
+
+
+def catalog_from_snapshot(snap: catalog_snapshot.Snapshot) -> FamilyCatalog:
+    """catalog_tables 로 쓴 스냅샷을 다시 FamilyCatalog 로 (정렬/파싱 없이 순서대로 채운다)"""
+    meta = snap.meta
+    catalog = FamilyCatalog(
+        family=meta["family"],
+        version=meta["version"],
+        fetched_at=meta["fetched_at"],
+        base_count=meta["base_count"],
+        option_count=meta["option_count"],
+    )
+    columns = {name: snap.strings("products", name) for name in _PRODUCT_STRINGS}
+    limits = snap.floats("products", "max_limit")
+    products = [
+        Product(**{name: columns[name][i] for name in _PRODUCT_STRINGS}, max_limit=limits[i])
+        for i in range(snap.rows("products"))
+    ]
+    catalog.products = {p.code: p for p in products}
+
+    buckets = {term: TermBucket(term) for term in meta["bucket_terms"]}
+    options = [
+        TermOption(ordinal, products[product], term, top_rate, base_rate)
+        for ordinal, product, term, top_rate, base_rate in zip(
+            snap.column("term_options", "ordinal"),
+            snap.column("term_options", "product"),
+            snap.column("term_options", "term"),
+            snap.column("term_options", "top_rate"),
+            snap.floats("term_options", "base_rate"),
+        )
+    ]
+    for opt in options:
+        bucket = buckets[opt.term]
+        bucket.options.append(opt)
+        if opt.product.max_limit and opt.product.max_limit > 0:
+            bucket.limits.append(opt.product.max_limit)
+        else:
+            bucket.unlimited += 1
+    for bucket in buckets.values():
+        bucket.limits.sort()
+    catalog.buckets = buckets
+    for opt in sorted(options, key=lambda o: o.ordinal):
+        catalog.options_by_product.setdefault(opt.product.code, []).append(opt)
+
+    catalog.loan_board = [
+        LoanOption(products[product], rate, rate_min, rate_max, rate_type, repay_type)
+        for product, rate, rate_min, rate_max, rate_type, repay_type in zip(
+            snap.column("loan_board", "product"),
+            snap.column("loan_board", "rate"),
+            snap.floats("loan_board", "rate_min"),
+            snap.floats("loan_board", "rate_max"),
+            snap.strings("loan_board", "rate_type"),
+            snap.strings("loan_board", "repay_type"),
+        )
+    ]
+    return catalog
+
+
+def _family_fetchers(client: FinlifeClient) -> Dict[str, Callable[[str], Awaitable[Dict[str, List[Dict]]]]]:
+    return {
+        "saving": client.fetch_saving_products,
+        "deposit": client.fetch_deposit_products,
+        "credit": client.fetch_credit_loans,
+        "mortgage": client.fetch_mortgage_loans,
+        "rent": client.fetch_rent_loans,
+    }
+
+
+class FinanceCatalogStore:
+    """상품군별 최신 스냅샷. TTL 이 지나면 다시 받아 재구성하고, 갱신 실패 시 이전 스냅샷을 계속 쓴다.
+
+    CATALOG_SNAPSHOT_DIR 이 설정되어 있으면 갱신한 스냅샷을 finance-<family>.snap 로 공유하고,
+    다른 워커가 더 새 파일을 쓰면 업스트림을 부르지 않고 그 파일로 교체한다.
+    """
+
+    def __init__(self, client: Optional[FinlifeClient] = None, ttl: float = FINANCE_CATALOG_TTL) -> None:
+        self._client = client
+        self.ttl = ttl
+        self._catalogs: Dict[str, FamilyCatalog] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._origin: Dict[str, str] = {}
+        self._watchers: Dict[str, catalog_snapshot.Watcher] = {}
+        self._refreshing = SingleFlight("finance_catalog")
+
+    @property
+    def client(self) -> FinlifeClient:
+        if self._client is None:
+            self._client = FinlifeClient()
+        return self._client
+
+    def _fresh(self, family: str) -> Optional[FamilyCatalog]:
+        catalog = self._catalogs.get(family)
+        if catalog is not None and time.monotonic() - self._loaded_at[family] < self.ttl:
+            return catalog
+        return None
+
+    def _watcher(self, family: str) -> catalog_snapshot.Watcher:
+        watcher = self._watchers.get(family)
+        if watcher is None:
+            watcher = self._watchers[family] = catalog_snapshot.Watcher(f"finance-{family}")
+        return watcher
+
+    async def get(self, family: str) -> FamilyCatalog:
+        watcher = self._watcher(family)
+        if watcher.changed():
+            await self._adopt(family, watcher)
+        catalog = self._fresh(family)
+        if catalog is not None:
+            return catalog
+        # 만료 직후 동시에 들어온 요청은 한 번의 조회/재구성을 함께 기다린다
+        return await self._refreshing.do(family, lambda: self._refresh(family, watcher))
+
+    async def refresh(self, family: str) -> FamilyCatalog:
+        """TTL 과 관계없이 지금 다시 받아 교체 (갱신 작업용).
+
+        새 카탈로그가 다 만들어질 때까지 요청은 이전 스냅샷을 그대로 쓴다. 조회가 실패하면 예외를 올리고
+        이전 스냅샷은 남겨 둔다 (비워 두면 장애 중에 요청마다 업스트림을 다시 부르게 된다).
+        """
+        watcher = self._watcher(family)
+        return await self._refreshing.do(("force", family), lambda: self._refresh(family, watcher, keep_stale=False))
+
+    async def _refresh(self, family: str, watcher: catalog_snapshot.Watcher, keep_stale: bool = True) -> FamilyCatalog:
+        try:
+            raw = await _family_fetchers(self.client)[family](BANK_GROUP)
+        except Exception:
+            stale = self._catalogs.get(family)
+            if stale is None or not keep_stale:
+                raise
+            return stale
+        catalog = await asyncio.to_thread(build_catalog, family, raw)
+        previous = self._catalogs.get(family)
+        self._catalogs[family] = catalog
+        self._loaded_at[family] = time.monotonic()
+        self._origin[family] = "upstream"
+        if catalog_snapshot.enabled():
+            watcher.key = await asyncio.to_thread(self._share, catalog) or watcher.key
+        if family in TERM_FAMILIES and (previous is None or previous.version != catalog.version):
+            await self._record_history(family, raw)
+        await self._build_facets(catalog)
+        return catalog
+
+    @staticmethod
+    def _share(catalog: FamilyCatalog) -> Optional[catalog_snapshot.SnapshotKey]:
+        try:
+            return catalog_snapshot.write(f"finance-{catalog.family}", catalog_meta(catalog), catalog_tables(catalog))
+        except Exception as exc:  # pragma: no cover - 디스크 오류는 공유만 건너뛴다
+            print(f"[FinanceCatalog] snapshot not written for {catalog.family}: {exc}")
+            return None
+
+    @staticmethod
+    def _load_shared(family: str):
+        snap = catalog_snapshot.open_snapshot(f"finance-{family}")
+        if snap is None:
+            return None
+        with snap:
+            return catalog_from_snapshot(snap), snap.meta["written_at"], snap.key
+
+    async def _adopt(self, family: str, watcher: catalog_snapshot.Watcher) -> None:
+        """다른 워커가 쓴 스냅샷 파일로 교체. 파일의 작성 시각을 기준으로 TTL 을 센다."""
+        try:
+            loaded = await asyncio.to_thread(self._load_shared, family)
+        except Exception as exc:
+            print(f"[FinanceCatalog] snapshot for {family} not loaded: {exc}")
+            return
+        if loaded is None:
+            return
+        catalog, written_at, watcher.key = loaded
+        loaded_at = time.monotonic() - max(0.0, time.time() - written_at)
+        # 이미 가진 것보다 오래된 파일로 되돌리지 않는다
+        if family in self._catalogs and self._loaded_at[family] >= loaded_at:
+            return
+        self._catalogs[family] = catalog
+        self._loaded_at[family] = loaded_at
+        self._origin[family] = "snapshot"
+        await self._build_facets(catalog)
+
+    @staticmethod
+    async def _record_history(family: str, raw: Dict[str, List[Dict]]) -> None:
+        # 금리 이력 적재 실패가 추천 응답을 막지 않도록 한다 (rate_history 는 이 모듈을 import 하므로 지연 import)
+        from .rate_history import record_snapshot
+
+        try:
+            await asyncio.to_thread(record_snapshot, family, raw)
+        except Exception as exc:  # pragma: no cover - DB 미초기화 등
+            print(f"[FinanceCatalog] rate history not recorded for {family}: {exc}")
+
+    @staticmethod
+    async def _build_facets(catalog: FamilyCatalog) -> None:
+        # 상품 검색(/finance/products/search) 패싯 비트맵을 교체 시점에 미리 만든다 (finance_search 도 지연 import)
+        from .finance_search import facet_index
+
+        try:
+            await facet_index(catalog)
+        except Exception as exc:  # pragma: no cover - 검색 색인 실패가 추천 응답을 막지 않도록
+            print(f"[FinanceCatalog] search index not built for {catalog.family}: {exc}")
+
+    def invalidate(self, family: Optional[str] = None) -> None:
+        for key in [family] if family else list(self._catalogs):
+            self._catalogs.pop(key, None)
+            self._loaded_at.pop(key, None)
+
+    def status(self) -> Dict[str, Dict]:
+        now = time.monotonic()
+        return {
+            family: {
+                "version": catalog.version,
+                "fetched_at": catalog.fetched_at,
+                "age_seconds": round(now - self._loaded_at[family], 1),
+                "products": len(catalog.products),
+                "terms": sorted(catalog.buckets),
+                "origin": self._origin.get(family, "upstream"),
+            }
+            for family, catalog in self._catalogs.items()
+        }
+
+
+CATALOG_STORE = FinanceCatalogStore()
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
-import re
+import asyncio
 from typing import Dict, List, Optional
 
+from .finance_catalog import (
+    CATALOG_STORE,
+    FamilyCatalog,
+    FinanceCatalogStore,
+    TermOption,
+    _parse_currency,
+)
 from .finlife_client import FinlifeClient
 
 
-BANK_GROUP = "020000"
 DEFAULT_TERM = 12
+DEPOSIT_TERM = 12
+# 만기 버킷/대출 리더보드마다 이만큼만 점수를 매긴다: best 1 + alternatives 3
+HEAD_SIZE = 4
+
+# 대출 용도(자유 입력) → 상품군. 매칭이 없으면 신용대출로 본다.
+LOAN_FAMILY_KEYWORDS = (
+    ("rent", ("전세", "월세", "임차", "보증금")),
+    ("mortgage", ("주택", "담보", "아파트", "주담대")),
+)
+LOAN_FAMILY_LABELS = {"credit": "신용대출", "mortgage": "주택담보대출", "rent": "전세자금대출"}
 
 
 class AssetFormData(Dict[str, object]):
@@ -21,52 +37,6 @@ def _compute_interest(principal: float, rate_percent: float, months: int) -> flo
     return round(principal * rate * (months / 12), 2)
 
 
-def _parse_float(value) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    try:
-        return float(str(value).strip())
-    except (ValueError, TypeError):
-        return None
-
-
-def _parse_int(value) -> Optional[int]:
-    if value is None:
-        return None
-    if isinstance(value, int):
-        return value
-    try:
-        return int(str(value).strip())
-    except (ValueError, TypeError):
-        return None
-
-
-def _parse_currency(value) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    cleaned = re.sub(r"[^0-9.\-]", "", str(value))
-    if cleaned in {"", "-", ".", "-.", ".-"}:
-        return None
-    try:
-        return float(cleaned)
-    except ValueError:
-        return None
-
-
-def _index_options(option_list: List[Dict]) -> Dict[str, List[Dict]]:
-    mapping: Dict[str, List[Dict]] = {}
-    for opt in option_list:
-        prod = opt.get("fin_prdt_cd")
-        if not prod:
-            continue
-        mapping.setdefault(prod, []).append(opt)
-    return mapping
-
-
 def _analysis_profile(data: AssetFormData) -> Dict[str, float]:
     savings = data.get("savings") or {}
     principal = float(savings.get("principal") or 0)
@@ -111,6 +81,7 @@ def _analysis_profile(data: AssetFormData) -> Dict[str, float]:
         "monthly_income": monthly_income,
         "household_size": household_size,
         "income_per_capita": income_per_capita,
+        "deposits": deposits,
         "total_assets": total_assets,
         "liquid_assets": liquid_assets,
         "liquidity_ratio": liquidity_ratio,
@@ -210,15 +181,72 @@ def _build_reasons(
     return reasons[:5]
 
 
-async def build_finance_switching(data: AssetFormData, client: Optional[FinlifeClient] = None) -> Dict:
-    client = client or FinlifeClient()
-    profile = _analysis_profile(data)
+def _saving_candidate(opt: TermOption, profile: Dict[str, float], target_term: int) -> Dict:
+    principal = profile["principal"]
+    annual_rate = profile["annual_rate"]
+    penalty_amount = profile["penalty_amount"]
+    term = opt.term
+    top_rate = opt.top_rate
+    product = opt.product
+
+    interest = _compute_interest(principal, top_rate, term)
+    baseline_interest = _compute_interest(principal, annual_rate, term)
+    interest_gain = round(interest - baseline_interest, 2)
+    net_gain = round(interest_gain - penalty_amount, 2)
+    monthly_gain = round(interest_gain / term, 2) if term else 0.0
+    rate_gain = round(top_rate - annual_rate, 3)
+
+    match_score = _compute_match_score(
+        rate_gain,
+        term,
+        target_term,
+        profile["liquidity_ratio"],
+        profile["debt_ratio"],
+        net_gain,
+        principal,
+    )
+    reasons = _build_reasons(
+        rate_gain,
+        term,
+        target_term,
+        interest_gain,
+        net_gain,
+        penalty_amount,
+        profile["liquidity_ratio"],
+        product.join_way,
+    )
+
+    return {
+        "company_name": product.company_name,
+        "product_name": product.product_name,
+        "fin_prdt_cd": product.code,
+        "rate": round(top_rate, 3),
+        "base_rate": round(opt.base_rate, 3) if opt.base_rate is not None else None,
+        "interest": round(interest, 2),
+        "interest_gain": interest_gain,
+        "monthly_gain": monthly_gain,
+        "penalty": penalty_amount,
+        "net_gain": net_gain,
+        "rate_gain": rate_gain,
+        "save_term": term,
+        "description": product.description,
+        "join_method": product.join_way,
+        "join_member": product.join_member,
+        "max_limit": product.max_limit,
+        "match_score": int(round(match_score)),
+        "reasons": reasons,
+        "action": None,
+    }
+
+
+def _build_saving_section(data: AssetFormData, profile: Dict[str, float], catalog: FamilyCatalog) -> Optional[Dict]:
+    """적금 갈아타기.
 
-    saving_data = await client.fetch_saving_products(BANK_GROUP)
-    base_list = saving_data.get("baseList", [])
-    option_list = saving_data.get("optionList", [])
-    if not base_list or not option_list:
-        return {"saving": None}
+    같은 만기 안에서는 점수·순이익이 금리에 대해 단조 증가하므로, 만기 버킷마다
+    가입 가능한 상위 HEAD_SIZE 개만 점수를 매겨도 전체 정렬의 상위 4개와 같다.
+    """
+    if not catalog.base_count or not catalog.option_count:
+        return None
 
     principal = profile["principal"]
     annual_rate = profile["annual_rate"]
@@ -230,87 +258,9 @@ async def build_finance_switching(data: AssetFormData, client: Optional[FinlifeC
     current_interest_remaining = _compute_interest(principal, annual_rate, months_remaining) if months_remaining else 0.0
     projected_current_interest = _compute_interest(principal, annual_rate, target_term)
 
-    options_by_product = _index_options(option_list)
-
-    candidates: List[Dict] = []
-    for base in base_list:
-        prod_code = base.get("fin_prdt_cd")
-        if not prod_code:
-            continue
-
-        max_limit = _parse_currency(base.get("max_limit"))
-        if max_limit and max_limit > 0 and principal > max_limit:
-            continue
-
-        options = options_by_product.get(prod_code) or []
-        for opt in options:
-            term = _parse_int(opt.get("save_trm"))
-            if not term or term <= 0:
-                continue
-
-            top_rate = _parse_float(opt.get("intr_rate2") or opt.get("intr_rate"))
-            base_rate = _parse_float(opt.get("intr_rate"))
-            if top_rate is None:
-                continue
-
-            interest = _compute_interest(principal, top_rate, term)
-            baseline_interest = _compute_interest(principal, annual_rate, term)
-            interest_gain = round(interest - baseline_interest, 2)
-            net_gain = round(interest_gain - penalty_amount, 2)
-            monthly_gain = round(interest_gain / term, 2) if term else 0.0
-            rate_gain = round(top_rate - annual_rate, 3)
-
-            match_score = _compute_match_score(
-                rate_gain,
-                term,
-                target_term,
-                profile["liquidity_ratio"],
-                profile["debt_ratio"],
-                net_gain,
-                principal,
-            )
-            reasons = _build_reasons(
-                rate_gain,
-                term,
-                target_term,
-                interest_gain,
-                net_gain,
-                penalty_amount,
-                profile["liquidity_ratio"],
-                base.get("join_way"),
-            )
-
-            candidates.append(
-                {
-                    "company_name": base.get("kor_co_nm"),
-                    "product_name": base.get("fin_prdt_nm"),
-                    "fin_prdt_cd": prod_code,
-                    "rate": round(top_rate, 3),
-                    "base_rate": round(base_rate, 3) if base_rate is not None else None,
-                    "interest": round(interest, 2),
-                    "interest_gain": interest_gain,
-                    "monthly_gain": monthly_gain,
-                    "penalty": penalty_amount,
-                    "net_gain": net_gain,
-                    "rate_gain": rate_gain,
-                    "save_term": term,
-                    "description": base.get("spcl_cnd") or base.get("etc_note"),
-                    "join_method": base.get("join_way"),
-                    "join_member": base.get("join_member"),
-                    "max_limit": max_limit,
-                    "match_score": int(round(match_score)),
-                    "reasons": reasons,
-                }
-            )
-
-    candidates.sort(
-        key=lambda x: (
-            x["match_score"],
-            x["net_gain"],
-            x["rate"],
-        ),
-        reverse=True,
-    )
+    scored = [(_saving_candidate(opt, profile, target_term), opt.ordinal) for opt in catalog.heads(principal, HEAD_SIZE)]
+    scored.sort(key=lambda c: (-c[0]["match_score"], -c[0]["net_gain"], -c[0]["rate"], c[1]))
+    candidates = [c for c, _ in scored[:HEAD_SIZE]]
 
     best = candidates[0] if candidates else None
     alternatives = candidates[1:4] if candidates else []
@@ -320,7 +270,7 @@ async def build_finance_switching(data: AssetFormData, client: Optional[FinlifeC
         best.update({"action": action})
 
     summary = {
-        "recommendation_count": len(candidates),
+        "recommendation_count": catalog.eligible_count(principal),
         "decision": "추천할 상품이 부족합니다" if not best else ("갈아타기 검토 권장" if best["net_gain"] > 0 else "현재 상품 유지 권장"),
         "net_gain": best["net_gain"] if best else 0.0,
         "penalty_amount": penalty_amount,
@@ -331,20 +281,213 @@ async def build_finance_switching(data: AssetFormData, client: Optional[FinlifeC
     }
 
     return {
-        "saving": {
-            "current": {
-                "product_name": data.get("savings", {}).get("productName") or "현재 적금",
-                "annual_rate": round(annual_rate, 3),
-                "months_remaining": months_remaining,
-                "principal": principal,
-                "expected_interest": round(current_interest_remaining, 2),
-                "expected_interest_same_term": round(projected_current_interest, 2),
-                "penalty_rate": penalty_rate,
-                "penalty_amount": penalty_amount,
-                "target_term": target_term,
-            },
-            "best": best,
-            "alternatives": alternatives,
-            "summary": summary,
-        }
+        "current": {
+            "product_name": data.get("savings", {}).get("productName") or "현재 적금",
+            "annual_rate": round(annual_rate, 3),
+            "months_remaining": months_remaining,
+            "principal": principal,
+            "expected_interest": round(current_interest_remaining, 2),
+            "expected_interest_same_term": round(projected_current_interest, 2),
+            "penalty_rate": penalty_rate,
+            "penalty_amount": penalty_amount,
+            "target_term": target_term,
+        },
+        "best": best,
+        "alternatives": alternatives,
+        "summary": summary,
+    }
+
+
+def _deposit_candidate(opt: TermOption, amount: float) -> Dict:
+    product = opt.product
+    interest = _compute_interest(amount, opt.top_rate, opt.term)
+    reasons = [f"{opt.term}개월 최고 연 {opt.top_rate:.2f}%", f"예상 이자 {interest:,.0f}원"]
+    if product.join_way:
+        reasons.append(f"가입경로: {product.join_way.strip()}")
+    return {
+        "company_name": product.company_name,
+        "product_name": product.product_name,
+        "fin_prdt_cd": product.code,
+        "rate": round(opt.top_rate, 3),
+        "base_rate": round(opt.base_rate, 3) if opt.base_rate is not None else None,
+        "save_term": opt.term,
+        "interest": interest,
+        "description": product.description,
+        "join_method": product.join_way,
+        "join_member": product.join_member,
+        "max_limit": product.max_limit,
+        "reasons": reasons,
     }
+
+
+def _build_deposit_section(profile: Dict[str, float], catalog: FamilyCatalog) -> Optional[Dict]:
+    """보유 예금(deposits)을 어디에 둘지: 한도 내 예금 옵션을 최고금리순으로"""
+    amount = profile["deposits"]
+    if amount <= 0 or not catalog.base_count or not catalog.option_count:
+        return None
+
+    # 금리 우선, 같은 금리면 기준 만기(12개월)에 가까운 상품
+    heads = sorted(
+        catalog.heads(amount, HEAD_SIZE),
+        key=lambda o: (-round(o.top_rate, 3), abs(o.term - DEPOSIT_TERM), o.ordinal),
+    )
+    candidates = [_deposit_candidate(opt, amount) for opt in heads[:HEAD_SIZE]]
+    best = candidates[0] if candidates else None
+    return {
+        "amount": amount,
+        "target_term": DEPOSIT_TERM,
+        "best": best,
+        "alternatives": candidates[1:4],
+        "summary": {
+            "recommendation_count": catalog.eligible_count(amount),
+            "expected_interest": _compute_interest(amount, best["rate"], DEPOSIT_TERM) if best else 0.0,
+            "decision": "예치 추천 상품이 없습니다" if not best else f"{best['company_name']} {best['product_name']} 예치 검토",
+        },
+    }
+
+
+def _loan_family(purpose: Optional[str]) -> str:
+    text = (purpose or "").replace(" ", "")
+    for family, keywords in LOAN_FAMILY_KEYWORDS:
+        if any(k in text for k in keywords):
+            return family
+    return "credit"
+
+
+def _normalized_loans(data: AssetFormData) -> List[Dict]:
+    loans: List[Dict] = []
+    for loan in data.get("loans") or []:
+        if not isinstance(loan, dict):
+            continue
+        amount = _parse_currency(loan.get("amount")) or 0.0
+        if amount <= 0:
+            continue
+        loans.append(
+            {
+                "lender": loan.get("lender"),
+                "purpose": loan.get("purpose"),
+                "family": _loan_family(loan.get("purpose")),
+                "amount": amount,
+                "annual_rate": round(float(loan.get("annualRate") or 0) * 100, 3),
+                "remaining_months": int(loan.get("remainingMonths") or 0),
+            }
+        )
+    return loans
+
+
+def _build_loan_section(loan: Dict, catalog: FamilyCatalog) -> Dict:
+    """대출 1건의 대환 후보: 같은 상품군에서 금리가 낮은 순 (catalog.loan_board 앞부분)"""
+    amount = loan["amount"]
+    current_rate = loan["annual_rate"]
+    months = loan["remaining_months"] or DEFAULT_TERM
+    current_interest = _compute_interest(amount, current_rate, months)
+
+    candidates: List[Dict] = []
+    for opt in catalog.loan_board[:HEAD_SIZE]:
+        rate = opt.rate
+        interest = _compute_interest(amount, rate, months)
+        saving = round(current_interest - interest, 2)
+        gap = current_rate - rate
+        if not current_rate:
+            reasons = [f"연 {rate:.2f}%"]
+        elif gap > 0:
+            reasons = [f"금리 -{gap:.2f}%p 인하"]
+        else:
+            reasons = [f"금리 +{abs(gap):.2f}%p"]
+        if saving > 0:
+            reasons.append(f"잔여 {months}개월 이자 -{saving:,.0f}원")
+        candidates.append(
+            {
+                "company_name": opt.product.company_name,
+                "product_name": opt.product.product_name,
+                "fin_prdt_cd": opt.product.code,
+                "rate": round(rate, 3),
+                "rate_min": opt.rate_min,
+                "rate_max": opt.rate_max,
+                "rate_type": opt.rate_type,
+                "repay_type": opt.repay_type,
+                "interest": interest,
+                "interest_saving": saving,
+                "reasons": reasons,
+            }
+        )
+
+    best = candidates[0] if candidates else None
+    if not best:
+        decision = "비교 가능한 대환 상품이 없습니다"
+    elif current_rate and best["interest_saving"] > 0:
+        decision = "대환 검토 권장"
+    else:
+        decision = "현재 대출 유지 권장"
+    return {
+        **loan,
+        "family_label": LOAN_FAMILY_LABELS[loan["family"]],
+        "current_interest": current_interest,
+        "best": best,
+        "alternatives": candidates[1:4],
+        "decision": decision,
+    }
+
+
+def required_families(data: AssetFormData) -> List[str]:
+    """이 입력을 채점하는 데 필요한 상품군 (적금은 항상, 예금은 예치금이 있을 때, 대출은 용도별)"""
+    families = ["saving"]
+    if _analysis_profile(data)["deposits"] > 0:
+        families.append("deposit")
+    for loan in _normalized_loans(data):
+        if loan["family"] not in families:
+            families.append(loan["family"])
+    return families
+
+
+def score_switching(data: AssetFormData, catalogs: Dict[str, Optional[FamilyCatalog]]) -> Dict:
+    """이미 확보한 스냅샷으로 한 명을 채점 (I/O 없음, 배치/프로세스 풀에서도 그대로 쓴다).
+
+    catalogs 에 없는(또는 None 인) 상품군의 섹션은 비운다.
+    """
+    profile = _analysis_profile(data)
+    saving_catalog = catalogs.get("saving")
+    deposit_catalog = catalogs.get("deposit")
+
+    loans: List[Dict] = []
+    for loan in _normalized_loans(data):
+        catalog = catalogs.get(loan["family"])
+        if catalog is not None:
+            loans.append(_build_loan_section(loan, catalog))
+
+    return {
+        "saving": _build_saving_section(data, profile, saving_catalog) if saving_catalog else None,
+        "deposit": _build_deposit_section(profile, deposit_catalog) if deposit_catalog else None,
+        "loans": loans,
+    }
+
+
+async def resolve_catalogs(families: List[str], store: FinanceCatalogStore) -> Dict[str, Optional[FamilyCatalog]]:
+    """필요한 상품군 스냅샷을 동시에 확보. 적금 실패는 전파하고 나머지는 None 으로 둔다."""
+    results = await asyncio.gather(*(store.get(f) for f in families), return_exceptions=True)
+    catalogs: Dict[str, Optional[FamilyCatalog]] = {}
+    for family, result in zip(families, results):
+        if isinstance(result, BaseException):
+            if family == "saving":
+                raise result
+            result = None
+        catalogs[family] = result
+    return catalogs
+
+
+async def build_finance_switching(
+    data: AssetFormData,
+    client: Optional[FinlifeClient] = None,
+    store: Optional[FinanceCatalogStore] = None,
+) -> Dict:
+    """적금 갈아타기 + 예금 예치 + 대출 대환 추천.
+
+    필요한 상품군 스냅샷(finance_catalog)만 동시에 확보한 뒤 score_switching 으로 채점한다.
+    스냅샷이 TTL 안에 있으면 업스트림 호출 없이 리더보드 앞부분만 본다.
+    적금 조회 실패는 예외로 전파하고, 나머지 상품군은 실패 시 해당 섹션만 비운다.
+    client 만 넘기면 캐시를 공유하지 않는 일회용 스토어를 쓴다.
+    """
+    if store is None:
+        store = CATALOG_STORE if client is None else FinanceCatalogStore(client)
+    catalogs = await resolve_catalogs(required_families(data), store)
+    return score_switching(data, catalogs)
@@ -0,0 +1,284 @@
+"""Faceted product search over the Finlife catalog snapshots (bitmap facets).
+
+상품군 스냅샷(FamilyCatalog)이 바뀔 때 한 번 색인을 만들고, 질의는 정수 비트 연산만 한다.
+
+- 행: 적금/예금은 (상품, 만기) 옵션, 대출은 상품별 최저금리 옵션(loan_board).
+  행 번호를 금리 오름차순으로 매겨서 금리 범위는 연속된 비트 구간 하나이고, 결과도 비트 순서대로 읽으면 금리순이다.
+- 비트맵: 파이썬 int 하나가 행 집합. 패싯 값(회사, 만기, 가입경로, 가입대상)별과 상품명 1·2글자 n-gram 별로 미리 만든다.
+  가입경로(join_way)는 "영업점,인터넷,스마트폰" 처럼 여러 값이라 값마다 나눠 넣는다.
+- 필터: 같은 패싯 안의 여러 값은 OR, 패싯끼리는 AND. 상품명(공백 무시, 대소문자 무시)은 n-gram 비트맵 AND 로
+  후보를 만들고, 3글자 이상이면 후보 상품명만 실제 부분 문자열인지 확인해 아닌 행을 뺀다.
+- 패싯 개수는 그 패싯 자신의 필터만 빼고 센다(disjunctive). 회사 하나를 골라도 다른 회사를 골랐을 때의 결과 수가 보인다.
+"""
+import asyncio
+import bisect
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .finance_catalog import LOAN_FAMILIES, FamilyCatalog, LoanOption, Product, TermOption
+
+FACETS = ("company", "term", "join_way", "join_member")
+FACET_VALUES_LIMIT = 50  # values returned per facet (count desc)
+
+Entry = Union[TermOption, LoanOption]
+FacetValue = Union[str, int]
+
+_popcount = getattr(int, "bit_count", None) or (lambda mask: bin(mask).count("1"))
+
+
+def _normalize(text: Optional[str]) -> str:
+    return "".join((text or "").lower().split())
+
+
+def _grams(text: str) -> Iterable[str]:
+    """1글자 + 2글자 n-gram (중복 제거)"""
+    return set(text) | {text[i : i + 2] for i in range(len(text) - 1)}
+
+
+def _join_ways(value: Optional[str]) -> List[str]:
+    return [w.strip() for w in (value or "").replace("/", ",").split(",") if w.strip()]
+
+
+def _bitmap(positions: Iterable[int], size: int) -> int:
+    # 1 << i 를 하나씩 OR 하면 큰 int 를 매번 새로 만들므로 바이트 배열에 찍고 한 번에 변환한다
+    buf = bytearray((size + 7) // 8)
+    for i in positions:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+# 바이트 값 → 켜진 비트 위치 (오름차순)
+_BYTE_BITS = [tuple(b for b in range(8) if byte >> b & 1) for byte in range(256)]
+_BYTE_BITS_DESC = [bits[::-1] for bits in _BYTE_BITS]
+
+
+def _bits(mask: int, size: int, descending: bool = False, skip: int = 0) -> Iterator[int]:
+    """mask 의 켜진 비트 위치 (오름차순 또는 내림차순). 앞의 skip 개는 바이트 단위로 건너뛰고, 필요한 만큼만 읽는다."""
+    data = mask.to_bytes((size + 7) // 8 or 1, "little")
+    table = _BYTE_BITS_DESC if descending else _BYTE_BITS
+    for i in (range(len(data) - 1, -1, -1) if descending else range(len(data))):
+        byte = data[i]
+        if not byte:
+            continue
+        bits = table[byte]
+        if skip >= len(bits):
+            skip -= len(bits)
+            continue
+        base = i << 3
+        for b in bits[skip:]:
+            yield base | b
+        skip = 0
+
+
+def _range_mask(lo: int, hi: int) -> int:
+    """비트 lo 이상 hi 미만"""
+    return (1 << hi) - (1 << lo) if hi > lo else 0
+
+
+def _entry_row(family: str, entry: Entry) -> Dict[str, Any]:
+    product: Product = entry.product
+    row = {
+        "family": family,
+        "fin_prdt_cd": product.code,
+        "company_name": product.company_name,
+        "product_name": product.product_name,
+        "join_way": product.join_way,
+        "join_member": product.join_member,
+        "max_limit": product.max_limit,
+    }
+    if isinstance(entry, TermOption):
+        row.update(term=entry.term, rate=entry.top_rate, base_rate=entry.base_rate)
+    else:
+        row.update(
+            term=None,
+            rate=entry.rate,
+            rate_min=entry.rate_min,
+            rate_max=entry.rate_max,
+            rate_type=entry.rate_type,
+            repay_type=entry.repay_type,
+        )
+    return row
+
+
+class FacetIndex:
+    """FamilyCatalog 하나에 대한 패싯/상품명 비트맵 (catalog 와 함께 불변)"""
+
+    def __init__(self, catalog: FamilyCatalog) -> None:
+        self.catalog = catalog
+        self.family = catalog.family
+        self.version = catalog.version
+        if catalog.family in LOAN_FAMILIES:
+            entries: List[Entry] = list(catalog.loan_board)
+            rates = [o.rate for o in catalog.loan_board]
+        else:
+            # 버킷 안은 금리 내림차순이므로 전체를 금리 오름차순으로 다시 정렬 (동점은 원본 순서)
+            options = sorted(
+                (o for bucket in catalog.buckets.values() for o in bucket.options),
+                key=lambda o: (o.top_rate, -o.ordinal),
+            )
+            entries, rates = list(options), [o.top_rate for o in options]
+        self.entries = entries
+        self.rates = rates
+        self.size = len(entries)
+        self.all = _range_mask(0, self.size)
+
+        positions: Dict[str, Dict[FacetValue, List[int]]] = {facet: {} for facet in FACETS}
+        gram_rows: Dict[str, List[int]] = {}
+        name_rows: Dict[str, List[int]] = {}
+        # 적금/예금은 한 상품이 만기마다 여러 행이므로 상품 단위로 행 번호를 모은 뒤 값별로 펼친다
+        product_rows: Dict[str, List[int]] = {}
+        products: Dict[str, Product] = {}
+        term_rows = positions["term"]
+        for i, entry in enumerate(entries):
+            code = entry.product.code
+            rows = product_rows.get(code)
+            if rows is None:
+                rows = product_rows[code] = []
+                products[code] = entry.product
+            rows.append(i)
+            if isinstance(entry, TermOption):
+                term_rows.setdefault(entry.term, []).append(i)
+        for code, rows in product_rows.items():
+            product = products[code]
+            if product.company_name:
+                positions["company"].setdefault(product.company_name, []).extend(rows)
+            for way in _join_ways(product.join_way):
+                positions["join_way"].setdefault(way, []).extend(rows)
+            if product.join_member:
+                positions["join_member"].setdefault(product.join_member.strip(), []).extend(rows)
+            name_rows.setdefault(_normalize(product.product_name), []).extend(rows)
+        for name, rows in name_rows.items():
+            for gram in _grams(name):
+                gram_rows.setdefault(gram, []).extend(rows)
+
+        self.facets: Dict[str, Dict[FacetValue, int]] = {
+            facet: {value: _bitmap(rows, self.size) for value, rows in values.items()}
+            for facet, values in positions.items()
+        }
+        self._grams = {gram: _bitmap(rows, self.size) for gram, rows in gram_rows.items()}
+        # 3글자 이상 질의 확인용: 상품명 번호 단위 n-gram 비트맵과 상품명별 행 번호
+        # (상품명마다 전체 폭 비트맵을 두면 색인 크기가 상품 수 × 행 수가 된다)
+        self._names = list(name_rows)
+        self._name_rows = [name_rows[name] for name in self._names]
+        name_grams: Dict[str, List[int]] = {}
+        for n, name in enumerate(self._names):
+            for gram in _grams(name):
+                name_grams.setdefault(gram, []).append(n)
+        self._name_grams = {gram: _bitmap(ids, len(self._names)) for gram, ids in name_grams.items()}
+
+    def rate_mask(self, min_rate: Optional[float], max_rate: Optional[float]) -> int:
+        lo = 0 if min_rate is None else bisect.bisect_left(self.rates, min_rate)
+        hi = self.size if max_rate is None else bisect.bisect_right(self.rates, max_rate)
+        return _range_mask(lo, hi)
+
+    def name_mask(self, query: str) -> int:
+        text = _normalize(query)
+        if not text:
+            return self.all
+        if len(text) == 1:
+            return self._grams.get(text, 0)
+        pairs = {text[i : i + 2] for i in range(len(text) - 1)}
+        mask = self.all
+        names = _range_mask(0, len(self._names))
+        for gram in pairs:
+            mask &= self._grams.get(gram, 0)
+            names &= self._name_grams.get(gram, 0)
+            if not mask:
+                return 0
+        if len(text) > 2:
+            # 2글자 조각이 모두 들어 있어도 이어져 있지 않을 수 있다 → 그런 상품명의 행만 뺀다
+            for n in _bits(names, len(self._names)):
+                if text not in self._names[n]:
+                    mask &= ~_bitmap(self._name_rows[n], self.size)
+        return mask
+
+    def query(
+        self,
+        *,
+        name: Optional[str] = None,
+        filters: Optional[Dict[str, Sequence[FacetValue]]] = None,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+    ) -> Tuple[int, Dict[str, List[Dict[str, Any]]]]:
+        """(일치 행 비트맵, 패싯별 [{value, count}])"""
+        base = self.all
+        if min_rate is not None or max_rate is not None:
+            base &= self.rate_mask(min_rate, max_rate)
+        if name:
+            base &= self.name_mask(name)
+        selected: Dict[str, int] = {}
+        for facet, values in (filters or {}).items():
+            if values:
+                mask = 0
+                for value in values:
+                    mask |= self.facets[facet].get(value, 0)
+                selected[facet] = mask
+        matched = base
+        for mask in selected.values():
+            matched &= mask
+
+        counts: Dict[str, List[Dict[str, Any]]] = {}
+        for facet in FACETS:
+            scope = base
+            for other, mask in selected.items():
+                if other != facet:
+                    scope &= mask
+            found = [(value, _popcount(bitmap & scope)) for value, bitmap in self.facets[facet].items()]
+            found = [(value, count) for value, count in found if count]
+            # 만기는 개월 순, 나머지는 많은 순
+            found.sort(key=(lambda vc: vc[0]) if facet == "term" else (lambda vc: (-vc[1], str(vc[0]))))
+            counts[facet] = [{"value": value, "count": count} for value, count in found[:FACET_VALUES_LIMIT]]
+        return matched, counts
+
+    def page(self, mask: int, offset: int, limit: int, descending: bool) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for i in _bits(mask, self.size, descending, skip=offset):
+            if len(rows) >= limit:
+                break
+            rows.append(_entry_row(self.family, self.entries[i]))
+        return rows
+
+    def rate_range(self, mask: int) -> Optional[Dict[str, float]]:
+        if not mask:
+            return None
+        low = (mask & -mask).bit_length() - 1
+        return {"min": self.rates[low], "max": self.rates[mask.bit_length() - 1]}
+
+
+_INDEXES: Dict[str, FacetIndex] = {}
+
+
+async def facet_index(catalog: FamilyCatalog) -> FacetIndex:
+    """스냅샷에 맞는 색인 (갱신 때 finance_catalog 가 미리 불러 두므로 보통은 바로 돌려준다)"""
+    index = _INDEXES.get(catalog.family)
+    if index is None or index.catalog is not catalog:
+        index = await asyncio.to_thread(FacetIndex, catalog)
+        _INDEXES[catalog.family] = index
+    return index
+
+
+def search(
+    index: FacetIndex,
+    *,
+    name: Optional[str] = None,
+    filters: Optional[Dict[str, Sequence[FacetValue]]] = None,
+    min_rate: Optional[float] = None,
+    max_rate: Optional[float] = None,
+    order: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """기본 정렬: 적금/예금은 최고금리 높은 순, 대출은 금리 낮은 순"""
+    matched, facets = index.query(name=name, filters=filters, min_rate=min_rate, max_rate=max_rate)
+    if order is None:
+        order = "asc" if index.family in LOAN_FAMILIES else "desc"
+    items = index.page(matched, offset, limit, descending=order == "desc")
+    return {
+        "family": index.family,
+        "total": _popcount(matched),
+        "count": len(items),
+        "offset": offset,
+        "items": items,
+        "facets": facets,
+        "rate_range": index.rate_range(matched),
+        "meta": {"catalog_version": index.version, "fetched_at": index.catalog.fetched_at, "order": order},
+    }
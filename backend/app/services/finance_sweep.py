@@ -0,0 +1,182 @@
+"""What-if sweep: 원금 × 잔여개월 × 중도해지 패널티 격자 전체를 한 번에 채점.
+
+적금 갈아타기(_build_saving_section)와 같은 점수식을 numpy 로 격자 전체에 적용한다.
+만기 버킷 안에서는 점수가 금리에 대해 단조이므로 격자점마다 버킷별 "가입 가능한 최고금리 옵션"
+하나만 후보가 된다. 이 후보는 버킷의 한도(cap) 누적최대 배열에 대한 searchsorted 로 원금별로 찾는다.
+"""
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .finance_catalog import FamilyCatalog
+from .finance_recommendation import DEFAULT_TERM, AssetFormData, _analysis_profile
+
+# catalog.version → 버킷별 numpy 배열 (스냅샷이 바뀌면 새 버전으로 다시 만든다)
+_ARRAY_CACHE: Dict[str, List[Dict]] = {}
+_ARRAY_CACHE_SIZE = 4
+
+
+def _bucket_arrays(catalog: FamilyCatalog) -> List[Dict]:
+    cached = _ARRAY_CACHE.get(catalog.version)
+    if cached is not None:
+        return cached
+    arrays = []
+    for term, bucket in sorted(catalog.buckets.items()):
+        if not bucket.options:
+            continue
+        caps = np.array(
+            [o.product.max_limit if o.product.max_limit and o.product.max_limit > 0 else np.inf for o in bucket.options]
+        )
+        arrays.append(
+            {
+                "term": term,
+                "options": bucket.options,
+                "rates": np.array([o.top_rate for o in bucket.options]),
+                "ordinals": np.array([o.ordinal for o in bucket.options]),
+                # 앞에서부터 본 한도의 최댓값: 원금 P 로 가입 가능한 첫 옵션 = prefix_cap >= P 인 첫 위치
+                "prefix_cap": np.maximum.accumulate(caps),
+            }
+        )
+    if len(_ARRAY_CACHE) >= _ARRAY_CACHE_SIZE:
+        _ARRAY_CACHE.pop(next(iter(_ARRAY_CACHE)))
+    _ARRAY_CACHE[catalog.version] = arrays
+    return arrays
+
+
+def _interest(principal: np.ndarray, rate_percent, months) -> np.ndarray:
+    """_compute_interest 의 벡터판"""
+    value = np.round(principal * (rate_percent / 100) * (months / 12), 2)
+    mask = (principal > 0) & (np.asarray(rate_percent) > 0) & (np.asarray(months) > 0)
+    return np.where(mask, value, 0.0)
+
+
+def sweep_saving(
+    data: AssetFormData,
+    catalog: FamilyCatalog,
+    principals: Sequence[float],
+    months: Sequence[int],
+    penalties: Sequence[float],
+) -> Dict:
+    """격자 (principal, months_remaining, penalty_rate) 점마다 순이익·최적 상품.
+
+    결과 배열은 shape = [len(principals), len(months), len(penalties)] 의 row-major 평탄화.
+    best 는 products 목록의 인덱스 (-1 은 가입 가능한 상품 없음).
+    """
+    started = time.perf_counter()
+    profile = _analysis_profile(data)
+    annual_rate = profile["annual_rate"]
+    liquidity_ratio = profile["liquidity_ratio"]
+    debt_ratio = profile["debt_ratio"]
+
+    P = np.asarray(principals, dtype=float)[:, None, None]
+    M = np.asarray(months, dtype=int)[None, :, None]
+    pen = np.asarray(penalties, dtype=float)[None, None, :]
+    shape = (P.shape[0], M.shape[1], pen.shape[2])
+
+    target_term = np.where(M > 0, M, DEFAULT_TERM)
+    penalty_amount = np.where(pen > 0, np.round(P * pen, 2), 0.0)
+
+    best_score = np.full(shape, -1, dtype=int)
+    best_net = np.full(shape, -np.inf)
+    best_rate = np.full(shape, -np.inf)
+    best_ordinal = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+    best_ref = np.full(shape, -1, dtype=int)
+    refs: List = []
+
+    for arrays in _bucket_arrays(catalog):
+        term = arrays["term"]
+        # 원금별 이 버킷의 후보 위치 (len 이면 가입 가능한 옵션 없음)
+        pos = np.searchsorted(arrays["prefix_cap"], P[:, 0, 0], side="left")
+        has = pos < len(arrays["options"])
+        safe = np.where(has, pos, 0)
+        rate = arrays["rates"][safe][:, None, None]
+        ordinal = arrays["ordinals"][safe][:, None, None]
+
+        interest_gain = np.round(_interest(P, rate, term) - _interest(P, annual_rate, term), 2)
+        net_gain = np.round(interest_gain - penalty_amount, 2)
+        rate_gain = np.round(rate - annual_rate, 3)
+
+        # _compute_match_score
+        rate_score = np.clip(rate_gain / 2.5, 0.0, 1.0) * 55.0
+        deviation = np.abs(term - target_term)
+        term_score = np.maximum(0.0, 1.0 - np.minimum(deviation / np.maximum(target_term, 6), 1.0)) * 25.0
+        liquidity_score = 10.0
+        if liquidity_ratio < 0.3:
+            liquidity_score = 8.0 if term <= 12 else 4.0
+        elif liquidity_ratio < 0.5 and term > 24:
+            liquidity_score = 6.0
+        debt_penalty = 0.0
+        if debt_ratio > 0.5 and term > 12:
+            debt_penalty = 10.0
+        elif debt_ratio > 0.35 and term > 24:
+            debt_penalty = 6.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gain_adjust = np.where(P > 0, np.clip(net_gain / P * 100, -10.0, 10.0), 0.0)
+        score = np.clip(rate_score + term_score + liquidity_score + gain_adjust - debt_penalty, 0.0, 100.0)
+        match_score = np.rint(score).astype(int)
+
+        # (match_score, net_gain, rate) 내림차순, 동점이면 원본 순서가 앞선 쪽
+        rounded_rate = np.round(rate, 3)
+        better = (
+            (match_score > best_score)
+            | ((match_score == best_score) & (net_gain > best_net))
+            | ((match_score == best_score) & (net_gain == best_net) & (rounded_rate > best_rate))
+            | ((match_score == best_score) & (net_gain == best_net) & (rounded_rate == best_rate) & (ordinal < best_ordinal))
+        ) & has[:, None, None]
+
+        base_ref = len(refs)
+        refs.extend(arrays["options"][i] if ok else None for i, ok in zip(safe, has))
+        ref = (base_ref + np.arange(len(safe)))[:, None, None]
+
+        best_score = np.where(better, match_score, best_score)
+        best_net = np.where(better, net_gain, best_net)
+        best_rate = np.where(better, rounded_rate, best_rate)
+        best_ordinal = np.where(better, ordinal, best_ordinal)
+        best_ref = np.where(better, np.broadcast_to(ref, shape), best_ref)
+
+    # 후보 참조 → 응답에 실을 상품 목록 (실제로 이긴 옵션만)
+    winners, inverse = np.unique(best_ref, return_inverse=True)
+    products: List[Dict] = []
+    remap = np.full(len(winners), -1, dtype=int)
+    for i, ref in enumerate(winners):
+        if ref < 0:
+            continue
+        opt = refs[int(ref)]
+        remap[i] = len(products)
+        products.append(
+            {
+                "fin_prdt_cd": opt.product.code,
+                "company_name": opt.product.company_name,
+                "product_name": opt.product.product_name,
+                "rate": round(opt.top_rate, 3),
+                "save_term": opt.term,
+            }
+        )
+    best_index = remap[inverse.reshape(shape)]
+
+    found = best_ref >= 0
+    return {
+        "axes": {
+            "principal": [float(x) for x in P[:, 0, 0]],
+            "months_remaining": [int(x) for x in M[0, :, 0]],
+            "penalty_rate": [float(x) for x in pen[0, 0, :]],
+        },
+        "shape": list(shape),
+        "net_gain": np.where(found, best_net, 0.0).ravel().tolist(),
+        "match_score": np.where(found, best_score, 0).ravel().tolist(),
+        "best": best_index.ravel().tolist(),
+        "switch": (found & (best_net > 0)).ravel().tolist(),
+        "products": products,
+        "catalog_version": catalog.version,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def axis_values(start: float, stop: float, steps: int, values: Optional[List[float]]) -> List[float]:
+    """values 가 있으면 그대로, 아니면 start..stop 양끝 포함 steps 개"""
+    if values:
+        return list(values)
+    if steps <= 1:
+        return [float(start)]
+    return np.linspace(start, stop, steps).tolist()
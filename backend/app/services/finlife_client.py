@@ -1,18 +1,38 @@
+import asyncio
 import os
-import time
 from functools import lru_cache
 from typing import Dict, Iterable, List, Optional, Tuple
 
 import httpx
 
+from utils import http_client
+
+from .circuit_breaker import NEGATIVE_CACHE, breaker
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from .single_flight import SingleFlight
 
 API_BASE = os.getenv("FSS_FINLIFE_API_BASE", "https://finlife.fss.or.kr/finlifeapi")
 API_KEY = os.getenv("FSS_FINLIFE_API_KEY")
+FINLIFE_PAGE_DELAY = float(os.getenv("FINLIFE_PAGE_DELAY", "0.1"))  # seconds between pages
+
+# 같은 (base_url, endpoint, params) 전체 페이지 조회가 동시에 여러 번 나가지 않도록 (콜드 스타트/TTL 만료 직후)
+_FLIGHTS = SingleFlight("finlife")
+
+
+def _parse_count(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 class FinlifeAPIError(RuntimeError):
     """Raised when the 금융상품 한눈에 API responds with an error."""
 
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
 
 class FinlifeClient:
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None) -> None:
@@ -31,18 +51,40 @@ class FinlifeClient:
             "pageNo": page_no,
             **params,
         }
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.get(url, params=query)
+        # 회로가 열려 있거나 같은 페이지 조회가 방금 실패했으면 바로 실패 → 카탈로그 스토어가 이전 스냅샷을 쓴다
+        query_key = (endpoint, page_no, tuple(sorted(params.items())))
+        NEGATIVE_CACHE.check("finlife", query_key)
+        circuit = breaker("finlife")
+        circuit.before_call()
+        try:
+            try:
+                with UPSTREAM_LATENCY.time("finlife", endpoint):
+                    resp = await http_client.get_async(url, params=query, timeout=20.0)
+            except httpx.HTTPError:
+                UPSTREAM_ERRORS.inc("finlife", endpoint)
+                raise
             if resp.status_code != 200:
+                UPSTREAM_ERRORS.inc("finlife", endpoint)
                 raise FinlifeAPIError(
-                    f"Finlife API error ({endpoint}): {resp.status_code} {resp.text[:200]}"
+                    f"Finlife API error ({endpoint}): {resp.status_code} {resp.text[:200]}",
+                    status_code=resp.status_code,
                 )
             data = resp.json()
             if "result" not in data:
                 raise FinlifeAPIError(f"Unexpected response for {endpoint}: {data}")
-            return data["result"]
+        except Exception as exc:
+            circuit.record_failure(exc)
+            NEGATIVE_CACHE.put("finlife", query_key, exc)
+            raise
+        circuit.record_success()
+        return data["result"]
 
     async def _fetch_all_pages(self, endpoint: str, params: Dict[str, str]) -> Dict[str, List[Dict]]:
+        """전체 페이지 조회. 같은 조회가 진행 중이면 새로 부르지 않고 그 결과(또는 예외)를 함께 받는다."""
+        key = (self.base_url, endpoint, tuple(sorted(params.items())))
+        return await _FLIGHTS.do(key, lambda: self._fetch_pages(endpoint, params))
+
+    async def _fetch_pages(self, endpoint: str, params: Dict[str, str]) -> Dict[str, List[Dict]]:
         base_list: List[Dict] = []
         option_list: List[Dict] = []
         page_no = 1
@@ -53,11 +95,12 @@ class FinlifeClient:
             option_page = result.get("optionList") or []
             base_list.extend(base_page)
             option_list.extend(option_page)
-            total_count = total_count or result.get("totalCount", len(base_page))
+            # 실제 응답은 total_count (totalCount 는 일부 프록시/가짜 업스트림)
+            total_count = total_count or _parse_count(result.get("total_count") or result.get("totalCount")) or len(base_page)
             if len(base_list) >= total_count or not base_page:
                 break
             page_no += 1
-            time.sleep(0.1)  # respectful pacing
+            await asyncio.sleep(FINLIFE_PAGE_DELAY)  # respectful pacing (이벤트 루프는 막지 않는다)
         return {"baseList": base_list, "optionList": option_list or []}
 
     async def fetch_companies(self, top_fin_grp_no: str) -> List[Dict]:
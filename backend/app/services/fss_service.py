@@ -1,9 +1,10 @@
 import os
-import requests
 import pandas as pd
 from datetime import datetime
 from dotenv import load_dotenv
 
+from utils import http_client
+
 load_dotenv()
 
 FSS_API_URL = os.getenv(
@@ -12,16 +13,28 @@ FSS_API_URL = os.getenv(
 )
 API_KEY = os.getenv("FSS_API_KEY", "")
 TOP_FIN_GRP_NO = os.getenv("FSS_TOP_FIN_GRP_NO", "020000")  # 기본: 은행권
+FSS_API_TIMEOUT = float(os.getenv("FSS_API_TIMEOUT", "20"))
 
-def fetch_fss_deposit_products():
-    """예금/적금 금리 데이터 수집"""
+def fetch_fss_deposit_raw():
+    """예금 상품 원본 응답 (result: baseList/optionList). 형식이 다르면 None"""
     params = {"auth": API_KEY, "topFinGrpNo": TOP_FIN_GRP_NO, "pageNo": 1}
-    res = requests.get(FSS_API_URL, params=params)
+    res = http_client.get_sync(FSS_API_URL, params=params, timeout=FSS_API_TIMEOUT)
     data = res.json()
 
     if 'result' not in data or 'baseList' not in data['result']:
-        return []
+        return None
+    return data['result']
+
 
-    base_list = pd.DataFrame(data['result']['baseList'])
+def deposit_rows(result):
+    """원본 응답 → financial_products 저장용 행"""
+    if not result:
+        return []
+    base_list = pd.DataFrame(result['baseList'])
     base_list["update_time"] = datetime.now()
     return base_list.to_dict(orient="records")
+
+
+def fetch_fss_deposit_products():
+    """예금/적금 금리 데이터 수집"""
+    return deposit_rows(fetch_fss_deposit_raw())
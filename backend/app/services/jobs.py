@@ -0,0 +1,417 @@
+"""In-process background jobs with a persistent status table.
+
+오래 걸리는 작업(FSS/카탈로그 갱신, 저장된 추천 재계산, 대량 진단/갈아타기 분석)을 HTTP 요청 안에서 돌리지 않고
+JOB_WORKERS 개 스레드 풀에 넘긴다. 제출하면 바로 job id 를 돌려주고, 상태/진행률/결과는 jobs 테이블에 남는다.
+
+- 종류(kind)별 처리 함수는 @job_kind 로 등록한다. handler(params, payload, progress) → JSON 결과
+  params 는 테이블에 저장되는 작은 값, payload 는 저장하지 않고 처리 함수에만 넘기는 입력(배치 본문 등).
+- 같은 dedup_key 로 대기/실행 중인 작업이 있으면 새로 만들지 않고 그 작업을 돌려준다 (갱신 중복 방지).
+- 끝난 작업은 JOB_RESULT_TTL 뒤 만료되어 지워진다.
+- 대기 중인 작업이 JOB_MAX_PENDING 개를 넘으면 JobQueueFull.
+- 프로세스가 죽어 끝나지 못한 작업은 다음 시작 때 failed 로 정리한다. worker 에 host:pid:프로세스 시작 시각을
+  남겨서, 재시작 후 같은 pid 를 다른 프로세스가 쓰고 있어도 주인이 죽은 작업으로 알아본다.
+- 만든 지 JOB_STALE_AFTER 가 지난 대기/실행 중 작업은 중복 판정에서 빼서, 정리되지 못한 작업이
+  같은 dedup_key 의 새 작업(예: refresh.fss)을 영영 막지 않게 한다.
+"""
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import defer
+
+from app.db.db_conn import SessionLocal
+from app.db.models import Job
+from .metrics import JOB_EVENTS, JOB_LATENCY
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "86400"))  # seconds a finished job is kept
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "0.5"))  # min seconds between progress writes
+JOB_STALE_AFTER = float(os.getenv("JOB_STALE_AFTER", "3600"))  # seconds before an active job stops deduplicating
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def _process_started_at(pid: int) -> Optional[float]:
+    """프로세스 시작 시각(epoch 초). /proc 이 없는 플랫폼이면 None"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+        with open("/proc/stat") as f:
+            boot = next(float(line.split()[1]) for line in f if line.startswith("btime "))
+        ticks = int(stat.rpartition(")")[2].split()[19])  # 22번째 필드 starttime (부팅 후 clock tick)
+        return boot + ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+
+_STARTED_AT = _process_started_at(os.getpid()) or time.time()
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{int(_STARTED_AT)}"
+
+Progress = Callable[[float, Optional[str]], None]
+Handler = Callable[[Dict[str, Any], Any, Progress], Any]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when JOB_MAX_PENDING jobs are already waiting in this process."""
+
+
+class UnknownJobKind(ValueError):
+    pass
+
+
+_HANDLERS: Dict[str, Handler] = {}
+
+
+def job_kind(kind: str):
+    def deco(fn: Handler) -> Handler:
+        _HANDLERS[kind] = fn
+        return fn
+    return deco
+
+
+@dataclass
+class Submission:
+    job_id: str
+    status: str
+    deduplicated: bool = False
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_submit_lock = threading.Lock()
+_pending = 0
+_purged_at = 0.0
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix="job")
+        return _executor
+
+
+def _update(job_id: str, **values: Any) -> None:
+    with SessionLocal() as db:
+        db.execute(update(Job).where(Job.id == job_id).values(**values))
+        db.commit()
+
+
+def purge_expired(force: bool = False) -> int:
+    """만료된 작업 삭제 (force 가 아니면 분당 한 번만)"""
+    global _purged_at
+    now = time.monotonic()
+    if not force and now - _purged_at < 60:
+        return 0
+    _purged_at = now
+    with SessionLocal() as db:
+        deleted = db.execute(delete(Job).where(Job.expires_at < datetime.now())).rowcount
+        db.commit()
+    return deleted or 0
+
+
+def submit(
+    kind: str,
+    params: Optional[Dict[str, Any]] = None,
+    payload: Any = None,
+    dedup_key: Optional[str] = None,
+) -> Submission:
+    """작업을 등록하고 풀에 넘긴다. 같은 dedup_key 의 대기/실행 중 작업이 있으면 그것을 돌려준다."""
+    global _pending
+    if kind not in _HANDLERS:
+        raise UnknownJobKind(kind)
+    purge_expired()
+    with _submit_lock:
+        with SessionLocal() as db:
+            if dedup_key is not None:
+                existing = db.execute(
+                    select(Job.id, Job.status)
+                    .where(
+                        Job.dedup_key == dedup_key,
+                        Job.status.in_(ACTIVE_STATUSES),
+                        Job.created_at >= datetime.now() - timedelta(seconds=JOB_STALE_AFTER),
+                    )
+                    .order_by(Job.created_at.desc())
+                    .limit(1)
+                ).first()
+                if existing is not None:
+                    JOB_EVENTS.inc(kind, "deduplicated")
+                    return Submission(existing.id, existing.status, deduplicated=True)
+            if _pending >= JOB_MAX_PENDING:
+                JOB_EVENTS.inc(kind, "rejected")
+                raise JobQueueFull(f"{_pending} jobs already pending")
+            job = Job(
+                id=uuid.uuid4().hex,
+                kind=kind,
+                status=QUEUED,
+                dedup_key=dedup_key,
+                params=params or {},
+                progress=0.0,
+                worker=WORKER_ID,
+                created_at=datetime.now(),
+            )
+            db.add(job)
+            db.commit()
+            job_id = job.id
+        _pending += 1
+    JOB_EVENTS.inc(kind, "submitted")
+    _pool().submit(_run, job_id, kind, params or {}, payload)
+    return Submission(job_id, QUEUED)
+
+
+def _progress_reporter(job_id: str) -> Progress:
+    last = [0.0]
+
+    def report(fraction: float, message: Optional[str] = None) -> None:
+        now = time.monotonic()
+        if now - last[0] < JOB_PROGRESS_INTERVAL and fraction < 1:
+            return
+        last[0] = now
+        values: Dict[str, Any] = {"progress": round(max(0.0, min(1.0, fraction)), 4)}
+        if message is not None:
+            values["message"] = message[:255]
+        _update(job_id, **values)
+
+    return report
+
+
+def _run(job_id: str, kind: str, params: Dict[str, Any], payload: Any) -> None:
+    global _pending
+    with _submit_lock:
+        _pending -= 1
+    started = time.perf_counter()
+    _update(job_id, status=RUNNING, started_at=datetime.now())
+    try:
+        result = _HANDLERS[kind](params, payload, _progress_reporter(job_id))
+    except Exception as exc:
+        status, values = FAILED, {"error": f"{type(exc).__name__}: {exc}"[:2000]}
+    else:
+        status, values = SUCCEEDED, {"result": result, "progress": 1.0}
+    finished = datetime.now()
+    try:
+        _update(
+            job_id,
+            status=status,
+            finished_at=finished,
+            expires_at=finished + timedelta(seconds=JOB_RESULT_TTL),
+            **values,
+        )
+    except Exception as exc:  # 결과를 저장하지 못해도 작업이 running 으로 남지 않도록
+        _update(job_id, status=FAILED, finished_at=finished, error=f"result not stored: {exc}"[:2000],
+                expires_at=finished + timedelta(seconds=JOB_RESULT_TTL))
+        status = FAILED
+    JOB_EVENTS.inc(kind, status)
+    JOB_LATENCY.observe(time.perf_counter() - started, kind)
+
+
+def get(job_id: str, with_result: bool = False) -> Optional[Job]:
+    """작업 조회 (만료됐으면 None). 결과 본문은 with_result 일 때만 읽는다."""
+    options = [] if with_result else [defer(Job.result)]
+    with SessionLocal() as db:
+        job = db.get(Job, job_id, options=options)
+    if job is None or (job.expires_at is not None and job.expires_at < datetime.now()):
+        return None
+    return job
+
+
+def recent(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+    purge_expired()
+    query = select(Job).options(defer(Job.result)).order_by(Job.created_at.desc()).limit(limit)
+    if kind:
+        query = query.where(Job.kind == kind)
+    if status:
+        query = query.where(Job.status == status)
+    with SessionLocal() as db:
+        return list(db.scalars(query))
+
+
+def describe(job: Job) -> Dict[str, Any]:
+    """상태 응답 (결과 본문은 /result 로 따로 받는다)"""
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "message": job.message,
+        "params": job.params,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "expires_at": job.expires_at.isoformat() if job.expires_at else None,
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _owner_exited(worker: str, host: str) -> bool:
+    """worker(host:pid:시작 시각) 가 이 호스트에서 이미 끝난 프로세스인지"""
+    owner_host, _, rest = worker.partition(":")
+    pid, _, started = rest.partition(":")
+    if owner_host != host or not pid.isdigit() or worker == WORKER_ID:
+        return False
+    if not _pid_alive(int(pid)):
+        return True
+    # pid 가 살아 있어도 시작 시각이 다르면 재시작 후 같은 pid 를 받은 다른 프로세스다
+    current = _process_started_at(int(pid))
+    return started.isdigit() and current is not None and abs(current - int(started)) > 1
+
+
+def recover_interrupted() -> int:
+    """이 호스트에서 죽은 프로세스가 남긴 대기/실행 중 작업을 failed 로 정리"""
+    host = socket.gethostname()
+    with SessionLocal() as db:
+        rows = db.execute(select(Job.id, Job.worker).where(Job.status.in_(ACTIVE_STATUSES))).all()
+        dead = [row.id for row in rows if _owner_exited(row.worker or "", host)]
+        if dead:
+            now = datetime.now()
+            db.execute(
+                update(Job)
+                .where(Job.id.in_(dead))
+                .values(status=FAILED, error="interrupted (worker exited)", finished_at=now,
+                        expires_at=now + timedelta(seconds=JOB_RESULT_TTL))
+            )
+            db.commit()
+    return len(dead)
+
+
+def startup() -> None:
+    try:
+        recovered = recover_interrupted()
+        purge_expired(force=True)
+    except Exception as exc:  # jobs 테이블이 아직 없을 때 (run.sh 의 create_all 전)
+        print(f"[Jobs] startup cleanup skipped: {exc}")
+        return
+    if recovered:
+        print(f"[Jobs] marked {recovered} interrupted jobs as failed")
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def run_async(coro_factory: Callable[[], Any]) -> Any:
+    """작업 스레드에서 async 서비스 호출 (스레드 전용 이벤트 루프, 끝나면 그 루프의 HTTP 클라이언트도 닫는다)"""
+    from utils import http_client
+
+    async def runner():
+        try:
+            return await coro_factory()
+        finally:
+            await http_client.close_loop_client()
+
+    return asyncio.run(runner())
+
+
+# --- job kinds ---------------------------------------------------------------
+
+
+@job_kind("refresh.fss")
+def _refresh_fss(params: Dict[str, Any], payload: Any, progress: Progress) -> Dict[str, Any]:
+    from app.db.db_conn import save_financial_products
+    from .fss_service import deposit_rows, fetch_fss_deposit_raw
+    from .rate_history import record_snapshot
+
+    progress(0.05, "fetching FSS deposit products")
+    raw = fetch_fss_deposit_raw()
+    data = deposit_rows(raw)
+    if not data:
+        raise RuntimeError("No data fetched from FSS API")
+    progress(0.5, f"saving {len(data)} products")
+    save_financial_products(data)
+    progress(0.8, "recording rate changes")
+    appended = record_snapshot("deposit", raw)
+    return {"updated_count": len(data), "rate_changes": appended}
+
+
+@job_kind("refresh.finance_catalog")
+def _refresh_finance_catalog(params: Dict[str, Any], payload: Any, progress: Progress) -> Dict[str, Any]:
+    from .finance_catalog import CATALOG_STORE
+
+    families = params["families"]
+    refreshed: Dict[str, Any] = {}
+    for i, family in enumerate(families):
+        progress(i / len(families), f"refreshing {family}")
+        catalog = run_async(lambda: CATALOG_STORE.refresh(family))
+        refreshed[family] = {"version": catalog.version, "products": len(catalog.products)}
+    return {"families": refreshed}
+
+
+@job_kind("refresh.welfare_catalog")
+def _refresh_welfare_catalog(params: Dict[str, Any], payload: Any, progress: Progress) -> Dict[str, Any]:
+    from .welfare_provider import refresh_catalog
+
+    progress(0.05, "fetching the full welfare catalog")
+    return refresh_catalog()
+
+
+@job_kind("welfare.rematerialize")
+def _rematerialize_welfare(params: Dict[str, Any], payload: Any, progress: Progress) -> Dict[str, Any]:
+    from .welfare_personalized import rematerialize_stale
+
+    return rematerialize_stale(progress)
+
+
+@job_kind("welfare.diagnose_batch")
+def _diagnose_batch(params: Dict[str, Any], payload: Any, progress: Progress) -> Dict[str, Any]:
+    from .welfare_service import calculate_income_recognition
+
+    items = []
+    errors = 0
+    for position, (index, data, error) in enumerate(payload):
+        if position % 1000 == 0:
+            progress(position / max(1, len(payload)), f"{position}/{len(payload)} diagnosed")
+        if data is not None:
+            try:
+                items.append({"index": index, "result": calculate_income_recognition(data)})
+                continue
+            except Exception as exc:  # 한 명의 실패가 배치 전체를 멈추지 않도록
+                error = str(exc)
+        errors += 1
+        items.append({"index": index, "error": error})
+    return {"items": items, "meta": {"customers": len(payload), "errors": errors}}
+
+
+@job_kind("finance.switching_batch")
+def _switching_batch(params: Dict[str, Any], payload: Any, progress: Progress) -> Dict[str, Any]:
+    import json
+
+    from .finance_batch import resolve_batch_catalogs, stream_batch
+
+    async def collect():
+        catalogs = await resolve_batch_catalogs(payload)
+        items: List[Dict[str, Any]] = []
+        meta: Dict[str, Any] = {}
+        async for block in stream_batch(payload, catalogs):
+            for line in block.splitlines():
+                row = json.loads(line)
+                if "meta" in row:
+                    meta = row["meta"]
+                else:
+                    items.append(row)
+            progress(len(items) / max(1, len(payload)), f"{len(items)}/{len(payload)} scored")
+        return {"items": items, "meta": meta}
+
+    return run_async(collect)
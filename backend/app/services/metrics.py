@@ -0,0 +1,288 @@
+"""In-process metrics with Prometheus text exposition.
+
+외부 의존성 없이 Counter / Gauge / Histogram 만 제공한다. 값 갱신은 dict 조회 +
+락 하나 수준이라 상시 켜 두어도 요청당 수 마이크로초 이내.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 초 단위. 외부 API(수백 ms~수 초)와 내부 처리(ms 이하)를 모두 덮도록 넓게 잡음
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _check(self, labels: LabelValues) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = float(value)
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        self._check(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[idx] += 1
+            row[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        row = self._values.get(labels)
+        return int(sum(row[:-1])) if row else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines: List[str] = []
+        for labels, row in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {_format_value(cumulative)}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(row[-1])}")
+            lines.append(f"{self.name}_count{label_str} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- application metrics -----------------------------------------------------
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served, by router prefix", ("group",)
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external services", ("upstream", "operation")
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_errors_total", "Failed calls to external services", ("upstream", "operation")
+)
+PASSWORD_HASH_LATENCY = Histogram(
+    "password_hash_duration_seconds", "PBKDF2 hash/verify time", ("operation",)
+)
+DB_SESSION_LATENCY = Histogram(
+    "db_session_duration_seconds", "Lifetime of request-scoped DB sessions", ("kind",)
+)
+WELFARE_MOCK_FALLBACKS = Counter(
+    "welfare_mock_fallback_total", "Welfare requests served from local mock data", ("reason",)
+)
+RESPONSE_CACHE_EVENTS = Counter(
+    "response_cache_total", "Recommendation response cache lookups", ("namespace", "result")
+)
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state", "Upstream circuit breaker state (0=closed, 1=half_open, 2=open)", ("upstream",)
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ("upstream", "state")
+)
+CIRCUIT_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total", "Upstream calls skipped because the breaker was open", ("upstream",)
+)
+NEGATIVE_CACHE_HITS = Counter(
+    "negative_cache_hits_total", "Upstream queries skipped because they failed recently", ("upstream",)
+)
+WELFARE_DETAIL_LOOKUPS = Counter(
+    "welfare_detail_lookups_total", "Welfare detail enrichment lookups by outcome", ("result",)
+)
+JOB_EVENTS = Counter(
+    "jobs_total", "Background jobs by kind and event (submitted/deduplicated/rejected/succeeded/failed)", ("kind", "event")
+)
+JOB_LATENCY = Histogram("job_duration_seconds", "Background job run time", ("kind",))
+RATE_LIMITED = Counter(
+    "rate_limited_total", "Requests rejected with 429 by route group and reason (rate/concurrency)", ("group", "reason")
+)
+SEARCH_LATENCY = Histogram("search_duration_seconds", "Local search query time including index sync", ("index",))
+SINGLE_FLIGHT_COLLAPSED = Counter(
+    "single_flight_collapsed_total", "Calls that waited on an identical in-flight call instead of running", ("name",)
+)
+CATALOG_SNAPSHOTS = Counter(
+    "catalog_snapshot_total", "Shared catalog snapshot files written or loaded", ("catalog", "event")
+)
+
+
+def route_template(scope) -> str:
+    # 최신 FastAPI는 include_router 접두사가 붙은 전체 템플릿을 effective_route_context에 두고,
+    # 이전 버전은 접두사가 합쳐진 APIRoute 자체가 scope["route"]에 들어온다
+    ctx = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(ctx, "path_format", None) or getattr(scope.get("route"), "path_format", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: route-template latency, status counts, in-flight gauge.
+
+    라우트 라벨은 매칭된 경로 템플릿(/finance/products/{id})을 써서 카디널리티를 제한하고,
+    매칭되지 않은 요청은 "unmatched"로 묶는다.
+    """
+
+    def __init__(self, app, groups: Sequence[str] = (), skip_paths: Sequence[str] = ("/metrics",)) -> None:
+        self.app = app
+        self.groups = frozenset(groups)
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        group = "/" + scope["path"].lstrip("/").split("/", 1)[0]
+        if group not in self.groups:
+            group = "other"
+        status_holder = {"status": 500}
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(group)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(group)
+            route = route_template(scope)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_holder["status"]))
@@ -0,0 +1,220 @@
+"""Opt-in per-request profiling.
+
+요청 단위로 cProfile(결정적) 또는 pyinstrument(샘플링, 설치된 경우)를 켜고,
+선택적으로 tracemalloc 스냅샷 차이를 남긴다. 결과는 PROFILE_DIR 아래에
+`<id>_<METHOD>_<route>_<ms>ms.{prof,txt}` 로 저장되고 /admin/profiles 로 조회한다.
+
+활성화 조건 (둘 중 하나):
+- `X-Profile: <ADMIN_TOKEN>` 헤더 (ADMIN_TOKEN 미설정 시 비활성)
+- PROFILE_SAMPLE_RATE (0~1) 확률 샘플링
+
+주의: 이벤트 루프 스레드에서만 수집하므로 asyncio.to_thread 로 넘긴 작업은 보이지 않고,
+같은 시점에 처리 중인 다른 요청의 코루틴이 섞일 수 있다. 프로파일러는 동시에 하나만 돌린다.
+"""
+import asyncio
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .metrics import route_template
+
+load_dotenv()
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")  # cprofile | sampling
+PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "false").lower() in ("1", "true", "yes")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+PROFILE_HEADER = b"x-profile"
+MEMORY_HEADER = b"x-profile-memory"
+
+_FILENAME_RE = re.compile(r"^(?P<id>[0-9]{8}T[0-9]{6}-[0-9a-f]{6})_(?P<method>[A-Z]+)_(?P<route>.+)_(?P<ms>[0-9]+)ms\.(?P<ext>prof|txt|html)$")
+
+# cProfile/sys.monitoring 는 스레드당 프로파일러 하나만 허용
+_active = threading.Lock()
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+def _slug(route: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", route).strip("-")
+    return slug or "root"
+
+
+def _sampling_profiler():
+    if PROFILE_MODE != "sampling":
+        return None
+    try:
+        from pyinstrument import Profiler  # type: ignore
+    except ImportError:
+        return None
+    return Profiler(async_mode="enabled")
+
+
+class _Session:
+    def __init__(self, with_memory: bool) -> None:
+        self.id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.sampler = _sampling_profiler()
+        self.profiler = None if self.sampler else cProfile.Profile()
+        self.with_memory = with_memory
+        self.started_tracemalloc = False
+        self.mem_before = None
+        self.start = 0.0
+
+    def __enter__(self) -> "_Session":
+        if self.with_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self.started_tracemalloc = True
+            self.mem_before = tracemalloc.take_snapshot()
+        self.start = time.perf_counter()
+        if self.sampler:
+            self.sampler.start()
+        else:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self.sampler:
+            self.sampler.stop()
+        else:
+            self.profiler.disable()
+        self.elapsed_ms = (time.perf_counter() - self.start) * 1000
+        self.mem_after = tracemalloc.take_snapshot() if self.with_memory else None
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+
+    def save(self, method: str, route: str) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stem = f"{self.id}_{method}_{_slug(route)}_{int(self.elapsed_ms)}ms"
+        report = io.StringIO()
+        report.write(f"{method} {route}  {self.elapsed_ms:.1f} ms\n\n")
+
+        if self.sampler:
+            with open(os.path.join(PROFILE_DIR, stem + ".html"), "w", encoding="utf-8") as f:
+                f.write(self.sampler.output_html())
+            report.write(self.sampler.output_text(unicode=True, color=False))
+        else:
+            self.profiler.dump_stats(os.path.join(PROFILE_DIR, stem + ".prof"))
+            stats = pstats.Stats(self.profiler, stream=report)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+
+        if self.mem_after is not None:
+            report.write(f"\n--- tracemalloc: top {PROFILE_TOP_N} allocation deltas ---\n")
+            for stat in self.mem_after.compare_to(self.mem_before, "lineno")[:PROFILE_TOP_N]:
+                report.write(f"{stat}\n")
+
+        with open(os.path.join(PROFILE_DIR, stem + ".txt"), "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        _prune()
+        return stem
+
+
+def _prune() -> None:
+    try:
+        names = sorted(os.listdir(PROFILE_DIR))
+    except FileNotFoundError:
+        return
+    stems = sorted({n.rsplit(".", 1)[0] for n in names if _FILENAME_RE.match(n)})
+    for stem in stems[:-PROFILE_KEEP] if len(stems) > PROFILE_KEEP else []:
+        for ext in ("prof", "txt", "html"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, f"{stem}.{ext}"))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit: int = 50) -> List[Dict[str, Any]]:
+    """최근 프로파일 목록 (최신순)"""
+    try:
+        names = os.listdir(PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    entries: Dict[str, Dict[str, Any]] = {}
+    for name in names:
+        m = _FILENAME_RE.match(name)
+        if not m:
+            continue
+        stem = name.rsplit(".", 1)[0]
+        entry = entries.setdefault(
+            stem,
+            {
+                "id": m.group("id"),
+                "method": m.group("method"),
+                "route": m.group("route"),
+                "elapsed_ms": int(m.group("ms")),
+                "files": [],
+            },
+        )
+        entry["files"].append(name)
+    return sorted(entries.values(), key=lambda e: e["id"], reverse=True)[:limit]
+
+
+def profile_path(name: str) -> Optional[str]:
+    """다운로드 대상 파일 경로. 이름 형식이 맞지 않으면 None (경로 조작 방지)"""
+    if not _FILENAME_RE.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def _header(scope, key: bytes) -> Optional[str]:
+    for k, v in scope.get("headers") or []:
+        if k == key:
+            return v.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware: 관리자 헤더 또는 샘플링으로 선택된 요청만 프로파일링"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    def _wants_profile(self, scope) -> bool:
+        if is_admin(_header(scope, PROFILE_HEADER)):
+            return True
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if not _active.acquire(blocking=False):
+            # 다른 요청을 프로파일링 중이면 건너뜀
+            await self.app(scope, receive, send)
+            return
+
+        with_memory = PROFILE_TRACEMALLOC or (_header(scope, MEMORY_HEADER) or "").lower() in ("1", "true", "yes")
+        session = _Session(with_memory)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-profile-id", session.id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with session:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            _active.release()
+            await asyncio.to_thread(session.save, scope["method"], route_template(scope))
@@ -0,0 +1,188 @@
+"""Rate history: 예금/적금 옵션 금리의 변화 시점만 쌓는 시계열.
+
+갱신(스케줄러의 FSS 수집, Finlife 카탈로그 스냅샷 교체)마다 (상품, 만기, 금리유형)별 마지막 값과 비교해
+바뀐 점만 rate_history 에 추가한다. 값이 그대로면 행이 늘지 않으므로 몇 년치가 쌓여도 작다.
+
+조회는 (fin_prdt_cd, save_trm, observed_at) 인덱스 범위만 읽고, 점이 max_points 보다 많으면
+시간 구간별 [마지막값, 최솟값, 최댓값] 으로 줄인다. 계단 함수이므로 구간 시작 전 마지막 값을
+시작점으로 이어 붙인다.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.db_conn import engine
+from app.db.models import RateHistory
+from .finance_catalog import TERM_FAMILIES, _parse_float, _parse_int
+
+HISTORY_DEFAULT_POINTS = 200
+HISTORY_MAX_POINTS = 2000
+
+SeriesKey = Tuple[str, int, str]  # (fin_prdt_cd, save_trm, rate_type)
+
+
+def extract_points(raw: Dict[str, List[Dict]]) -> Dict[SeriesKey, Tuple[Optional[float], Optional[float]]]:
+    """optionList → {(상품, 만기, 금리유형): (기본금리, 최고금리)} (같은 키가 여러 번이면 마지막 값)"""
+    points: Dict[SeriesKey, Tuple[Optional[float], Optional[float]]] = {}
+    for opt in raw.get("optionList") or []:
+        code = opt.get("fin_prdt_cd")
+        term = _parse_int(opt.get("save_trm"))
+        if not code or not term:
+            continue
+        rate_type = str(opt.get("intr_rate_type") or "")[:2]
+        points[(code, term, rate_type)] = (_parse_float(opt.get("intr_rate")), _parse_float(opt.get("intr_rate2")))
+    return points
+
+
+def _latest(conn, family: str) -> Dict[SeriesKey, Tuple[Optional[float], Optional[float]]]:
+    # 추가 전용 테이블이라 id 가 가장 큰 행이 최신 값
+    last_ids = (
+        select(func.max(RateHistory.id))
+        .where(RateHistory.family == family)
+        .group_by(RateHistory.fin_prdt_cd, RateHistory.save_trm, RateHistory.rate_type)
+    )
+    rows = conn.execute(
+        select(
+            RateHistory.fin_prdt_cd,
+            RateHistory.save_trm,
+            RateHistory.rate_type,
+            RateHistory.intr_rate,
+            RateHistory.intr_rate2,
+        ).where(RateHistory.id.in_(last_ids))
+    )
+    return {(r.fin_prdt_cd, r.save_trm, r.rate_type): (r.intr_rate, r.intr_rate2) for r in rows}
+
+
+def record_snapshot(family: str, raw: Dict[str, List[Dict]], observed_at: Optional[datetime] = None) -> int:
+    """스냅샷에서 바뀐 점만 추가하고 추가한 행 수를 돌려준다 (동기, 스레드/스케줄러에서 호출)"""
+    if family not in TERM_FAMILIES:
+        return 0
+    points = extract_points(raw)
+    if not points:
+        return 0
+    observed_at = observed_at or datetime.now()
+    with engine.begin() as conn:
+        latest = _latest(conn, family)
+        rows = [
+            {
+                "family": family,
+                "fin_prdt_cd": code,
+                "save_trm": term,
+                "rate_type": rate_type,
+                "intr_rate": base,
+                "intr_rate2": top,
+                "observed_at": observed_at,
+            }
+            for (code, term, rate_type), (base, top) in points.items()
+            if latest.get((code, term, rate_type)) != (base, top)
+        ]
+        if rows:
+            conn.execute(insert(RateHistory), rows)
+    return len(rows)
+
+
+def _point(t: datetime, base: Optional[float], top: Optional[float]) -> Dict[str, Any]:
+    rate = top if top is not None else base
+    return {"t": t.isoformat(), "rate": rate, "base_rate": base, "min": rate, "max": rate}
+
+
+def downsample(
+    rows: List[Tuple[datetime, Optional[float], Optional[float]]],
+    start: datetime,
+    end: datetime,
+    max_points: int,
+) -> List[Dict[str, Any]]:
+    """변화 시점 목록(시간순) → 최대 max_points 개 점. 넘치면 구간별 마지막값/최솟값/최댓값"""
+    if len(rows) <= max_points or end <= start:
+        return [_point(*row) for row in rows]
+    width = (end - start) / max_points
+    buckets: List[Dict[str, Any]] = []
+    current: Dict[str, Any] = {}
+    current_index = -1
+    previous: Optional[float] = None
+    for t, base, top in rows:
+        index = min(max_points - 1, int((t - start) / width)) if t > start else 0
+        rate = top if top is not None else base
+        if index != current_index:
+            # 구간 시작부터 첫 변화 전까지는 이전 값이 유지되므로 최솟값/최댓값에 포함
+            current = _point(start + width * index, base, top)
+            current["min"] = current["max"] = previous
+            buckets.append(current)
+            current_index = index
+        current["rate"] = rate
+        current["base_rate"] = base
+        if rate is not None:
+            current["min"] = rate if current["min"] is None else min(current["min"], rate)
+            current["max"] = rate if current["max"] is None else max(current["max"], rate)
+        previous = rate
+    return buckets
+
+
+async def product_history(
+    db: AsyncSession,
+    fin_prdt_cd: str,
+    *,
+    term: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    max_points: int = HISTORY_DEFAULT_POINTS,
+) -> Dict[str, Any]:
+    max_points = max(2, min(max_points, HISTORY_MAX_POINTS))
+    columns = (
+        RateHistory.family,
+        RateHistory.save_trm,
+        RateHistory.rate_type,
+        RateHistory.observed_at,
+        RateHistory.intr_rate,
+        RateHistory.intr_rate2,
+    )
+    query = select(*columns).where(RateHistory.fin_prdt_cd == fin_prdt_cd)
+    if term is not None:
+        query = query.where(RateHistory.save_trm == term)
+    if start is not None:
+        query = query.where(RateHistory.observed_at >= start)
+    if end is not None:
+        query = query.where(RateHistory.observed_at <= end)
+    rows = (await db.execute(query.order_by(RateHistory.save_trm, RateHistory.observed_at, RateHistory.id))).all()
+
+    # 구간 시작 이전의 마지막 값 (계단 함수의 시작점)
+    carried: Iterable = []
+    if start is not None:
+        before = select(func.max(RateHistory.id)).where(
+            RateHistory.fin_prdt_cd == fin_prdt_cd, RateHistory.observed_at < start
+        )
+        if term is not None:
+            before = before.where(RateHistory.save_trm == term)
+        before = before.group_by(RateHistory.save_trm, RateHistory.rate_type)
+        carried = (await db.execute(select(*columns).where(RateHistory.id.in_(before)))).all()
+
+    series: Dict[Tuple[int, str], List[Tuple[datetime, Optional[float], Optional[float]]]] = {}
+    family = None
+    for r in carried:
+        family = family or r.family
+        series.setdefault((r.save_trm, r.rate_type), []).append((start, r.intr_rate, r.intr_rate2))
+    for r in rows:
+        family = family or r.family
+        series.setdefault((r.save_trm, r.rate_type), []).append((r.observed_at, r.intr_rate, r.intr_rate2))
+
+    span_start = start or min((points[0][0] for points in series.values()), default=None)
+    span_end = end or datetime.now()
+    result = []
+    for (save_trm, rate_type), points in sorted(series.items()):
+        result.append(
+            {
+                "save_trm": save_trm,
+                "rate_type": rate_type,
+                "changes": len(points),
+                "points": downsample(points, span_start, span_end, max_points),
+            }
+        )
+    return {
+        "fin_prdt_cd": fin_prdt_cd,
+        "family": family,
+        "start": span_start.isoformat() if span_start else None,
+        "end": span_end.isoformat(),
+        "series": result,
+    }
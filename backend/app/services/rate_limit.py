@@ -0,0 +1,189 @@
+"""Per-client rate limiting and per-group load shedding (pure ASGI middleware).
+
+- 클라이언트별 토큰 버킷: Bearer 토큰이 유효하면 사용자 id, 아니면 클라이언트 IP 로 구분한다.
+  초당 RATE_LIMIT_RATE 토큰이 차고 최대 RATE_LIMIT_BURST 까지 모인다. 요청은 경로별 비용(RATE_LIMIT_COSTS)만큼
+  토큰을 쓰므로 /chat/reply(Gemini 호출), /auth/login(PBKDF2) 처럼 비싼 경로가 먼저 막힌다.
+- 경로 그룹(/chat, /finance, /auth …)별 동시 처리 상한(RATE_LIMIT_CONCURRENCY). 가득 차면 기다리지 않고 바로 거절한다.
+- 거절은 429 + Retry-After(초). 버킷은 최근 사용 순으로 RATE_LIMIT_MAX_CLIENTS 개까지만 메모리에 둔다.
+
+워커(프로세스)별 메모리 상태라서 전체 한도는 워커 수만큼 곱해진다.
+이벤트 루프 한 스레드에서만 호출되므로 잠금을 쓰지 않는다.
+"""
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from .metrics import RATE_LIMITED
+from .security import decode_token
+from .serialization import dumps
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_RATE = float(os.getenv("RATE_LIMIT_RATE", "5"))  # tokens refilled per second per client
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "30"))
+RATE_LIMIT_DEFAULT_COST = float(os.getenv("RATE_LIMIT_DEFAULT_COST", "1"))
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+RATE_LIMIT_TRUST_FORWARDED = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+TOKEN_CACHE_TTL = 60.0  # seconds a decoded bearer token → user id is reused
+
+
+def _parse_pairs(raw: str) -> Dict[str, float]:
+    """"POST /chat/reply=5,/chat=8" → {"POST /chat/reply": 5.0, "/chat": 8.0}"""
+    pairs: Dict[str, float] = {}
+    for part in raw.split(","):
+        key, sep, value = part.strip().rpartition("=")
+        if sep and key.strip():
+            pairs[key.strip()] = float(value)
+    return pairs
+
+
+RATE_LIMIT_COSTS = _parse_pairs(
+    os.getenv(
+        "RATE_LIMIT_COSTS",
+        "POST /chat/reply=5,POST /auth/login=4,POST /auth/register=4,"
+        "POST /finance/recommendations=2,POST /finance/recommendations/sweep=3,POST /finance/recommendations/batch=10",
+    )
+)
+RATE_LIMIT_CONCURRENCY = {
+    group: int(limit)
+    for group, limit in _parse_pairs(os.getenv("RATE_LIMIT_CONCURRENCY", "/chat=16,/auth=16,/finance=64")).items()
+}
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated = now
+
+    def take(self, cost: float, rate: float, burst: float, now: float) -> float:
+        """cost 만큼 꺼낸다. 성공하면 0, 부족하면 다시 시도할 때까지 기다릴 초"""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        if rate <= 0:
+            return math.inf
+        return (cost - self.tokens) / rate
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float = RATE_LIMIT_RATE,
+        burst: float = RATE_LIMIT_BURST,
+        costs: Optional[Dict[str, float]] = None,
+        default_cost: float = RATE_LIMIT_DEFAULT_COST,
+        concurrency: Optional[Dict[str, int]] = None,
+        max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.costs = RATE_LIMIT_COSTS if costs is None else costs
+        self.default_cost = default_cost
+        self.concurrency = RATE_LIMIT_CONCURRENCY if concurrency is None else concurrency
+        self.max_clients = max_clients
+        self.in_flight: Dict[str, int] = {group: 0 for group in self.concurrency}
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._tokens: Dict[str, Tuple[Optional[str], float]] = {}
+
+    def cost(self, method: str, path: str) -> float:
+        found = self.costs.get(f"{method} {path}")
+        return self.default_cost if found is None else found
+
+    def acquire(self, client: str, cost: float, now: Optional[float] = None) -> float:
+        """토큰 버킷에서 cost 만큼 꺼낸다. 0 이면 통과, 아니면 Retry-After 초"""
+        if cost <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.take(cost, self.rate, self.burst, now)
+
+    def user_of(self, token: str) -> Optional[str]:
+        # JWT 검증은 요청마다 하기엔 비싸므로 토큰 → 사용자 id 를 잠깐 기억한다
+        now = time.monotonic()
+        cached = self._tokens.get(token)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+        user = decode_token(token)
+        if len(self._tokens) >= self.max_clients:
+            self._tokens.clear()
+        self._tokens[token] = (user, now + TOKEN_CACHE_TTL)
+        return user
+
+    def client_key(self, scope) -> str:
+        forwarded = None
+        for name, value in scope.get("headers") or ():
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                user = self.user_of(value[7:].decode("latin-1").strip())
+                if user is not None:
+                    return f"user:{user}"
+            elif name == b"x-forwarded-for" and RATE_LIMIT_TRUST_FORWARDED:
+                forwarded = value.decode("latin-1").split(",", 1)[0].strip()
+        if forwarded:
+            return f"ip:{forwarded}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def _reject(send, retry_after: float, reason: str) -> None:
+    seconds = max(1, math.ceil(retry_after)) if math.isfinite(retry_after) else 60
+    body = dumps({"detail": "Too many requests", "reason": reason, "retry_after": seconds})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(seconds).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """토큰 버킷 + 그룹별 동시 처리 상한. 한도를 넘으면 앱까지 가지 않고 429."""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None, skip_paths: Sequence[str] = ("/metrics", "/")) -> None:
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if not RATE_LIMIT_ENABLED or scope["type"] != "http" or scope["path"] in self.skip_paths or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        path = scope["path"]
+        group = "/" + path.lstrip("/").split("/", 1)[0]
+        wait = limiter.acquire(limiter.client_key(scope), limiter.cost(scope["method"], path))
+        if wait > 0:
+            RATE_LIMITED.inc(group, "rate")
+            await _reject(send, wait, "rate")
+            return
+
+        ceiling = limiter.concurrency.get(group)
+        if ceiling is None:
+            await self.app(scope, receive, send)
+            return
+        if limiter.in_flight[group] >= ceiling:
+            RATE_LIMITED.inc(group, "concurrency")
+            await _reject(send, 1, "concurrency")
+            return
+        limiter.in_flight[group] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.in_flight[group] -= 1
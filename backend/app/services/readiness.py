@@ -0,0 +1,153 @@
+"""Liveness / readiness probes and startup warm-up.
+
+- GET /healthz (liveness): 이벤트 루프가 응답하면 200. I/O 를 하지 않으므로 업스트림/DB 장애로 재시작되지 않는다.
+- GET /readyz (readiness): 워밍업이 끝났고 DB 에 연결되면 200, 아니면 503. 본문에는 상품군별 카탈로그
+  버전/나이, 응답·상세 캐시 크기, DB 지연, 업스트림 circuit breaker 상태를 담는다.
+
+워밍업은 startup 직후 백그라운드 task 로 돈다: DB 풀(동기/비동기) 연결, Finlife 상품군 카탈로그 조회 +
+추천 인덱스 구성, 복지 전체 목록 갱신(카탈로그 버전) + 상위 항목 상세 보강. 단계는 동시에 실행한다.
+WARMUP_TIMEOUT 이 지나면 남은 단계는 계속 돌게 두고 readiness 를 켠다. 업스트림이 죽어 있다고 파드가
+계속 unready 면 받아줄 곳이 없어지고, 각 경로는 이미 mock/이전 스냅샷으로 대체하기 때문이다.
+같은 이유로 breaker 가 열려 있어도 ready 로 본다 (상태만 보고한다).
+"""
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.db.db_conn import async_engine, engine
+
+from . import welfare_detail, welfare_provider
+from .circuit_breaker import breaker_status
+from .finance_catalog import CATALOG_STORE, LOAN_FAMILIES, TERM_FAMILIES
+from .response_cache import RESPONSE_CACHE
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))  # seconds before readiness turns on regardless
+READY_DB_TIMEOUT = float(os.getenv("READY_DB_TIMEOUT", "2"))  # seconds for the readiness DB ping
+WARMUP_FINANCE_FAMILIES = [
+    f.strip() for f in os.getenv("WARMUP_FINANCE_FAMILIES", ",".join(TERM_FAMILIES + LOAN_FAMILIES)).split(",") if f.strip()
+]
+
+
+class WarmUp:
+    """워밍업 진행 상태. 단계별 결과는 {"status": running|ok|error, "seconds", "error"}"""
+
+    def __init__(self) -> None:
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timed_out = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._step_tasks: Dict[str, asyncio.Task] = {}
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    async def _run_step(self, name: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        start = time.perf_counter()
+        step = self.steps[name] = {"status": "running", "seconds": None, "error": None}
+        try:
+            await fn()
+            step["status"] = "ok"
+        except Exception as exc:
+            step["status"] = "error"
+            step["error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            step["seconds"] = round(time.perf_counter() - start, 3)
+
+    async def run(self, steps: Dict[str, Callable[[], Awaitable[Any]]], timeout: float = WARMUP_TIMEOUT) -> None:
+        self.started_at = time.time()
+        self._step_tasks = {name: asyncio.create_task(self._run_step(name, fn)) for name, fn in steps.items()}
+        if self._step_tasks:
+            _, pending = await asyncio.wait(self._step_tasks.values(), timeout=timeout)
+            self.timed_out = bool(pending)
+        self.finished_at = time.time()
+        if self.timed_out:
+            slow = [name for name, step in self.steps.items() if step["status"] == "running"]
+            print(f"[WarmUp] ready after {timeout:.0f}s timeout, still running: {', '.join(slow)}")
+
+    def start(self) -> None:
+        if not WARMUP_ENABLED:
+            self.started_at = self.finished_at = time.time()
+            return
+        self._task = asyncio.create_task(self.run(default_steps()))
+
+    def stop(self) -> None:
+        for task in [self._task, *self._step_tasks.values()]:
+            if task is not None and not task.done():
+                task.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": WARMUP_ENABLED,
+            "done": self.done,
+            "timed_out": self.timed_out,
+            "seconds": None if self.started_at is None else round((self.finished_at or time.time()) - self.started_at, 3),
+            "steps": {name: dict(step) for name, step in self.steps.items()},
+        }
+
+
+def _ping_sync() -> None:
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def _ping_async() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def _warm_db() -> None:
+    # 두 풀 모두 첫 연결(SQLite PRAGMA, MySQL 핸드셰이크)을 미리 맺어 둔다
+    await asyncio.gather(asyncio.to_thread(_ping_sync), _ping_async())
+
+
+async def _warm_welfare() -> None:
+    from .welfare_recommendation import recommend_welfare
+
+    # 전체 목록으로 카탈로그 버전을 정한 뒤, 필터 없는 추천 한 번으로 상위 WELFARE_ENRICH_TOP_N 상세 보강
+    await asyncio.to_thread(welfare_provider.refresh_catalog)
+    await asyncio.to_thread(recommend_welfare, region_code=None, job_category=None, age=None, preferences=[])
+
+
+def default_steps() -> Dict[str, Callable[[], Awaitable[Any]]]:
+    steps: Dict[str, Callable[[], Awaitable[Any]]] = {"db": _warm_db, "welfare": _warm_welfare}
+    for family in WARMUP_FINANCE_FAMILIES:
+        steps[f"finance.{family}"] = lambda family=family: CATALOG_STORE.get(family)
+    return steps
+
+
+WARMUP = WarmUp()
+
+
+async def check_db(timeout: float = READY_DB_TIMEOUT) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(_ping_async(), timeout)
+    except Exception as exc:
+        return {"ok": False, "error": f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+async def readiness() -> Tuple[bool, Dict[str, Any]]:
+    """(ready, 보고서). ready = 워밍업 끝 + DB 연결 가능"""
+    db = await check_db()
+    ready = WARMUP.done and db["ok"]
+    return ready, {
+        "ready": ready,
+        "warmup": WARMUP.status(),
+        "db": db,
+        "catalogs": {
+            "finance": CATALOG_STORE.status(),
+            "welfare": await asyncio.to_thread(welfare_provider.catalog_status),
+        },
+        "caches": {
+            "responses": len(RESPONSE_CACHE),
+            "welfare_details": welfare_detail.cache_size(),
+        },
+        "breakers": breaker_status(),
+    }
@@ -0,0 +1,103 @@
+"""Catalog-versioned response cache for the recommendation endpoints.
+
+같은 (검증된 요청 모델, 카탈로그 버전) 이면 응답 본문이 항상 같으므로 직렬화된 바이트를
+LRU 로 보관한다. 키는 둘의 정규화 해시이고 그대로 ETag 가 된다.
+클라이언트가 `If-None-Match` 로 같은 ETag 를 보내면 본문 없이 304 를 돌려준다.
+
+`Cache-Control: private, no-cache`: 단말은 저장하되 매번 재검증 — 카탈로그가 바뀌면 ETag 도 바뀐다.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from .metrics import RESPONSE_CACHE_EVENTS
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))  # seconds
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+    stored_at: float
+
+
+def request_key(namespace: str, model: BaseModel, version: str) -> str:
+    """검증된 요청 모델 + 카탈로그 버전의 정규화 해시"""
+    canonical = json.dumps(model.dict(), sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{namespace}\0{version}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Bounded LRU + TTL. TTL 은 업스트림을 직접 조회해야만 버전이 갱신되는 카탈로그(복지)의 상한이다."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry.stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, body: bytes) -> CachedBody:
+        # 약한 ETag: 같은 내용이라도 gzip/br 인코딩에 따라 바이트가 달라진다
+        entry = CachedBody(body=body, etag=f'W/"{key[:32]}"', stored_at=time.monotonic())
+        if self.maxsize <= 0:
+            return entry
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+def cached_response(request: Request, entry: CachedBody, namespace: str, hit: bool) -> Response:
+    """ETag 가 맞으면 304(본문 없음), 아니면 캐시된 본문"""
+    headers = {"ETag": entry.etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(request, entry.etag):
+        RESPONSE_CACHE_EVENTS.inc(namespace, "not_modified")
+        return Response(status_code=304, headers=headers)
+    RESPONSE_CACHE_EVENTS.inc(namespace, "hit" if hit else "miss")
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+RESPONSE_CACHE = ResponseCache()
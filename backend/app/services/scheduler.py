@@ -1,14 +1,18 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from app.services.fss_service import fetch_fss_deposit_products
-from app.db.db_conn import save_financial_products
+from app.services import jobs
 
 def update_fss_data():
-    data = fetch_fss_deposit_products()
-    if data:
-        save_financial_products(data)
-        print(f"[Scheduler] FSS data updated: {len(data)} entries")
+    # 수동 갱신(/data/refresh/fss)과 같은 작업 큐로 넘겨 동시에 두 번 돌지 않게 한다
+    submission = jobs.submit("refresh.fss", dedup_key="refresh.fss")
+    print(f"[Scheduler] FSS refresh job {submission.job_id} ({'already running' if submission.deduplicated else 'queued'})")
+
+def update_welfare_catalog():
+    # 복지 카탈로그 버전은 이 전체 갱신에서만 바뀐다 (welfare_provider.refresh_catalog)
+    submission = jobs.submit("refresh.welfare_catalog", dedup_key="refresh.welfare_catalog")
+    print(f"[Scheduler] welfare catalog refresh job {submission.job_id} ({'already running' if submission.deduplicated else 'queued'})")
 
 def start_scheduler():
     scheduler = BackgroundScheduler()
     scheduler.add_job(update_fss_data, "interval", hours=6)
+    scheduler.add_job(update_welfare_catalog, "interval", hours=6)
     scheduler.start()
@@ -4,6 +4,7 @@ from typing import Optional
 from jose import jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+from .metrics import PASSWORD_HASH_LATENCY
 
 load_dotenv()
 
@@ -16,11 +17,13 @@ pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    with PASSWORD_HASH_LATENCY.time("verify"):
+        return pwd_context.verify(plain, hashed)
 
 
 def hash_password(plain: str) -> str:
-    return pwd_context.hash(plain)
+    with PASSWORD_HASH_LATENCY.time("hash"):
+        return pwd_context.hash(plain)
 
 
 def create_access_token(subject: str, expires_delta: Optional[timedelta] = None) -> str:
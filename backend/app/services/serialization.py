@@ -0,0 +1,59 @@
+"""Response encoding: orjson(설치 시) 기반 JSON, 재검증 없는 내부 응답 경로, 압축 미들웨어.
+
+- FastJSONResponse: 앱 기본 응답 클래스. orjson 이 없으면 표준 json 으로 같은 형식(공백 없음, UTF-8)을 만든다.
+- trusted_body/trusted_response: 서비스 계층이 response model 모양 그대로 만든 dict 를
+  pydantic 재검증/jsonable_encoder 없이 바로 직렬화한다. RESPONSE_VALIDATE=true 면 개발용으로 다시 검증.
+- add_compression: Accept-Encoding 협상 압축. brotli-asgi 가 설치돼 있으면 br(+gzip 폴백), 아니면 gzip.
+"""
+import json
+import os
+from typing import Any, Type
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+RESPONSE_VALIDATE = os.getenv("RESPONSE_VALIDATE", "false").lower() in ("1", "true", "yes")
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+RESPONSE_COMPRESS_LEVEL = int(os.getenv("RESPONSE_COMPRESS_LEVEL", "6"))
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted_body(model_cls: Type[BaseModel], content: Any) -> bytes:
+    """내부에서 만든 응답 dict → JSON 바이트 (model_cls 는 RESPONSE_VALIDATE 일 때만 쓴다)"""
+    if RESPONSE_VALIDATE:
+        content = jsonable_encoder(model_cls(**content))
+    return dumps(content)
+
+
+def trusted_response(model_cls: Type[BaseModel], content: Any, **kwargs) -> Response:
+    return Response(content=trusted_body(model_cls, content), media_type="application/json", **kwargs)
+
+
+def add_compression(app: FastAPI) -> str:
+    """압축 미들웨어 등록, 사용한 방식 이름을 돌려준다"""
+    try:
+        from brotli_asgi import BrotliMiddleware  # type: ignore
+    except ImportError:
+        from fastapi.middleware.gzip import GZipMiddleware
+
+        app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESS_MIN_BYTES, compresslevel=RESPONSE_COMPRESS_LEVEL)
+        return "gzip"
+    app.add_middleware(BrotliMiddleware, minimum_size=RESPONSE_COMPRESS_MIN_BYTES, gzip_fallback=True)
+    return "br"
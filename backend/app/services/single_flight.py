@@ -0,0 +1,94 @@
+"""Single-flight: 같은 키로 동시에 들어온 호출은 한 번만 실행하고 결과(또는 예외)를 나눠 받는다.
+
+콜드 스타트나 캐시 만료 직후 같은 업스트림 조회(Finlife 전체 페이지, 같은 키워드의 복지 목록)가
+요청 수만큼 동시에 나가지 않도록 한다. 이미 끝난 결과를 저장하지는 않는다 (캐시는 호출 측 몫).
+
+- SingleFlight: asyncio 용. 실제 호출은 별도 task 로 돌리므로 먼저 온 요청이 취소돼도 기다리는 쪽은 결과를 받는다.
+  task 는 이벤트 루프에 묶이므로 진행 중 호출은 루프별로 따로 관리한다 (백그라운드 작업의 전용 루프 등).
+- SyncSingleFlight: 스레드 용 (복지 출처 조회 스레드 풀).
+
+합쳐진(기다리기만 한) 호출 수는 single_flight_collapsed_total{name} 으로 센다.
+"""
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from .metrics import SINGLE_FLIGHT_COLLAPSED
+
+T = TypeVar("T")
+
+
+def _consume(task: "asyncio.Task") -> None:
+    # 기다리던 요청이 모두 취소된 채 실패하면 "exception was never retrieved" 경고가 남지 않도록
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        calls = self._calls.get(loop)
+        if calls is None:
+            calls = self._calls[loop] = {}
+        task = calls.get(key)
+        if task is None:
+            task = loop.create_task(fn())
+            calls[key] = task
+            task.add_done_callback(_consume)
+            task.add_done_callback(lambda t: calls.pop(key) if calls.get(key) is t else None)
+        else:
+            SINGLE_FLIGHT_COLLAPSED.inc(self.name)
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return sum(len(calls) for calls in list(self._calls.values()))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SyncSingleFlight:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            SINGLE_FLIGHT_COLLAPSED.inc(self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,277 @@
+"""Welfare detail enrichment (한국사회보장정보원 상세 API, getWlfareInfoDetail).
+
+목록 API 는 지원대상/연령/지역을 주지 않아서 map_item 이 전국·0~120세·직업무관으로 채운다.
+추천 상위 N개만 상세 API 를 동시에(최대 WELFARE_DETAIL_CONCURRENCY, 호출당 WELFARE_DETAIL_TIMEOUT)
+조회해 지원대상(tgtrDtlCn)·선정기준(slctCritCn)·생애주기(lifeArray)·대상(trgterIndvdlArray)·
+시도(ctpvNm)에서 region_scope / eligible(min_age, max_age, jobs) 를 뽑는다.
+
+상세는 servId 기준으로 WELFARE_DETAIL_TTL(기본 1일) 동안 캐시하고, 실패한 servId 는
+WELFARE_DETAIL_NEGATIVE_TTL 동안 다시 부르지 않는다. 보강된 항목은 카탈로그에 반영되어
+이후 목록 조회에서도 유지된다(welfare_provider.register_enriched).
+상세 API 는 중앙부처 servId 만 알기 때문에 지자체/큐레이션 출처 항목(source)은 보강하지 않는다.
+모르는 id 를 물으면 예산과 negative cache 를 낭비하고, 오류가 나면 welfare.detail 회로까지 열 수 있다.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import http_client
+
+from . import welfare_provider
+from .circuit_breaker import CircuitOpenError, breaker
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY, WELFARE_DETAIL_LOOKUPS
+from .single_flight import SyncSingleFlight
+
+WELFARE_API_DETAIL_PATH = os.getenv("WELFARE_API_DETAIL_PATH", "/getWlfareInfoDetail")
+WELFARE_ENRICH_TOP_N = int(os.getenv("WELFARE_ENRICH_TOP_N", "20"))
+WELFARE_DETAIL_CONCURRENCY = int(os.getenv("WELFARE_DETAIL_CONCURRENCY", "8"))
+WELFARE_DETAIL_TIMEOUT = float(os.getenv("WELFARE_DETAIL_TIMEOUT", "3"))  # seconds, per call
+WELFARE_DETAIL_TTL = float(os.getenv("WELFARE_DETAIL_TTL", "86400"))
+WELFARE_DETAIL_NEGATIVE_TTL = float(os.getenv("WELFARE_DETAIL_NEGATIVE_TTL", "300"))
+WELFARE_DETAIL_CACHE_SIZE = int(os.getenv("WELFARE_DETAIL_CACHE_SIZE", "5000"))
+
+# 생애주기 → 연령 범위 (본문에 나이가 없을 때만 사용)
+LIFE_STAGE_AGES = {
+    "영유아": (0, 6),
+    "아동": (0, 12),
+    "청소년": (9, 24),
+    "청년": (19, 39),
+    "중장년": (40, 64),
+    "노년": (65, 120),
+}
+
+# 지원대상 본문/대상 배열의 키워드 → 추천 입력의 직업군
+JOB_KEYWORDS = {
+    "학생": ("학생", "재학생", "대학생"),
+    "직장인": ("근로자", "직장인", "재직자"),
+    "구직자": ("구직자", "실업자", "미취업"),
+    "자영업": ("자영업", "소상공인"),
+    "프리랜서": ("프리랜서", "특수형태근로"),
+    "농어업인": ("농업인", "어업인", "농어업인", "농어민"),
+}
+
+# 도 이름 약칭(충북) 외에 상세 API 가 쓰는 정식 명칭(충청북도)도 인식
+REGION_ALIASES = {
+    "43": ("충청북도",), "44": ("충청남도",), "45": ("전라북도", "전북특별자치도"),
+    "46": ("전라남도",), "47": ("경상북도",), "48": ("경상남도",),
+}
+
+# 지자체복지서비스 목록 API 의 ctpvNm 은 정식 시도명으로 맞춰야 걸린다 (약칭 '충북' 으로는 0건)
+REGION_FULL_NAMES = {
+    "11": "서울특별시", "26": "부산광역시", "27": "대구광역시", "28": "인천광역시", "29": "광주광역시",
+    "30": "대전광역시", "31": "울산광역시", "36": "세종특별자치시", "41": "경기도", "51": "강원특별자치도",
+    "43": "충청북도", "44": "충청남도", "45": "전북특별자치도", "46": "전라남도", "47": "경상북도",
+    "48": "경상남도", "50": "제주특별자치도",
+}
+
+_RANGE_RE = re.compile(r"(\d{1,3})\s*세?\s*[~∼\-]\s*(?:만\s*)?(\d{1,3})\s*세")
+_MIN_RE = re.compile(r"(\d{1,3})\s*세\s*(이상|초과|부터)")
+_MAX_RE = re.compile(r"(\d{1,3})\s*세\s*(이하|미만|까지)")
+
+_executor = ThreadPoolExecutor(max_workers=max(1, WELFARE_DETAIL_CONCURRENCY), thread_name_prefix="welfare-detail")
+
+_DETAIL_FLIGHTS = SyncSingleFlight("welfare.detail")
+
+# servId → (만료 시각, 정규화된 상세 또는 None=실패)
+_cache: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(_text(v) for v in value)
+    if isinstance(value, dict):
+        return " ".join(_text(v) for v in value.values())
+    return str(value)
+
+
+def _split(value: Any) -> List[str]:
+    return [v.strip() for v in re.split(r"[,/]", _text(value)) if v.strip()]
+
+
+def parse_age_range(text: str, life_stages: List[str]) -> Tuple[int, int]:
+    """본문의 '만 19세 ~ 34세', '65세 이상', '18세 미만' 등 → (min_age, max_age)"""
+    m = _RANGE_RE.search(text)
+    if m:
+        lo, hi = int(m.group(1)), int(m.group(2))
+        if lo <= hi:
+            return lo, hi
+    min_age: Optional[int] = None
+    max_age: Optional[int] = None
+    m = _MIN_RE.search(text)
+    if m:
+        min_age = int(m.group(1)) + (1 if m.group(2) == "초과" else 0)
+    m = _MAX_RE.search(text)
+    if m:
+        max_age = int(m.group(1)) - (1 if m.group(2) == "미만" else 0)
+    if min_age is not None or max_age is not None:
+        lo, hi = min_age or 0, 120 if max_age is None else max_age
+        if lo <= hi:
+            return lo, hi
+
+    ranges = [LIFE_STAGE_AGES[s] for s in life_stages if s in LIFE_STAGE_AGES]
+    if ranges and len(ranges) == len(life_stages):
+        return min(r[0] for r in ranges), max(r[1] for r in ranges)
+    return 0, 120
+
+
+def parse_jobs(text: str) -> List[str]:
+    return [job for job, keywords in JOB_KEYWORDS.items() if any(k in text for k in keywords)]
+
+
+def parse_regions(ctpv: str, text: str) -> List[str]:
+    """시도명 필드가 있으면 그것으로, 없으면 본문의 'OO 거주' 표현에서 시도 코드 추출 (없으면 전국)"""
+    codes: List[str] = []
+    for code, name in welfare_provider.REGION_NAMES.items():
+        names = (name,) + REGION_ALIASES.get(code, ())
+        if ctpv:
+            if any(part.startswith(names) for part in _split(ctpv)):
+                codes.append(code)
+        elif any(re.search(rf"{n}\S*\s*(?:에\s*)?거주", text) for n in names):
+            codes.append(code)
+    return codes
+
+
+def normalize_detail(record: Dict[str, Any]) -> Dict[str, Any]:
+    """상세 API 레코드 → 카탈로그 항목에 덮어쓸 필드"""
+    target = _text(record.get("tgtrDtlCn"))
+    criteria = _text(record.get("slctCritCn"))
+    benefit = _text(record.get("alwServCn"))
+    life_stages = _split(record.get("lifeArray"))
+    body = " ".join((target, criteria, _text(record.get("trgterIndvdlArray"))))
+    min_age, max_age = parse_age_range(f"{target} {criteria}", life_stages)
+    return {
+        "region_scope": parse_regions(_text(record.get("ctpvNm")).strip(), body),
+        "eligible": {"min_age": min_age, "max_age": max_age, "jobs": parse_jobs(body)},
+        "detail": {
+            "target": target.strip(),
+            "criteria": criteria.strip(),
+            "benefit": benefit.strip(),
+            "life_stages": life_stages,
+        },
+    }
+
+
+def _find_record(raw: Any, depth: int = 0) -> Optional[Dict[str, Any]]:
+    """JSON(response/body/...) 또는 XML(wantedDtl) 어느 형태든 servId/tgtrDtlCn 를 가진 dict 를 찾는다"""
+    if not isinstance(raw, dict) or depth > 5:
+        return None
+    if "tgtrDtlCn" in raw or "servId" in raw:
+        return raw
+    for value in raw.values():
+        found = _find_record(value, depth + 1)
+        if found is not None:
+            return found
+    return None
+
+
+def _fetch_detail(serv_id: str) -> Optional[Dict[str, Any]]:
+    url = f"{welfare_provider.WELFARE_API_BASE.rstrip('/')}{WELFARE_API_DETAIL_PATH}"
+    params = {"serviceKey": welfare_provider.WELFARE_API_KEY, "servId": serv_id, "resultType": "json", "type": "json"}
+    circuit = breaker("welfare.detail")
+    try:
+        # 회로가 열려 있으면 호출 없이 실패로 처리 (servId 별 negative TTL 로 잠시 다시 묻지 않는다)
+        circuit.before_call()
+    except CircuitOpenError:
+        return None
+    try:
+        with UPSTREAM_LATENCY.time("welfare", "detail"):
+            res = http_client.get_sync(url, params=params, timeout=WELFARE_DETAIL_TIMEOUT)
+        res.raise_for_status()
+        try:
+            raw = res.json()
+        except ValueError:
+            import xmltodict  # type: ignore
+
+            raw = xmltodict.parse(res.text)
+    except Exception as exc:
+        UPSTREAM_ERRORS.inc("welfare", "detail")
+        circuit.record_failure(exc)
+        return None
+    circuit.record_success()
+    record = _find_record(raw)
+    return normalize_detail(record) if record else None
+
+
+def _cached(serv_id: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    with _cache_lock:
+        entry = _cache.get(serv_id)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del _cache[serv_id]
+            return False, None
+        _cache.move_to_end(serv_id)
+        return True, entry[1]
+
+
+def _store(serv_id: str, detail: Optional[Dict[str, Any]]) -> None:
+    ttl = WELFARE_DETAIL_TTL if detail is not None else WELFARE_DETAIL_NEGATIVE_TTL
+    with _cache_lock:
+        _cache[serv_id] = (time.monotonic() + ttl, detail)
+        _cache.move_to_end(serv_id)
+        while len(_cache) > WELFARE_DETAIL_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def enabled() -> bool:
+    """실제 API 목록을 받은 경우에만 보강 (mock 데이터는 이미 자격 정보가 있다)"""
+    status = welfare_provider.provider_status()
+    return WELFARE_ENRICH_TOP_N > 0 and not welfare_provider.USE_MOCK and not status.get("last_error")
+
+
+def enrichable(program: Dict[str, Any]) -> bool:
+    """상세 API 로 보강할 수 있는 항목인지 (중앙부처 출처, source 가 없던 이전 항목도 중앙부처로 본다)"""
+    return bool(program.get("id")) and program.get("source", "central") == "central"
+
+
+def enrich(programs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """programs 의 상세를 보강한 새 목록 (같은 순서). 캐시에 없는 중앙부처 항목만 동시에 조회한다."""
+    details: Dict[str, Optional[Dict[str, Any]]] = {}
+    missing: List[str] = []
+    for p in programs:
+        pid = p.get("id")
+        if not enrichable(p) or pid in details:
+            continue
+        hit, detail = _cached(pid)
+        if hit:
+            WELFARE_DETAIL_LOOKUPS.inc("hit" if detail is not None else "negative_hit")
+            details[pid] = detail
+        else:
+            missing.append(pid)
+
+    if missing:
+        # 다른 요청이 같은 servId 를 조회 중이면 그 결과를 함께 받는다
+        futures = {_executor.submit(_DETAIL_FLIGHTS.do, pid, partial(_fetch_detail, pid)): pid for pid in missing}
+        # 호출당 timeout 은 requests 가 지키고, 큐 대기까지 포함한 전체 상한은 여기서 둔다
+        rounds = -(-len(missing) // max(1, WELFARE_DETAIL_CONCURRENCY))
+        done, _ = wait(futures, timeout=WELFARE_DETAIL_TIMEOUT * rounds + 1)
+        for future, pid in futures.items():
+            detail = future.result() if future in done else None
+            WELFARE_DETAIL_LOOKUPS.inc("fetched" if detail is not None else "failed")
+            if future in done:
+                _store(pid, detail)
+            details[pid] = detail
+
+    enriched: List[Dict[str, Any]] = []
+    for p in programs:
+        detail = details.get(p.get("id"))
+        enriched.append({**p, **detail} if detail else p)
+    return enriched
+
+
+def cache_size() -> int:
+    with _cache_lock:
+        return len(_cache)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
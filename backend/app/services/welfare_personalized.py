@@ -0,0 +1,151 @@
+"""Per-user materialized welfare recommendations.
+
+프로필 저장 시 추천을 계산해 [[program_id, score], ...] 형태로 저장하고, 조회 시 카탈로그로 확장한다.
+카탈로그 버전이 바뀌면(welfare_provider.refresh_catalog) welfare.rematerialize 작업이 이전 버전으로
+저장된 추천을 다시 계산한다. 그 전에 조회된 사용자는 조회 요청에서 다시 계산한다.
+버전을 아직 모르는 동안(첫 전체 갱신 전)은 저장된 추천을 그대로 쓰고, 저장된 게 없을 때만 계산한다.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.db_conn import AsyncSessionLocal, SessionLocal
+from app.db.models import UserProfile, UserWelfareRecommendation
+from .welfare_provider import catalog_version, get_programs_by_ids
+from .welfare_recommendation import recommend_welfare
+
+
+def profile_filters(profile: Optional[UserProfile]) -> Dict[str, Any]:
+    if profile is None:
+        return {"region_code": None, "job_category": None, "age": None, "preferences": []}
+    return {
+        "region_code": profile.region_code,
+        "job_category": profile.job_category,
+        "age": profile.age,
+        "preferences": profile.preferences or [],
+    }
+
+
+def expand_ranking(ranking: List[List[Any]]) -> Optional[List[Dict[str, Any]]]:
+    """저장된 [id, score] 목록을 프로그램 dict로 확장. 카탈로그에 없는 id가 있으면 None"""
+    programs = get_programs_by_ids(pid for pid, _ in ranking)
+    if programs is None:
+        return None
+    items = []
+    for program, (_, score) in zip(programs, ranking):
+        item = dict(program)
+        item["score"] = score
+        items.append(item)
+    return items
+
+
+def _ranking_values(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "catalog_version": catalog_version(),
+        "ranking": [[p["id"], p["score"]] for p in items],
+        "computed_at": datetime.now(),
+    }
+
+
+def _save_ranking(db: Session, user_id: int, values: Dict[str, Any]) -> UserWelfareRecommendation:
+    """사용자당 한 행 upsert. 두 요청이 동시에 처음 저장하면 한쪽은 uq_user_welfare_reco_user 에 걸리므로
+    롤백하고 먼저 들어간 행을 갱신한다."""
+    query = select(UserWelfareRecommendation).where(UserWelfareRecommendation.user_id == user_id)
+    row = db.scalar(query)
+    if row is None:
+        row = UserWelfareRecommendation(user_id=user_id, **values)
+        db.add(row)
+        try:
+            db.commit()
+            return row
+        except IntegrityError:
+            db.rollback()
+            row = db.scalar(query)
+    for key, value in values.items():
+        setattr(row, key, value)
+    db.commit()
+    return row
+
+
+async def materialize(db: AsyncSession, user_id: int) -> Tuple[UserWelfareRecommendation, List[Dict[str, Any]]]:
+    """프로필로 추천을 다시 계산해 저장하고 (행, 확장된 항목)을 반환"""
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user_id))
+    filters = profile_filters(profile)
+    # 외부 API 호출이 섞인 동기 함수이므로 스레드에서 실행
+    items = await asyncio.to_thread(recommend_welfare, **filters)
+    row = await db.run_sync(_save_ranking, user_id, _ranking_values(items))
+    return row, items
+
+
+async def load(db: AsyncSession, user_id: int) -> Tuple[UserWelfareRecommendation, List[Dict[str, Any]], bool]:
+    """저장된 추천을 읽고, 없거나 카탈로그 버전이 다르면 다시 계산. 마지막 값은 캐시 적중 여부
+
+    아직 전체 갱신 전이라 버전을 모르면 저장된 결과를 그대로 돌려준다 (재계산은 갱신 후 welfare.rematerialize 가 맡는다).
+    """
+    row = await db.scalar(
+        select(UserWelfareRecommendation).where(UserWelfareRecommendation.user_id == user_id)
+    )
+    version = catalog_version()
+    if row is not None and (version is None or row.catalog_version == version):
+        items = expand_ranking(row.ranking or [])
+        if items is not None:
+            return row, items, True
+    row, items = await materialize(db, user_id)
+    return row, items, False
+
+
+async def refresh_in_background(user_id: int) -> None:
+    """프로필 저장 직후 BackgroundTasks에서 호출 (요청 세션과 별도 세션 사용)"""
+    async with AsyncSessionLocal() as db:
+        await materialize(db, user_id)
+
+
+def rematerialize_later() -> None:
+    """카탈로그 버전이 바뀐 직후 호출: 저장된 추천 재계산 작업 제출 (이미 대기/실행 중이면 그 작업이 맡는다)"""
+    from . import jobs
+
+    jobs.submit("welfare.rematerialize", dedup_key="welfare.rematerialize")
+
+
+def rematerialize_stale(progress: Optional[Callable[[float, Optional[str]], None]] = None) -> Dict[str, Any]:
+    """현재 카탈로그 버전과 다른 버전으로 저장된 추천을 다시 계산 (작업 스레드에서 동기로 실행).
+    도는 동안 버전이 또 바뀌면 새 버전 기준으로 남은 사용자를 이어서 처리한다."""
+    attempted: Set[int] = set()
+    recomputed = failed = 0
+    version = catalog_version()
+    while version is not None:
+        with SessionLocal() as db:
+            stale = [
+                user_id
+                for user_id in db.scalars(
+                    select(UserWelfareRecommendation.user_id).where(
+                        or_(
+                            UserWelfareRecommendation.catalog_version.is_(None),
+                            UserWelfareRecommendation.catalog_version != version,
+                        )
+                    )
+                )
+                if user_id not in attempted
+            ]
+        if not stale:
+            break
+        for position, user_id in enumerate(stale):
+            if progress is not None:
+                progress(position / len(stale), f"{position}/{len(stale)} users recomputed")
+            attempted.add(user_id)
+            try:
+                with SessionLocal() as db:
+                    profile = db.scalar(select(UserProfile).where(UserProfile.user_id == user_id))
+                    items = recommend_welfare(**profile_filters(profile))
+                    _save_ranking(db, user_id, _ranking_values(items))
+                recomputed += 1
+            except Exception as exc:  # 한 명의 실패가 나머지를 막지 않도록
+                failed += 1
+                print(f"[WelfarePersonalized] user {user_id} not recomputed: {exc}")
+        version = catalog_version()
+    return {"catalog_version": version, "recomputed": recomputed, "failed": failed}
@@ -1,8 +1,17 @@
 import os
-from typing import Any, Dict, List, Optional
+import hashlib
+import threading
+import time
+import contextvars
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import json
-import requests
 from dotenv import load_dotenv
+from . import catalog_snapshot
+from .circuit_breaker import breaker_status
+from .metrics import WELFARE_MOCK_FALLBACKS
+from .single_flight import SyncSingleFlight
 
 load_dotenv()
 
@@ -16,8 +25,11 @@ WELFARE_API_LIST_PATH = os.getenv(
     "/getWlfareInfoList",
 )
 WELFARE_API_KEY = os.getenv("WELFARE_API_KEY", "")
+WELFARE_XML_CHUNK = int(os.getenv("WELFARE_XML_CHUNK", "65536"))  # bytes fed to the XML parser at a time
+WELFARE_CATALOG_MAX = int(os.getenv("WELFARE_CATALOG_MAX", "10000"))  # programs kept in the registry (LRU)
 
-"""Welfare provider for central government services.
+"""Welfare provider: 표준 프로그램 형식, 카탈로그 레지스트리, mock 대체.
+실제 조회는 welfare_sources 가 출처별(중앙부처/지자체/큐레이션)로 동시에 한다.
 Adds debug status so the API can tell the frontend why mock was used.
 """
 
@@ -28,8 +40,39 @@ if _env_mock is None:
 else:
     USE_MOCK = _env_mock.lower() in ("1", "true", "yes")
 
-# debug status
-LAST_ERROR: Optional[str] = None
+# debug status: 조회 결과(오류/출처별 상태)는 요청 컨텍스트별로 두고, 마지막 값은 통째로 교체해 둔다.
+# 동시 요청이 서로의 상태를 덮어쓰지 않도록 provider_status() 는 같은 컨텍스트의 조회 결과를 먼저 본다.
+_FETCH_STATUS: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "welfare_fetch_status", default=None
+)
+_LAST_STATUS: Dict[str, Any] = {"last_error": None, "sources": {}}
+FAILED_SOURCE_STATUSES = ("error", "timeout", "circuit_open")
+
+
+def _set_status(error: Optional[str], sources: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    global _LAST_STATUS
+    status = {"last_error": error, "sources": sources or {}}
+    _FETCH_STATUS.set(status)
+    _LAST_STATUS = status
+
+
+# 카탈로그 레지스트리: 지금까지 받은 프로그램을 id 기준으로 최근 본 순서대로 WELFARE_CATALOG_MAX 개까지 보관.
+# 버전은 전체 목록을 다시 받을 때(refresh_catalog: 스케줄/갱신 작업/워밍업)만 바뀐다. 필터 조회나 상세 보강은
+# 레지스트리에 항목을 더할 뿐 버전을 바꾸지 않는다 (저장된 추천, 응답 캐시 키, 검색 색인이 그대로 유효하다).
+# 버전 값은 전체 목록의 내용 해시라서 업스트림이 그대로면 재시작해도, 다른 워커에서도 같은 값이 나온다.
+_CATALOG: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_CATALOG_VERSION: Optional[str] = None
+_CATALOG_UPDATED_AT: Optional[float] = None  # 마지막 전체 갱신 시각 (epoch)
+_CATALOG_LOCK = threading.Lock()
+_REFRESH_FLIGHT = SyncSingleFlight("welfare.catalog")
+_ENRICHED_FIELDS = ("region_scope", "eligible", "detail")  # 상세 보강이 덮어쓰는 필드
+
+# 시도 코드 → 이름 (검색 키워드, 상세 API 지역 파싱에 사용)
+REGION_NAMES = {
+    "11": "서울", "26": "부산", "27": "대구", "28": "인천", "29": "광주", "30": "대전",
+    "31": "울산", "36": "세종", "41": "경기", "51": "강원", "43": "충북", "44": "충남",
+    "45": "전북", "46": "전남", "47": "경북", "48": "경남", "50": "제주",
+}
 
 
 def _load_mock_data() -> List[Dict[str, Any]]:
@@ -38,6 +81,272 @@ def _load_mock_data() -> List[Dict[str, Any]]:
         return json.load(f)
 
 
+def _content_version(items: List[Dict[str, Any]]) -> str:
+    """전체 목록의 내용 해시 (상세 보강 필드는 빼서, 보강 시점과 상관없이 같은 목록이면 같은 값)"""
+    digest = hashlib.sha1()
+    for item in sorted(items, key=lambda p: str(p.get("id"))):
+        listed = {k: v for k, v in item.items() if k not in _ENRICHED_FIELDS}
+        digest.update(json.dumps(listed, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _remember(items: List[Dict[str, Any]], share: bool = True) -> List[Dict[str, Any]]:
+    """조회 결과를 카탈로그에 반영 (버전은 그대로). 내용이 바뀌었고 share 면 공유 스냅샷도 다시 쓴다."""
+    merged: List[Dict[str, Any]] = []
+    with _CATALOG_LOCK:
+        changed = False
+        for item in items:
+            pid = item.get("id")
+            if pid is None:
+                merged.append(item)
+                continue
+            known = _CATALOG.get(pid)
+            if known is not None and "detail" in known and "detail" not in item:
+                # 목록 재조회로 상세 보강(welfare_detail) 결과가 지워지지 않도록 유지.
+                # 넘겨받은 dict 는 single-flight 대기자들과 공유될 수 있으므로 고치지 않고 사본에 합친다.
+                item = {**item, **{k: known[k] for k in _ENRICHED_FIELDS}}
+            merged.append(item)
+            if known != item:
+                _CATALOG[pid] = item
+                changed = True
+            _CATALOG.move_to_end(pid)
+        while len(_CATALOG) > WELFARE_CATALOG_MAX:
+            _CATALOG.popitem(last=False)
+    if share and changed:
+        catalog_snapshot.write_later(_SNAPSHOT_NAME, _write_snapshot)
+    return merged
+
+
+def register_enriched(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """상세 보강(welfare_detail.enrich) 결과를 카탈로그에 반영하고 반영된 항목을 돌려준다.
+    넘긴 dict 는 바꾸지 않는다 (카탈로그에는 사본이 들어간다)."""
+    return _remember([dict(item) for item in items])
+
+
+# 공유 스냅샷 (catalog_snapshot): 다른 워커가 받은 프로그램/상세 보강 결과를 업스트림 호출 없이 가져온다.
+# 문자열 필드는 문자열 테이블, 연령 상하한은 i4 컬럼, 나머지(지역/카테고리/직업/상세)는 JSON 문자열로 둔다.
+_SNAPSHOT_NAME = "welfare-catalog"
+_SNAPSHOT_WATCHER = catalog_snapshot.Watcher(_SNAPSHOT_NAME)
+_SNAPSHOT_SYNC_LOCK = threading.Lock()
+_SNAPSHOT_STRINGS = ("id", "name", "provider", "summary", "url")
+_SNAPSHOT_AGES = ("min_age", "max_age")
+
+
+def _snapshot_tables(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, catalog_snapshot.Column]]:
+    strings: Dict[str, List[Optional[str]]] = {key: [] for key in _SNAPSHOT_STRINGS}
+    ages: Dict[str, List[int]] = {key: [] for key in _SNAPSHOT_AGES}
+    rest: List[str] = []
+    for item in items:
+        extra = {k: v for k, v in item.items() if k not in _SNAPSHOT_STRINGS or not isinstance(v, str)}
+        for key in _SNAPSHOT_STRINGS:
+            value = item.get(key)
+            strings[key].append(value if isinstance(value, str) else None)
+        eligible = extra.get("eligible")
+        for key in _SNAPSHOT_AGES:
+            value = eligible.get(key) if isinstance(eligible, dict) else None
+            ages[key].append(value if type(value) is int else -1)
+        if isinstance(eligible, dict):
+            extra["eligible"] = {k: v for k, v in eligible.items() if not (k in _SNAPSHOT_AGES and type(v) is int)}
+        rest.append(json.dumps(extra, ensure_ascii=False, separators=(",", ":")))
+    columns: Dict[str, catalog_snapshot.Column] = {key: ("s", values) for key, values in strings.items()}
+    columns.update({key: ("i4", values) for key, values in ages.items()})
+    columns["rest"] = ("s", rest)
+    return {"programs": columns}
+
+
+def _snapshot_items(snap: catalog_snapshot.Snapshot) -> List[Dict[str, Any]]:
+    strings = {key: snap.strings("programs", key) for key in _SNAPSHOT_STRINGS}
+    ages = {key: list(snap.column("programs", key)) for key in _SNAPSHOT_AGES}
+    items = []
+    for i, extra in enumerate(snap.strings("programs", "rest")):
+        item = {key: strings[key][i] for key in _SNAPSHOT_STRINGS if strings[key][i] is not None}
+        item.update(json.loads(extra))
+        eligible = item.get("eligible")
+        if isinstance(eligible, dict):
+            eligible.update({key: ages[key][i] for key in _SNAPSHOT_AGES if ages[key][i] != -1})
+        items.append(item)
+    return items
+
+
+def _write_snapshot() -> None:
+    with _CATALOG_LOCK:
+        items = list(_CATALOG.values())
+        meta = {"version": _CATALOG_VERSION, "refreshed_at": _CATALOG_UPDATED_AT, "programs": len(items)}
+    key = catalog_snapshot.write(_SNAPSHOT_NAME, meta, _snapshot_tables(items))
+    _SNAPSHOT_WATCHER.key = key or _SNAPSHOT_WATCHER.key
+
+
+def _sync_snapshot() -> None:
+    """다른 워커가 쓴 카탈로그 스냅샷이 새로 나왔으면 레지스트리에 합친다 (CATALOG_SNAPSHOT_POLL 간격으로만 확인).
+    그 워커가 더 나중에 전체 갱신을 했으면 버전도 그쪽 것을 따른다.
+    레지스트리를 읽는 경로(저장된 사용자 추천 확장, 검색 색인)만 업스트림 없이 서빙된다.
+    필터 조회(fetch_welfare_programs)는 스냅샷이 있어도 출처별 API 를 그대로 부른다.
+    """
+    global _CATALOG_VERSION, _CATALOG_UPDATED_AT
+    if not _SNAPSHOT_SYNC_LOCK.acquire(blocking=False):
+        return
+    try:
+        if not _SNAPSHOT_WATCHER.changed():
+            return
+        snap = catalog_snapshot.open_snapshot(_SNAPSHOT_NAME)
+        if snap is None:
+            return
+        with snap:
+            items = _snapshot_items(snap)
+            shared_version = snap.meta.get("version")
+            shared_at = snap.meta.get("refreshed_at")
+            _SNAPSHOT_WATCHER.key = snap.key
+        _remember(items, share=False)
+        with _CATALOG_LOCK:
+            if shared_version and shared_at is not None and shared_at > (_CATALOG_UPDATED_AT or 0):
+                _CATALOG_VERSION, _CATALOG_UPDATED_AT = shared_version, shared_at
+    except Exception as exc:
+        print(f"[WelfareProvider] catalog snapshot not loaded: {exc}")
+    finally:
+        _SNAPSHOT_SYNC_LOCK.release()
+
+
+def map_item(r: Dict[str, Any]) -> Dict[str, Any]:
+    """목록 API 레코드 → 표준 프로그램 dict.
+    중앙부처복지서비스의 대표 필드: servId, servNm, jurMnofNm, servDgst, servDtlLink, lifeArray, trgterIndvdlArray, inqryCnt
+    """
+    serv_id = r.get("servId") or r.get("id") or r.get("SERV_ID")
+    name = r.get("servNm") or r.get("title") or r.get("name") or "무제"
+    provider = r.get("jurMnofNm") or r.get("provider") or r.get("dept") or ""
+    url = r.get("servDtlLink") or r.get("url") or ""
+    summary = r.get("servDgst") or r.get("summary") or r.get("desc") or ""
+    # 카테고리 후보: lifeArray, trgterIndvdlArray (쉼표/슬래시 구분)
+    cats_raw = r.get("lifeArray") or r.get("trgterIndvdlArray") or r.get("categories") or ""
+    if isinstance(cats_raw, str):
+        categories = [c.strip() for c in cats_raw.replace("/", ",").split(",") if c.strip()]
+    elif isinstance(cats_raw, list):
+        categories = cats_raw
+    else:
+        categories = []
+    return {
+        "id": str(serv_id) if serv_id is not None else name,
+        "name": name,
+        "provider": provider,
+        "region_scope": [],  # 중앙부처는 기본 전국으로 간주
+        "eligible": {"min_age": 0, "max_age": 120, "jobs": []},
+        "categories": categories,
+        "summary": summary,
+        "url": url,
+    }
+
+
+def iter_xml_items(chunks: Iterable[bytes], tag: str = "item") -> Iterator[Dict[str, str]]:
+    """XML 바이트 청크에서 <item> 을 하나씩 {자식 태그: 텍스트} 로 꺼낸다.
+    꺼낸 요소는 바로 부모에서 떼어내므로 메모리는 청크 + 아이템 하나 정도로 유지된다.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[ET.Element] = []
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag != tag:
+                continue
+            yield {child.tag: (child.text or "").strip() for child in elem}
+            if stack:
+                stack[-1].remove(elem)
+            elem.clear()
+    parser.close()
+
+
+def _json_items(raw: Any) -> List[Dict[str, Any]]:
+    """JSON 응답의 item 목록 (response/body/items[/item], data, items)"""
+    if not isinstance(raw, dict):
+        return []
+    if "response" in raw or "Response" in raw:
+        resp = raw.get("response") or raw.get("Response") or {}
+        body = (resp.get("body") if isinstance(resp, dict) else {}) or {}
+        src_items = body.get("items") or body.get("item") or []
+    else:
+        src_items = raw.get("data") or raw.get("items") or []
+    # items 가 {"item": [...]} 로 한 번 더 감싸진 경우 (XML 을 JSON 으로 변환한 응답)
+    if isinstance(src_items, dict):
+        src_items = src_items.get("item", src_items)
+    if isinstance(src_items, dict):
+        src_items = [src_items]
+    return [r for r in src_items if isinstance(r, dict)]
+
+
+def _mock_fallback(reason: str) -> List[Dict[str, Any]]:
+    WELFARE_MOCK_FALLBACKS.inc(reason)
+    return _remember(_load_mock_data())
+
+
+def refresh_catalog() -> Dict[str, Any]:
+    """필터 없는 전체 목록을 다시 받아 카탈로그 버전을 정한다 (스케줄/갱신 작업/워밍업).
+
+    업스트림이 전부 실패해 mock 으로 대체됐으면 RuntimeError 를 올리고 버전은 그대로 둔다.
+    버전이 바뀌면 저장된 사용자 추천을 다시 계산하는 작업을 넘긴다. 동시에 부르면 한 번만 조회한다.
+    """
+    return _REFRESH_FLIGHT.do("all", _refresh_catalog)
+
+
+def _refresh_catalog() -> Dict[str, Any]:
+    global _CATALOG_VERSION, _CATALOG_UPDATED_AT
+    items = fetch_welfare_programs(region_code=None, job_category=None, age=None)
+    error = (_FETCH_STATUS.get() or _LAST_STATUS)["last_error"]
+    if error and not USE_MOCK:
+        raise RuntimeError(f"welfare catalog not refreshed: {error}")
+    version = _content_version(items)
+    with _CATALOG_LOCK:
+        previous = _CATALOG_VERSION
+        _CATALOG_VERSION = version
+        _CATALOG_UPDATED_AT = time.time()
+    catalog_snapshot.write_later(_SNAPSHOT_NAME, _write_snapshot)
+    if version != previous:
+        # welfare_personalized 는 이 모듈을 import 하므로 지연 import
+        from .welfare_personalized import rematerialize_later
+
+        try:
+            rematerialize_later()
+        except Exception as exc:  # pragma: no cover - jobs 테이블이 아직 없을 때
+            print(f"[WelfareProvider] stored recommendations not scheduled for recompute: {exc}")
+    return {"version": version, "previous": previous, "changed": version != previous, "programs": len(items)}
+
+
+def catalog_version() -> Optional[str]:
+    """현재 프로세스가 알고 있는 복지 카탈로그 버전 (아직 전체 갱신 전이고 공유 스냅샷도 없으면 None)"""
+    _sync_snapshot()
+    return _CATALOG_VERSION
+
+
+def catalog_status() -> Dict[str, Any]:
+    """readiness 용 요약: 버전, 레지스트리의 프로그램 수, 마지막 전체 갱신 후 경과 초"""
+    _sync_snapshot()
+    with _CATALOG_LOCK:
+        updated_at = _CATALOG_UPDATED_AT
+        return {
+            "version": _CATALOG_VERSION,
+            "programs": len(_CATALOG),
+            "age_seconds": None if updated_at is None else round(time.time() - updated_at, 1),
+        }
+
+
+def catalog_items() -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """(버전, 프로그램 목록) 을 같은 시점으로 (검색 색인 동기화용)"""
+    _sync_snapshot()
+    with _CATALOG_LOCK:
+        return _CATALOG_VERSION, list(_CATALOG.values())
+
+
+def get_programs_by_ids(ids: Iterable[str]) -> Optional[List[Dict[str, Any]]]:
+    """id 목록을 카탈로그 항목으로 확장. 하나라도 없으면 None"""
+    _sync_snapshot()
+    with _CATALOG_LOCK:
+        found = [_CATALOG.get(pid) for pid in ids]
+    if any(p is None for p in found):
+        return None
+    return found
+
+
 def fetch_welfare_programs(
     *,
     region_code: Optional[str],
@@ -63,132 +372,49 @@ def fetch_welfare_programs(
       "url": str
     }
     """
-    global LAST_ERROR
     if USE_MOCK:
-        LAST_ERROR = "WELFARE_API_MOCK=true or no key"
-        return _load_mock_data()
+        _set_status("WELFARE_API_MOCK=true or no key")
+        return _mock_fallback("mock_mode")
     if not (WELFARE_API_BASE and WELFARE_API_KEY):
-        LAST_ERROR = "Missing API base or key"
-        return _load_mock_data()
-
-    # 실제 API 연동
-    # 한국사회보장정보원_중앙부처복지서비스 예시 매핑
-    # - 목록 엔드포인트: {BASE}{LIST_PATH}
-    # - 공공데이터포털 기본 파라미터: serviceKey, pageNo, numOfRows, (선택) srchKeyWord 등
-    params = {
-        "serviceKey": WELFARE_API_KEY,
-        "pageNo": 1,
-        "numOfRows": 200,
-        # 일부 데이터셋은 resultType 또는 type 파라미터를 사용
-        "resultType": "json",
-        "type": "json",
-    }
-    # 선택적으로 키워드 필터(직업/지역/연령 키워드를 단순 키워드로 묶음)
-    REGION_NAME = {
-        "11": "서울", "26": "부산", "27": "대구", "28": "인천", "29": "광주", "30": "대전",
-        "31": "울산", "36": "세종", "41": "경기", "51": "강원", "43": "충북", "44": "충남",
-        "45": "전북", "46": "전남", "47": "경북", "48": "경남", "50": "제주",
-    }
-    keywords: List[str] = []
-    if job_category:
-        keywords.append(job_category)
-    if region_code:
-        keywords.append(REGION_NAME.get(region_code, region_code))
-    if age is not None:
-        # 연령대 키워드는 기관 스펙에 따라 lifeArray 등으로 넣어야 할 수 있음. 우선 키워드로만.
-        keywords.append(str(age))
-    # preferences도 키워드에 포함
-    # 주거/의료/교육/생계 등 한글 키워드로 검색 품질을 보강
-    if preferences:
-        keywords.extend(preferences)
-    if keywords:
-        params["srchKeyWord"] = " ".join(keywords)
-
-    url = f"{WELFARE_API_BASE.rstrip('/')}{WELFARE_API_LIST_PATH}"
-    try:
-        res = requests.get(url, params=params, timeout=15)
-        res.raise_for_status()
-        try:
-            raw = res.json()
-        except Exception:
-            # JSON 파싱 실패 시 XML로 가정하고 파싱 시도
-            try:
-                import xmltodict  # type: ignore
-                raw = xmltodict.parse(res.text)
-            except Exception:
-                return _load_mock_data()
-    except Exception as e:
-        LAST_ERROR = f"request failed: {e}"
-        return _load_mock_data()
-
-    # 응답 파싱: 공공데이터포털 통합 포맷(response/body/items) 또는 data/items 등
-    # 중앙부처복지서비스의 대표 필드: servId, servNm, jurMnofNm, servDgst, servDtlLink, lifeArray, trgterIndvdlArray, inqryCnt
-    def map_item(r: Dict[str, Any]) -> Dict[str, Any]:
-        serv_id = r.get("servId") or r.get("id") or r.get("SERV_ID")
-        name = r.get("servNm") or r.get("title") or r.get("name") or "무제"
-        provider = r.get("jurMnofNm") or r.get("provider") or r.get("dept") or ""
-        url = r.get("servDtlLink") or r.get("url") or ""
-        summary = r.get("servDgst") or r.get("summary") or r.get("desc") or ""
-        # 카테고리 후보: lifeArray, trgterIndvdlArray (쉼표/슬래시 구분)
-        cats_raw = r.get("lifeArray") or r.get("trgterIndvdlArray") or r.get("categories") or ""
-        if isinstance(cats_raw, str):
-            categories = [c.strip() for c in cats_raw.replace("/", ",").split(",") if c.strip()]
-        elif isinstance(cats_raw, list):
-            categories = cats_raw
-        else:
-            categories = []
-        return {
-            "id": str(serv_id) if serv_id is not None else name,
-            "name": name,
-            "provider": provider,
-            "region_scope": [],  # 중앙부처는 기본 전국으로 간주
-            "eligible": {"min_age": 0, "max_age": 120, "jobs": []},
-            "categories": categories,
-            "summary": summary,
-            "url": url,
-        }
+        _set_status("Missing API base or key")
+        return _mock_fallback("missing_config")
 
-    items: List[Dict[str, Any]] = []
-    # 여러 케이스 대응
-    try:
-        if isinstance(raw, dict):
-            # JSON 형식(response/body/items) 또는 XML 파서 결과(dict) 모두 지원
-            if "response" in raw:
-                body = raw.get("response", {}).get("body", {})
-                src_items = body.get("items") or body.get("item") or []
-                if isinstance(src_items, dict):
-                    src_items = [src_items]
-                items = [map_item(r) for r in src_items]
-            elif "data" in raw:
-                src_items = raw.get("data", [])
-                items = [map_item(r) for r in src_items]
-            elif "items" in raw:
-                src_items = raw.get("items", [])
-                items = [map_item(r) for r in src_items]
-            else:
-                # XML 파싱 결과로 종종 response > body > items > item 구조
-                resp = raw.get("response") or raw.get("Response") or {}
-                body = (resp.get("body") if isinstance(resp, dict) else {}) or {}
-                src_items = body.get("items") or body.get("item") or []
-                if isinstance(src_items, dict):
-                    src_items = [src_items]
-                if src_items:
-                    items = [map_item(r) for r in src_items]
-    except Exception as e:
-        # 파싱 실패 시 목데이터로 대체
-        LAST_ERROR = f"parse failed: {e}"
-        return _load_mock_data()
+    # 실제 API 연동: 중앙부처/지자체/큐레이션 출처를 동시에 조회해 합친다 (welfare_sources)
+    # 회로가 열린 출처는 기다리지 않고 바로 빠지므로, 전부 열려 있으면 곧장 mock 으로 대체된다.
+    from . import welfare_sources
+
+    items, reports = welfare_sources.fetch_all(
+        region_code=region_code,
+        job_category=job_category,
+        age=age,
+        preferences=preferences,
+    )
+    sources = {name: r.as_dict() for name, r in reports.items()}
+    failed = [r for r in reports.values() if r.status in FAILED_SOURCE_STATUSES]
+    if not items and failed:
+        _set_status("; ".join(f"{r.name}: {r.error or r.status}" for r in failed), sources)
+        if all(r.status == "circuit_open" for r in failed):
+            return _mock_fallback("circuit_open")
+        return _mock_fallback("request_failed")
 
     if not items:
-        LAST_ERROR = LAST_ERROR or "no items from API"
-        return _load_mock_data()
-    LAST_ERROR = None
-    return items
+        _set_status("no items from API", sources)
+        return _mock_fallback("no_items")
+    _set_status(None, sources)
+    return _remember(items)
+
 
 def provider_status() -> Dict[str, Any]:
+    status = _FETCH_STATUS.get() or _LAST_STATUS
+    sources = status["sources"]
     return {
         "used_mock": USE_MOCK,
         "api_base": WELFARE_API_BASE,
         "list_path": WELFARE_API_LIST_PATH,
-        "last_error": LAST_ERROR,
+        "last_error": status["last_error"],
+        "catalog_version": _CATALOG_VERSION,
+        "sources": sources,
+        # 일부 출처가 실패/시간초과/회로 열림인 채로 합쳐진 결과인지
+        "partial": any(r.get("status") in FAILED_SOURCE_STATUSES for r in sources.values()),
+        "breakers": breaker_status("welfare."),
     }
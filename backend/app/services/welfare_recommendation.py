@@ -1,5 +1,6 @@
 from typing import Any, Dict, List, Optional
-from .welfare_provider import fetch_welfare_programs
+from . import welfare_detail
+from .welfare_provider import fetch_welfare_programs, register_enriched
 
 
 def _score_program(
@@ -62,21 +63,30 @@ def recommend_welfare(
         preferences=preferences or [],
     )
 
-    # 스코어 계산
-    scored = []
-    for p in programs:
-        s = _score_program(
-            p,
-            region_code=region_code,
-            job_category=job_category,
-            age=age,
-            preferences=preferences or [],
-            recognized_income=recognized_income,
-        )
-        p_copy = dict(p)
-        p_copy["score"] = round(float(s), 2)
-        scored.append(p_copy)
+    def score_all(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        scored = []
+        for p in items:
+            s = _score_program(
+                p,
+                region_code=region_code,
+                job_category=job_category,
+                age=age,
+                preferences=preferences or [],
+                recognized_income=recognized_income,
+            )
+            p_copy = dict(p)
+            p_copy["score"] = round(float(s), 2)
+            scored.append(p_copy)
+        # 점수순 정렬
+        scored.sort(key=lambda x: x.get("score", 0), reverse=True)
+        return scored
 
-    # 점수순 정렬
-    scored.sort(key=lambda x: x.get("score", 0), reverse=True)
-    return scored
+    scored = score_all(programs)
+    if not welfare_detail.enabled():
+        return scored
+
+    # 상위 N개 중앙부처 항목만 상세 API 로 자격(연령/직업/지역)을 보강한 뒤 다시 채점
+    by_id = {p.get("id"): p for p in programs}
+    top = [by_id[p.get("id")] for p in scored if welfare_detail.enrichable(p)][: welfare_detail.WELFARE_ENRICH_TOP_N]
+    enriched = {p.get("id"): p for p in register_enriched(welfare_detail.enrich(top))}
+    return score_all([enriched.get(p.get("id"), p) for p in programs])
@@ -0,0 +1,167 @@
+"""Local full-text search over the welfare program catalog (SQLite FTS5, Korean bigrams).
+
+업스트림 목록 API 의 srchKeyWord 대신, 프로세스가 이미 가진 카탈로그(welfare_provider)를 색인해서 찾는다.
+
+- 색인: 표준 라이브러리 sqlite3 의 인메모리 FTS5 테이블 (DATABASE_URL 과 무관, 워커별).
+  앱 DB 가 MySQL 이어도 동작하고, 카탈로그 자체가 워커 메모리에 있으므로 색인도 같이 둔다.
+- 한국어는 띄어쓰기가 들쭉날쭉해서(“청년주거지원” / “청년 주거 지원”) 한글 단어를 2글자씩 겹쳐 자른
+  바이그램을 공백으로 이어 넣고, FTS5 는 unicode61 로 공백 기준만 나누게 한다. 영문/숫자 단어는 소문자 그대로.
+  질의도 같은 방식으로 잘라 모든 토큰을 AND 로 묶는다 (한 글자 한글/영문·숫자는 접두어 일치).
+- 순위는 bm25, 컬럼 가중치 name 10 / categories 4 / provider 2 / summary 1.
+- 카탈로그 버전이 바뀌면 검색 직전에 색인 필드가 달라진 프로그램만 지우고 다시 넣는다 (추가/변경/삭제분만).
+"""
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import welfare_provider
+from .metrics import SEARCH_LATENCY
+
+_WORD_RE = re.compile(r"\w+")
+_HANGUL_RE = re.compile(r"[ᄀ-ᇿ㄰-㆏가-힣]")
+# bm25 컬럼 가중치 (테이블 컬럼 순서와 같다)
+_COLUMNS = ("name", "categories", "provider", "summary")
+_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+
+IndexedFields = Tuple[str, str, str, str]
+
+
+def _bigrams(word: str) -> List[str]:
+    if len(word) < 2:
+        return [word]
+    return [word[i : i + 2] for i in range(len(word) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """색인/질의 공통 토큰: 한글이 섞인 단어는 바이그램, 나머지는 소문자 단어"""
+    tokens: List[str] = []
+    for word in _WORD_RE.findall(text.lower()):
+        tokens.extend(_bigrams(word) if _HANGUL_RE.search(word) else [word])
+    return tokens
+
+
+def match_expression(query: str) -> Optional[str]:
+    """사용자 질의 → FTS5 MATCH 식. 검색할 토큰이 없으면 None"""
+    terms: List[str] = []
+    for word in _WORD_RE.findall(query.lower()):
+        if _HANGUL_RE.search(word) and len(word) >= 2:
+            terms.extend(f'"{gram}"' for gram in _bigrams(word))
+        else:
+            # 한 글자 한글은 그 글자로 시작하는 바이그램, 영문/숫자는 입력 중인 단어까지 찾도록 접두어 일치
+            terms.append(f'"{word}"*')
+    if not terms:
+        return None
+    return " AND ".join(dict.fromkeys(terms))
+
+
+def _fields(program: Dict[str, Any]) -> IndexedFields:
+    categories = program.get("categories") or []
+    if isinstance(categories, str):
+        categories = [categories]
+    return (
+        str(program.get("name") or ""),
+        " ".join(str(c) for c in categories),
+        str(program.get("provider") or ""),
+        str(program.get("summary") or ""),
+    )
+
+
+class WelfareSearchIndex:
+    def __init__(self) -> None:
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.execute(
+            f"CREATE VIRTUAL TABLE programs USING fts5({', '.join(_COLUMNS)}, tokenize='unicode61')"
+        )
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+        self._rowids: Dict[str, int] = {}
+        self._pids: Dict[int, str] = {}
+        self._indexed: Dict[str, IndexedFields] = {}
+        self._programs: Dict[str, Dict[str, Any]] = {}
+        self._next_rowid = 1
+
+    def sync(self, version: Optional[str], programs: List[Dict[str, Any]]) -> Dict[str, int]:
+        """카탈로그 버전에 맞춰 바뀐 항목만 다시 색인. {"indexed", "removed"} 건수"""
+        with self._lock:
+            indexed = removed = 0
+            seen = set()
+            for program in programs:
+                pid = program.get("id")
+                if pid is None:
+                    continue
+                pid = str(pid)
+                seen.add(pid)
+                self._programs[pid] = program
+                fields = _fields(program)
+                if self._indexed.get(pid) == fields:
+                    continue
+                rowid = self._rowids.get(pid)
+                if rowid is None:
+                    rowid = self._rowids[pid] = self._next_rowid
+                    self._pids[rowid] = pid
+                    self._next_rowid += 1
+                else:
+                    self._conn.execute("DELETE FROM programs WHERE rowid = ?", (rowid,))
+                self._conn.execute(
+                    "INSERT INTO programs(rowid, name, categories, provider, summary) VALUES (?, ?, ?, ?, ?)",
+                    (rowid, *(" ".join(tokenize(value)) for value in fields)),
+                )
+                self._indexed[pid] = fields
+                indexed += 1
+            for pid in [p for p in self._rowids if p not in seen]:
+                rowid = self._rowids.pop(pid)
+                del self._pids[rowid], self._indexed[pid], self._programs[pid]
+                self._conn.execute("DELETE FROM programs WHERE rowid = ?", (rowid,))
+                removed += 1
+            self._conn.commit()
+            self.version = version
+            return {"indexed": indexed, "removed": removed}
+
+    def search(self, expression: str, limit: int, offset: int) -> Tuple[int, List[Tuple[Dict[str, Any], float]]]:
+        """(전체 일치 수, [(프로그램, 점수)]) — 점수는 bm25 부호를 뒤집은 값이라 클수록 관련도가 높다"""
+        weights = ", ".join(str(w) for w in _WEIGHTS)
+        with self._lock:
+            (total,) = self._conn.execute(
+                "SELECT count(*) FROM programs WHERE programs MATCH ?", (expression,)
+            ).fetchone()
+            rows = self._conn.execute(
+                f"SELECT rowid, bm25(programs, {weights}) AS score FROM programs WHERE programs MATCH ? "
+                "ORDER BY score LIMIT ? OFFSET ?",
+                (expression, limit, offset),
+            ).fetchall()
+            return total, [(self._programs[self._pids[rowid]], round(-score, 4)) for rowid, score in rows]
+
+    def __len__(self) -> int:
+        return len(self._rowids)
+
+
+SEARCH_INDEX = WelfareSearchIndex()
+
+
+def ensure_current() -> Optional[str]:
+    """카탈로그 버전이 색인과 다르면 바뀐 항목만 다시 색인.
+    첫 전체 갱신 전(버전 None)에도 업스트림은 부르지 않고 레지스트리에 있는 만큼 색인한다 (전체 갱신은 워밍업/스케줄러 몫).
+    """
+    version = welfare_provider.catalog_version()
+    if version is None or version != SEARCH_INDEX.version:
+        SEARCH_INDEX.sync(*welfare_provider.catalog_items())
+    return SEARCH_INDEX.version
+
+
+def search(query: str, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """ValueError: 검색할 단어가 없는 질의"""
+    expression = match_expression(query)
+    if expression is None:
+        raise ValueError("query has no searchable terms")
+    with SEARCH_LATENCY.time("welfare"):
+        version = ensure_current()
+        total, hits = SEARCH_INDEX.search(expression, limit, offset)
+    return {
+        "query": query,
+        "total": total,
+        "count": len(hits),
+        "offset": offset,
+        "items": [{**program, "score": score} for program, score in hits],
+        "meta": {"catalog_version": version, "indexed": len(SEARCH_INDEX)},
+    }
@@ -0,0 +1,316 @@
+"""Federated welfare catalog: 여러 출처를 동시에 조회해 하나의 목록으로 합친다.
+
+- central: 한국사회보장정보원_중앙부처복지서비스 (WELFARE_API_BASE + WELFARE_API_LIST_PATH)
+- local:   한국사회보장정보원_지자체복지서비스 (WELFARE_LOCAL_API_BASE + WELFARE_LOCAL_API_LIST_PATH)
+- curated: 직접 관리하는 JSON 파일 (WELFARE_CURATED_PATH, 표준 프로그램 dict 목록).
+           저장소에는 빈 목록만 있고 내용은 배포 환경에서 채운다.
+
+출처마다 시간 예산(WELFARE_{NAME}_TIMEOUT)이 있고, 예산 안에 끝나지 않은 출처는 기다리지 않고 빠진다.
+예산은 fetch_all 이 제출한 시각부터의 벽시계 상한이다: 풀 대기 시간도 포함하고, HTTP 호출은 재시도 없이
+남은 시간 안에서만 연결/응답/본문 읽기를 한다 (시간이 지난 조회가 스레드를 계속 붙잡지 않도록).
+합칠 때는 WELFARE_SOURCES 에 적힌 순서가 우선순위이며, 정규화한 id 또는 이름이 같으면 먼저 나온 항목만 남긴다.
+합친 항목에는 출처 이름을 source 로 붙인다 (상세 보강은 중앙부처 항목만 한다).
+출처별 상태/지연/기여 건수는 SourceReport 로 돌려준다 (/welfare/recommendations 의 meta.sources).
+"""
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils import http_client
+
+from . import welfare_detail, welfare_provider
+from .circuit_breaker import NEGATIVE_CACHE, CircuitOpenError, breaker
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from .single_flight import SyncSingleFlight
+
+WELFARE_SOURCES = [s.strip() for s in os.getenv("WELFARE_SOURCES", "central,local,curated").split(",") if s.strip()]
+WELFARE_LOCAL_API_BASE = os.getenv(
+    "WELFARE_LOCAL_API_BASE",
+    "https://apis.data.go.kr/B554287/LocalGovernmentWelfareInformations",
+)
+WELFARE_LOCAL_API_LIST_PATH = os.getenv("WELFARE_LOCAL_API_LIST_PATH", "/LcgvWelfarelist")
+WELFARE_CURATED_PATH = os.getenv(
+    "WELFARE_CURATED_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "data", "welfare_curated.json"),
+)
+SOURCE_TIMEOUTS = {
+    "central": float(os.getenv("WELFARE_CENTRAL_TIMEOUT", "8")),
+    "local": float(os.getenv("WELFARE_LOCAL_TIMEOUT", "5")),
+    "curated": float(os.getenv("WELFARE_CURATED_TIMEOUT", "1")),
+}
+# 동시에 처리하는 복지 조회 수 × 출처 수 정도. 모자라면 풀 대기가 출처 예산을 잡아먹는다.
+WELFARE_SOURCE_WORKERS = int(os.getenv("WELFARE_SOURCE_WORKERS", "32"))
+
+_executor = ThreadPoolExecutor(max_workers=max(1, WELFARE_SOURCE_WORKERS), thread_name_prefix="welfare-source")
+_curated_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}  # 경로 → (mtime, 항목)
+_LIST_FLIGHTS = SyncSingleFlight("welfare.list")
+
+
+@dataclass
+class SourceReport:
+    name: str
+    status: str = "ok"  # ok | empty | timeout | error | circuit_open
+    latency_ms: Optional[float] = None
+    fetched: int = 0
+    contributed: int = 0
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "fetched": self.fetched,
+            "contributed": self.contributed,
+            "error": self.error,
+        }
+
+
+def fetch_list(
+    url: str,
+    params: Dict[str, Any],
+    mapper: Callable[[Dict[str, Any]], Dict[str, Any]],
+    *,
+    operation: str,
+    timeout: float,
+    upstream: str,
+) -> List[Dict[str, Any]]:
+    """공공데이터포털 목록 API 한 페이지 → 표준 프로그램 목록 (실패는 예외로 올린다).
+    XML 은 <item> 단위로 스트리밍 파싱해서 문서 전체를 dict 로 만들지 않는다.
+    upstream 이름의 circuit breaker 가 열려 있거나 같은 질의가 최근 실패했으면 호출하지 않고 바로 실패한다.
+    같은 질의가 이미 진행 중이면 새로 부르지 않고 그 결과(또는 예외)를 함께 받는다.
+    """
+    query_key = (url, tuple(sorted((k, str(v)) for k, v in params.items() if k != "serviceKey")))
+    return _LIST_FLIGHTS.do(
+        (upstream, query_key),
+        lambda: _fetch_list(url, params, mapper, operation=operation, timeout=timeout, upstream=upstream, query_key=query_key),
+    )
+
+
+def _read_until(res, deadline: float, budget: float) -> Iterator[bytes]:
+    """본문을 도착하는 만큼씩 읽으면서 deadline 을 확인한다.
+    iter_content 는 chunk_size 가 찰 때까지 막히므로 조금씩 흘러드는 응답이면 예산을 한참 넘긴다.
+    """
+    while True:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"response body not read within {budget:.1f}s")
+        chunk = res.raw.read1(welfare_provider.WELFARE_XML_CHUNK, decode_content=True)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fetch_list(url, params, mapper, *, operation, timeout, upstream, query_key) -> List[Dict[str, Any]]:
+    NEGATIVE_CACHE.check(upstream, query_key)
+    circuit = breaker(upstream)
+    circuit.before_call()
+    deadline = time.monotonic() + timeout
+    try:
+        try:
+            with UPSTREAM_LATENCY.time("welfare", operation):
+                # 재시도는 예산을 몇 배로 늘리므로 끄고, 다음 조회(또는 회로 차단기)에 맡긴다
+                res = http_client.get_sync(url, params=params, timeout=timeout, retries=0, deadline=deadline, stream=True)
+            res.raise_for_status()
+        except Exception:
+            UPSTREAM_ERRORS.inc("welfare", operation)
+            raise
+        with res:
+            chunks = _read_until(res, deadline, timeout)
+            first = b""
+            for chunk in chunks:
+                if chunk.strip():
+                    first = chunk
+                    break
+            if first.lstrip().startswith(b"<"):
+                items = [mapper(r) for r in welfare_provider.iter_xml_items(itertools.chain([first], chunks))]
+            else:
+                raw = json.loads(first + b"".join(chunks))
+                items = [mapper(r) for r in welfare_provider._json_items(raw)]
+    except Exception as exc:
+        circuit.record_failure(exc)
+        NEGATIVE_CACHE.put(upstream, query_key, exc)
+        raise
+    circuit.record_success()
+    return items
+
+
+def _search_keywords(region_code, job_category, age, preferences) -> List[str]:
+    # 선택적으로 키워드 필터(직업/지역/연령 키워드를 단순 키워드로 묶음)
+    keywords: List[str] = []
+    if job_category:
+        keywords.append(job_category)
+    if region_code:
+        keywords.append(welfare_provider.REGION_NAMES.get(region_code, region_code))
+    if age is not None:
+        # 연령대 키워드는 기관 스펙에 따라 lifeArray 등으로 넣어야 할 수 있음. 우선 키워드로만.
+        keywords.append(str(age))
+    # 주거/의료/교육/생계 등 한글 키워드로 검색 품질을 보강
+    if preferences:
+        keywords.extend(preferences)
+    return keywords
+
+
+def _fetch_central(region_code, job_category, age, preferences, timeout) -> List[Dict[str, Any]]:
+    # - 목록 엔드포인트: {BASE}{LIST_PATH}
+    # - 공공데이터포털 기본 파라미터: serviceKey, pageNo, numOfRows, (선택) srchKeyWord 등
+    params: Dict[str, Any] = {
+        "serviceKey": welfare_provider.WELFARE_API_KEY,
+        "pageNo": 1,
+        "numOfRows": 200,
+        # 일부 데이터셋은 resultType 또는 type 파라미터를 사용
+        "resultType": "json",
+        "type": "json",
+    }
+    keywords = _search_keywords(region_code, job_category, age, preferences)
+    if keywords:
+        params["srchKeyWord"] = " ".join(keywords)
+    url = f"{welfare_provider.WELFARE_API_BASE.rstrip('/')}{welfare_provider.WELFARE_API_LIST_PATH}"
+    return fetch_list(url, params, welfare_provider.map_item, operation="list", timeout=timeout, upstream="welfare.central")
+
+
+def map_local_item(r: Dict[str, Any]) -> Dict[str, Any]:
+    """지자체복지서비스 레코드: ctpvNm(시도)/sggNm(시군구)/bizChrDeptNm(담당부서), lifeNmArray/intrsThemaNmArray"""
+    item = welfare_provider.map_item(r)
+    ctpv = str(r.get("ctpvNm") or "").strip()
+    sgg = str(r.get("sggNm") or "").strip()
+    if not r.get("jurMnofNm"):
+        item["provider"] = " ".join(x for x in (ctpv, sgg) if x) or str(r.get("bizChrDeptNm") or "지자체")
+    cats_raw = r.get("intrsThemaNmArray") or r.get("lifeNmArray") or ""
+    if isinstance(cats_raw, str) and cats_raw and not item["categories"]:
+        item["categories"] = [c.strip() for c in cats_raw.replace("/", ",").split(",") if c.strip()]
+    item["region_scope"] = welfare_detail.parse_regions(ctpv, "") if ctpv else []
+    return item
+
+
+def _fetch_local(region_code, job_category, age, preferences, timeout) -> List[Dict[str, Any]]:
+    params: Dict[str, Any] = {
+        "serviceKey": welfare_provider.WELFARE_API_KEY,
+        "pageNo": 1,
+        "numOfRows": 200,
+        "resultType": "json",
+        "type": "json",
+    }
+    if region_code and region_code in welfare_detail.REGION_FULL_NAMES:
+        params["ctpvNm"] = welfare_detail.REGION_FULL_NAMES[region_code]
+    keywords = _search_keywords(None, job_category, age, preferences)
+    if keywords:
+        params["searchWrd"] = " ".join(keywords)
+    url = f"{WELFARE_LOCAL_API_BASE.rstrip('/')}{WELFARE_LOCAL_API_LIST_PATH}"
+    return fetch_list(url, params, map_local_item, operation="local_list", timeout=timeout, upstream="welfare.local")
+
+
+def _fetch_curated(region_code, job_category, age, preferences, timeout) -> List[Dict[str, Any]]:
+    # 파일이 바뀌었을 때만 다시 읽는다. 읽는 데 예산을 넘기면 이번 응답에서는 빼고 다음 조회부터 캐시를 쓴다.
+    path = os.path.abspath(WELFARE_CURATED_PATH)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return []
+    cached = _curated_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    started = time.monotonic()
+    with open(path, "r", encoding="utf-8") as f:
+        items = [p for p in json.load(f) if isinstance(p, dict) and p.get("id")]
+    _curated_cache[path] = (mtime, items)
+    if time.monotonic() - started > timeout:
+        raise TimeoutError(f"curated catalog not loaded within {timeout:.1f}s")
+    return items
+
+
+SOURCE_FETCHERS: Dict[str, Callable[..., List[Dict[str, Any]]]] = {
+    "central": _fetch_central,
+    "local": _fetch_local,
+    "curated": _fetch_curated,
+}
+
+
+def _dedup_keys(item: Dict[str, Any]) -> List[str]:
+    keys = []
+    pid = str(item.get("id") or "").strip().upper()
+    if pid:
+        keys.append(f"id:{pid}")
+    name = re.sub(r"[\W_]+", "", str(item.get("name") or "")).lower()
+    if name and name != "무제":
+        keys.append(f"name:{name}")
+    return keys
+
+
+def merge(results: List[Tuple[SourceReport, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """우선순위 순서대로 합치며 id/이름 중복 제거, 출처별 기여 건수를 report 에 채운다.
+    조회 결과(single-flight 대기자, 큐레이션 캐시와 공유)는 그대로 두고 source 를 붙인 사본을 돌려준다."""
+    seen = set()
+    merged: List[Dict[str, Any]] = []
+    for report, items in results:
+        for item in items:
+            keys = _dedup_keys(item)
+            if any(k in seen for k in keys):
+                continue
+            seen.update(keys)
+            merged.append({**item, "source": report.name})
+            report.contributed += 1
+    return merged
+
+
+def fetch_all(
+    *,
+    region_code: Optional[str],
+    job_category: Optional[str],
+    age: Optional[int],
+    preferences: Optional[List[str]],
+    sources: Optional[List[str]] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, SourceReport]]:
+    """등록된 출처를 동시에 조회 → (합친 목록, 출처별 보고)"""
+    names = [n for n in (sources or WELFARE_SOURCES) if n in SOURCE_FETCHERS]
+    started = time.perf_counter()
+    submitted = time.monotonic()
+    pending = {}
+    for name in names:
+        deadline = submitted + SOURCE_TIMEOUTS.get(name, 5.0)
+        pending[name] = _executor.submit(
+            _timed, SOURCE_FETCHERS[name], region_code, job_category, age, preferences, deadline
+        )
+
+    results: List[Tuple[SourceReport, List[Dict[str, Any]]]] = []
+    reports: Dict[str, SourceReport] = {}
+    for name in names:
+        report = SourceReport(name)
+        reports[name] = report
+        # 모두 같은 시각에 시작했으므로 각자 예산의 남은 시간만큼만 기다린다
+        remaining = SOURCE_TIMEOUTS.get(name, 5.0) - (time.perf_counter() - started)
+        try:
+            items, elapsed = pending[name].result(timeout=max(0.0, remaining))
+        except FutureTimeout:
+            report.status = "timeout"
+            report.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            continue
+        except Exception as exc:
+            report.status = "circuit_open" if isinstance(exc, CircuitOpenError) else "error"
+            report.error = _redact(f"{type(exc).__name__}: {exc}")
+            report.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+            continue
+        report.latency_ms = round(elapsed * 1000, 1)
+        report.fetched = len(items)
+        report.status = "ok" if items else "empty"
+        results.append((report, items))
+    return merge(results), reports
+
+
+def _redact(message: str) -> str:
+    # 예외 메시지의 URL 에 serviceKey 가 그대로 들어 있으므로 응답 meta 에 싣기 전에 가린다
+    return re.sub(r"(serviceKey=)[^&\s'\"]+", r"\1***", message)
+
+
+def _timed(fetcher, region_code, job_category, age, preferences, deadline):
+    # 풀에서 기다린 만큼 예산이 줄어든 채로 시작한다 (이미 지났으면 부르지 않는다)
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("source budget spent waiting for a worker")
+    started = time.perf_counter()
+    items = fetcher(region_code, job_category, age, preferences, remaining)
+    return items, time.perf_counter() - started
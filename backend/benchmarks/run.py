@@ -0,0 +1,542 @@
+"""Microbenchmarks for the scoring / calculation hot paths.
+
+Usage (backend 디렉터리에서):
+
+    python -m benchmarks.run                                  # 1k/10k/100k 전체 실행, 결과 JSON 출력
+    python -m benchmarks.run --sizes 1000 --only welfare      # 일부만
+    python -m benchmarks.run --output bench.json --baseline benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline                  # benchmarks/baseline.json 갱신
+
+베이스라인과 비교 시 median이 threshold(기본 25%) 이상 느려진 항목이 있으면 종료 코드 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from unittest import mock
+
+from . import synthetic
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name -> (factory, sized). factory(size)는 준비(setup)를 마치고 측정 대상 0-인자 함수를 돌려준다.
+BENCHMARKS: Dict[str, Tuple[Callable[[int], Callable[[], object]], bool]] = {}
+
+
+def benchmark(name: str, sized: bool = True):
+    def deco(factory):
+        BENCHMARKS[name] = (factory, sized)
+        return factory
+    return deco
+
+
+class FakeFinlifeClient:
+    """FinlifeClient 대체: 미리 만든 응답을 그대로 돌려준다"""
+
+    def __init__(self, saving_data: Dict[str, List[Dict]], deposit_data=None, loan_data=None) -> None:
+        self.saving_data = saving_data
+        self.deposit_data = deposit_data or saving_data
+        self.loan_data = loan_data or {"baseList": [], "optionList": []}
+
+    async def fetch_saving_products(self, top_fin_grp_no: str) -> Dict[str, List[Dict]]:
+        return self.saving_data
+
+    async def fetch_deposit_products(self, top_fin_grp_no: str) -> Dict[str, List[Dict]]:
+        return self.deposit_data
+
+    async def fetch_credit_loans(self, top_fin_grp_no: str) -> Dict[str, List[Dict]]:
+        return self.loan_data
+
+    async def fetch_mortgage_loans(self, top_fin_grp_no: str) -> Dict[str, List[Dict]]:
+        return self.loan_data
+
+    async def fetch_rent_loans(self, top_fin_grp_no: str) -> Dict[str, List[Dict]]:
+        return self.loan_data
+
+
+ASSET_FORM = {
+    "monthlyIncome": 3200000,
+    "householdSize": 2,
+    "realEstate": 150000000,
+    "deposits": 20000000,
+    "otherAssets": 5000000,
+    "savings": {"productName": "기존 적금", "principal": 5000000, "annualRate": 0.031, "monthsRemaining": 10, "penalty": 0.005},
+    "loans": [{"lender": "기존은행", "amount": 30000000, "annualRate": 0.061, "remainingMonths": 24, "purpose": "생활자금"}],
+}
+
+
+# --- welfare -----------------------------------------------------------------
+
+@benchmark("welfare._score_program")
+def bench_score_program(size: int):
+    from app.services.welfare_recommendation import _score_program
+
+    programs = synthetic.welfare_programs(size)
+
+    def run():
+        for p in programs:
+            _score_program(
+                p,
+                region_code="11",
+                job_category="직장인",
+                age=29,
+                preferences=["주거", "의료"],
+                recognized_income=None,
+            )
+    return run
+
+
+@benchmark("welfare.recommend_welfare")
+def bench_recommend_welfare(size: int):
+    from app.services import welfare_recommendation
+
+    programs = synthetic.welfare_programs(size)
+
+    def run():
+        with mock.patch.object(welfare_recommendation, "fetch_welfare_programs", lambda **_: programs):
+            return welfare_recommendation.recommend_welfare(
+                region_code="11",
+                job_category="직장인",
+                age=29,
+                preferences=["주거", "의료"],
+            )
+    return run
+
+
+@benchmark("welfare.search")
+def bench_welfare_search(size: int):
+    """/welfare/search 질의 한 번 (색인은 미리 만들어 두고 bm25 순위 + 페이지만 잰다)"""
+    from app.services.welfare_search import WelfareSearchIndex, match_expression
+
+    index = WelfareSearchIndex()
+    index.sync("bench", synthetic.welfare_programs(size))
+    expression = match_expression("청년 의료")
+
+    def run():
+        return index.search(expression, 20, 0)
+    return run
+
+
+@benchmark("welfare.calculate_income_recognition")
+def bench_income_recognition(size: int):
+    from app.services.welfare_service import WelfareInput, calculate_income_recognition
+
+    inputs = [WelfareInput(**d) for d in synthetic.welfare_inputs(size)]
+
+    def run():
+        for data in inputs:
+            calculate_income_recognition(data)
+    return run
+
+
+def _parse_info(parse) -> Dict[str, int]:
+    """파싱 자체의 최대 메모리 (매핑 결과는 바로 버려서 출력 목록 크기는 빼고 잰다)"""
+    import collections
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        collections.deque(parse(), maxlen=0)
+        return {"peak_bytes": tracemalloc.get_traced_memory()[1]}
+    finally:
+        tracemalloc.stop()
+
+
+@benchmark("welfare.parse_xml_xmltodict")
+def bench_parse_xml_xmltodict(size: int):
+    """이전 경로: 문서 전체를 xmltodict 로 dict 트리로 만든 뒤 매핑"""
+    import xmltodict
+
+    from app.services.welfare_provider import map_item
+
+    body = synthetic.welfare_list_xml(size)
+
+    def parse():
+        items = xmltodict.parse(body.decode("utf-8"))["response"]["body"]["items"]["item"]
+        return (map_item(r) for r in items)
+    run = lambda: list(parse())
+    run.info = _parse_info(parse)
+    return run
+
+
+@benchmark("welfare.parse_xml_stream")
+def bench_parse_xml_stream(size: int):
+    """<item> 단위 스트리밍 파싱 (WELFARE_XML_CHUNK 크기 청크로 흘려 넣는다)"""
+    from app.services.welfare_provider import WELFARE_XML_CHUNK, iter_xml_items, map_item
+
+    body = synthetic.welfare_list_xml(size)
+    chunks = [body[i:i + WELFARE_XML_CHUNK] for i in range(0, len(body), WELFARE_XML_CHUNK)]
+
+    parse = lambda: (map_item(r) for r in iter_xml_items(chunks))
+    run = lambda: list(parse())
+    run.info = _parse_info(parse)
+    return run
+
+
+# --- finance -----------------------------------------------------------------
+
+@benchmark("finance._index_options")
+def bench_index_options(size: int):
+    from app.services.finance_catalog import _index_options
+
+    option_list = synthetic.finlife_products(size)["optionList"]
+    return lambda: _index_options(option_list)
+
+
+@benchmark("finance.build_catalog")
+def bench_build_catalog(size: int):
+    """카탈로그 갱신 비용 (TTL마다 한 번, 요청 경로 밖)"""
+    from app.services.finance_catalog import build_catalog
+
+    raw = synthetic.finlife_products(size)
+    return lambda: build_catalog("saving", raw)
+
+
+@benchmark("finance.load_catalog_snapshot")
+def bench_load_catalog_snapshot(size: int):
+    """다른 워커가 쓴 mmap 스냅샷에서 카탈로그 복원 (build_catalog 대신 새 워커가 내는 비용)"""
+    import tempfile
+
+    from app.services import catalog_snapshot
+    from app.services.finance_catalog import build_catalog, catalog_from_snapshot, catalog_meta, catalog_tables
+
+    catalog = build_catalog("saving", synthetic.finlife_products(size))
+    fd, path = tempfile.mkstemp(suffix=".snap")
+    with os.fdopen(fd, "wb") as f:
+        f.write(catalog_snapshot.encode(catalog_meta(catalog), catalog_tables(catalog)))
+
+    def run():
+        with catalog_snapshot.Snapshot(path) as snap:
+            return catalog_from_snapshot(snap)
+
+    return run
+
+
+@benchmark("finance.build_facet_index")
+def bench_build_facet_index(size: int):
+    """상품 검색 비트맵 색인 (스냅샷 교체 때 한 번)"""
+    from app.services.finance_catalog import build_catalog
+    from app.services.finance_search import FacetIndex
+
+    catalog = build_catalog("saving", synthetic.finlife_products(size))
+    return lambda: FacetIndex(catalog)
+
+
+@benchmark("finance.search_products")
+def bench_search_products(size: int):
+    """/finance/products/search 한 번: 상품명 + 회사 2곳 + 만기 + 금리 하한, 패싯 개수와 20건 페이지"""
+    from app.services import finance_search
+    from app.services.finance_catalog import build_catalog
+
+    index = finance_search.FacetIndex(build_catalog("saving", synthetic.finlife_products(size)))
+    filters = {"company": ["우리은행", "국민은행"], "term": [12]}
+    return lambda: finance_search.search(index, name="적금 1", filters=filters, min_rate=3.0)
+
+
+@benchmark("finance.build_finance_switching")
+def bench_finance_switching(size: int):
+    """요청 경로: 스냅샷은 warm-up 에서 만들어지고 이후에는 리더보드 앞부분만 본다"""
+    from app.services.finance_catalog import FinanceCatalogStore
+    from app.services.finance_recommendation import build_finance_switching
+
+    store = FinanceCatalogStore(
+        FakeFinlifeClient(
+            synthetic.finlife_products(size),
+            deposit_data=synthetic.finlife_products(size, seed=12),
+            loan_data=synthetic.finlife_loans(size),
+        ),
+        ttl=float("inf"),
+    )
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(build_finance_switching(dict(ASSET_FORM), store=store))
+
+
+# --- serialization -----------------------------------------------------------
+# run.info 의 bytes / gzip_bytes 는 결과 JSON 에 함께 기록된다 (전후 응답 크기 비교용)
+
+def _finance_recos():
+    from app.services.finance_recommendation import build_finance_switching
+
+    client = FakeFinlifeClient(
+        synthetic.finlife_products(4000),
+        deposit_data=synthetic.finlife_products(4000, seed=12),
+        loan_data=synthetic.finlife_loans(3000),
+    )
+    return asyncio.run(build_finance_switching(dict(ASSET_FORM), client=client))
+
+
+def _with_sizes(run, body: bytes):
+    import gzip
+
+    run.info = {"bytes": len(body), "gzip_bytes": len(gzip.compress(body, 6))}
+    return run
+
+
+@benchmark("serialize.finance_response_validated", sized=False)
+def bench_finance_validated(_size: int):
+    """이전 경로: response model 재검증 + jsonable_encoder + 표준 json"""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from app.api.finance_router import FinanceSwitchResponse
+
+    recos = _finance_recos()
+    run = lambda: JSONResponse(jsonable_encoder(FinanceSwitchResponse(**recos))).body
+    return _with_sizes(run, run())
+
+
+@benchmark("serialize.finance_response_trusted", sized=False)
+def bench_finance_trusted(_size: int):
+    from app.api.finance_router import FinanceSwitchResponse
+    from app.services.serialization import trusted_body
+
+    recos = _finance_recos()
+    run = lambda: trusted_body(FinanceSwitchResponse, recos)
+    return _with_sizes(run, run())
+
+
+@benchmark("serialize.welfare_list_stdlib")
+def bench_welfare_list_stdlib(size: int):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    content = {"count": size, "items": synthetic.welfare_programs(size)}
+    run = lambda: JSONResponse(jsonable_encoder(content)).body
+    return _with_sizes(run, run())
+
+
+@benchmark("serialize.welfare_list_fast")
+def bench_welfare_list_fast(size: int):
+    from app.services.serialization import dumps
+
+    content = {"count": size, "items": synthetic.welfare_programs(size)}
+    run = lambda: dumps(content)
+    return _with_sizes(run, run())
+
+
+@benchmark("serialize.gzip_welfare_list")
+def bench_gzip_welfare_list(size: int):
+    """GZipMiddleware 와 같은 수준(6)으로 압축하는 비용"""
+    import gzip
+
+    from app.services.serialization import dumps
+
+    body = dumps({"count": size, "items": synthetic.welfare_programs(size)})
+    run = lambda: gzip.compress(body, 6)
+    return _with_sizes(run, body)
+
+
+# --- chat --------------------------------------------------------------------
+
+@benchmark("chat._convert_messages")
+def bench_convert_messages(size: int):
+    from app.services.chat_service import ChatMessage, _convert_messages
+
+    messages = [ChatMessage(**m) for m in synthetic.chat_messages(size)]
+    return lambda: _convert_messages(messages)
+
+
+@benchmark("chat._render_context", sized=False)
+def bench_render_context(_size: int):
+    from app.services.chat_service import ChatContext, _render_context
+
+    context = ChatContext(
+        step=2,
+        assets={**ASSET_FORM, "savings": {**ASSET_FORM["savings"], "earlyTerminatePenaltyRate": 0.005}},
+        incomeRecognition={"total": 2800000, "perCapita": 1400000},
+        eligibility={"baseEligible": False, "microFinanceEligible": True},
+    )
+    return lambda: _render_context(context)
+
+
+# --- security ----------------------------------------------------------------
+
+@benchmark("security.hash_password", sized=False)
+def bench_hash_password(_size: int):
+    from app.services.security import hash_password
+
+    return lambda: hash_password("benchmark-password")
+
+
+@benchmark("security.verify_password", sized=False)
+def bench_verify_password(_size: int):
+    from app.services.security import hash_password, verify_password
+
+    hashed = hash_password("benchmark-password")
+    return lambda: verify_password("benchmark-password", hashed)
+
+
+# --- instrumentation ---------------------------------------------------------
+
+@benchmark("metrics.histogram_observe", sized=False)
+def bench_histogram_observe(_size: int):
+    from app.services.metrics import HTTP_LATENCY, HTTP_REQUESTS
+
+    def run():
+        HTTP_LATENCY.observe(0.0123, "POST", "/bench")
+        HTTP_REQUESTS.inc("POST", "/bench", "200")
+    return run
+
+
+def _rate_limited_call(size: int, headers):
+    """RateLimitMiddleware 한 번 통과 비용 (안쪽 앱은 아무것도 하지 않는다). size 명의 클라이언트를 번갈아 보낸다."""
+    from app.services.rate_limit import RateLimiter, RateLimitMiddleware
+
+    async def app(scope, receive, send):
+        return None
+
+    # 버킷이 비지 않도록 충분히 큰 한도: 거절 경로가 아니라 통과 경로를 잰다
+    middleware = RateLimitMiddleware(app, RateLimiter(rate=1e9, burst=1e9, max_clients=max(size, 1)))
+    scopes = [
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/finance/recommendations",
+            "headers": headers(i),
+            "client": (f"10.0.{i // 256 % 256}.{i % 256}", 50000),
+        }
+        for i in range(max(size, 1))
+    ]
+    position = [0]
+
+    def run():
+        scope = scopes[position[0] % len(scopes)]
+        position[0] += 1
+        coro = middleware(scope, None, None)
+        try:
+            coro.send(None)  # 안쪽 앱이 바로 끝나므로 이벤트 루프 없이 한 번에 완료된다
+        except StopIteration:
+            pass
+    return run
+
+
+@benchmark("middleware.rate_limit_ip")
+def bench_rate_limit_ip(size: int):
+    return _rate_limited_call(size, lambda i: [])
+
+
+@benchmark("middleware.rate_limit_bearer")
+def bench_rate_limit_bearer(size: int):
+    from app.services.security import create_access_token
+
+    # 라운드 수보다 토큰이 많아 대부분 토큰 캐시 미스(JWT 검증 포함) 경로를 잰다
+    tokens = [b"Bearer " + create_access_token(str(i)).encode() for i in range(min(size, 1000))]
+    return _rate_limited_call(size, lambda i: [(b"authorization", tokens[i % len(tokens)])])
+
+
+# --- runner ------------------------------------------------------------------
+
+def measure(fn: Callable[[], object], min_rounds: int, min_time: float, max_rounds: int) -> Dict[str, float]:
+    fn()  # warm-up
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < max_rounds:
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1e6)
+        if len(samples) >= min_rounds and time.perf_counter() - started >= min_time:
+            break
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "stdev_ms": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "rounds": len(samples),
+    }
+
+
+def run_all(sizes: List[int], only: Optional[str], min_rounds: int, min_time: float, max_rounds: int) -> Dict:
+    results: Dict[str, Dict] = {}
+    for name, (factory, sized) in BENCHMARKS.items():
+        if only and only not in name:
+            continue
+        for size in (sizes if sized else [0]):
+            key = f"{name}[{size}]" if sized else name
+            fn = factory(size)
+            results[key] = measure(fn, min_rounds, min_time, max_rounds)
+            results[key].update(getattr(fn, "info", None) or {})
+            print(f"  {key:<48} {results[key]['median_ms']:>12.4f} ms  ({results[key]['rounds']} rounds)", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """median 기준 비교. ratio > 1 + threshold 이면 regression"""
+    rows = []
+    base_results = baseline.get("results", {})
+    for key, cur in current["results"].items():
+        base = base_results.get(key)
+        if not base or not base.get("median_ms"):
+            continue
+        ratio = cur["median_ms"] / base["median_ms"]
+        rows.append(
+            {
+                "name": key,
+                "baseline_ms": base["median_ms"],
+                "current_ms": cur["median_ms"],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="comma separated catalog sizes")
+    parser.add_argument("--only", default=None, help="substring filter on benchmark name")
+    parser.add_argument("--output", default=None, help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio before flagging")
+    parser.add_argument("--save-baseline", action="store_true", help=f"overwrite {DEFAULT_BASELINE}")
+    parser.add_argument("--min-rounds", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("--max-rounds", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    report = run_all(sizes, args.only, args.min_rounds, args.min_time, args.max_rounds)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "rows": rows}
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(
+                f"  {row['name']:<48} {row['baseline_ms']:>10.4f} -> {row['current_ms']:>10.4f} ms  x{row['ratio']:<6} {flag}",
+                file=sys.stderr,
+            )
+        if any(row["regression"] for row in rows):
+            exit_code = 1
+
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    elif not args.save_baseline:
+        print(payload)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Deterministic synthetic catalogs for the benchmark suite.
+
+모든 생성기는 seed 고정 Random을 써서 같은 크기면 항상 같은 데이터를 만든다.
+"""
+import random
+from typing import Dict, List
+
+CATEGORIES = ["주거", "청년", "돌봄", "교육", "의료", "저소득", "금융", "고용", "문화", "생계"]
+JOBS = ["학생", "직장인", "구직자", "자영업", "프리랜서", "농어업인"]
+REGIONS = ["11", "26", "27", "28", "29", "30", "31", "36", "41", "51", "43", "44", "45", "46", "47", "48", "50"]
+PROVIDERS = ["보건복지부", "국토교통부", "고용노동부", "교육부", "여성가족부", "지자체"]
+BANKS = ["우리은행", "신한은행", "국민은행", "하나은행", "농협은행", "기업은행", "부산은행", "카카오뱅크", "토스뱅크"]
+JOIN_WAYS = ["영업점,인터넷,스마트폰", "스마트폰", "인터넷,스마트폰", "영업점"]
+JOIN_MEMBERS = ["실명의 개인", "만 19세~34세 청년", "개인사업자", "제한없음"]
+TERMS = ["6", "12", "24", "36"]
+
+
+def welfare_programs(n: int, seed: int = 7) -> List[Dict]:
+    rnd = random.Random(seed)
+    programs = []
+    for i in range(n):
+        min_age = rnd.choice([0, 0, 7, 19, 19, 40, 65])
+        programs.append(
+            {
+                "id": f"SYN-{i:06d}",
+                "name": f"합성 복지 프로그램 {i}",
+                "provider": rnd.choice(PROVIDERS),
+                "region_scope": [] if rnd.random() < 0.6 else rnd.sample(REGIONS, rnd.randint(1, 3)),
+                "eligible": {
+                    "min_age": min_age,
+                    "max_age": min_age + rnd.choice([15, 30, 120]),
+                    "jobs": [] if rnd.random() < 0.5 else rnd.sample(JOBS, rnd.randint(1, 3)),
+                },
+                "categories": rnd.sample(CATEGORIES, rnd.randint(1, 3)),
+                "summary": "합성 벤치마크용 요약 " * 3,
+                "url": f"https://example.invalid/welfare/{i}",
+            }
+        )
+    return programs
+
+
+def welfare_list_xml(n: int, seed: int = 7) -> bytes:
+    """getWlfareInfoList 의 XML 응답 (response/body/items/item) 한 페이지"""
+    from xml.sax.saxutils import escape
+
+    parts = ["<?xml version=\"1.0\" encoding=\"UTF-8\"?><response><header><resultCode>00</resultCode></header><body><items>"]
+    for p in welfare_programs(n, seed=seed):
+        fields = {
+            "servId": p["id"],
+            "servNm": p["name"],
+            "jurMnofNm": p["provider"],
+            "servDgst": p["summary"],
+            "servDtlLink": p["url"],
+            "lifeArray": ",".join(p["categories"]),
+            "inqryCnt": "0",
+        }
+        parts.append("<item>" + "".join(f"<{k}>{escape(v)}</{k}>" for k, v in fields.items()) + "</item>")
+    parts.append(f"</items><numOfRows>{n}</numOfRows><pageNo>1</pageNo><totalCount>{n}</totalCount></body></response>")
+    return "".join(parts).encode("utf-8")
+def finlife_products(n_options: int, seed: int = 11) -> Dict[str, List[Dict]]:
+    """savingProductsSearch 응답 형태(baseList/optionList)를 상품당 4개 만기 옵션으로 생성"""
+    rnd = random.Random(seed)
+    n_products = max(1, n_options // len(TERMS))
+    base_list: List[Dict] = []
+    option_list: List[Dict] = []
+    for i in range(n_products):
+        code = f"SYN{i:07d}"
+        base_list.append(
+            {
+                "fin_prdt_cd": code,
+                "kor_co_nm": rnd.choice(BANKS),
+                "fin_prdt_nm": f"합성 적금 {i}",
+                "join_way": rnd.choice(JOIN_WAYS),
+                "join_member": rnd.choice(JOIN_MEMBERS),
+                "spcl_cnd": "급여이체 시 우대금리",
+                "etc_note": None,
+                "max_limit": None if rnd.random() < 0.6 else str(rnd.choice([1000000, 3000000, 10000000, 50000000])),
+            }
+        )
+        for term in TERMS:
+            base_rate = round(rnd.uniform(1.5, 4.0), 2)
+            option_list.append(
+                {
+                    "fin_prdt_cd": code,
+                    "save_trm": term,
+                    "intr_rate": str(base_rate),
+                    "intr_rate2": str(round(base_rate + rnd.uniform(0, 2.5), 2)),
+                    "intr_rate_type_nm": "단리",
+                }
+            )
+    return {"baseList": base_list, "optionList": option_list}
+
+
+def finlife_loans(n_options: int, seed: int = 19) -> Dict[str, List[Dict]]:
+    """creditLoanProductsSearch 형태: 상품당 대출금리(A) 옵션 1개 + 기준/가산금리 옵션"""
+    rnd = random.Random(seed)
+    n_products = max(1, n_options // 3)
+    base_list: List[Dict] = []
+    option_list: List[Dict] = []
+    for i in range(n_products):
+        code = f"LOAN{i:06d}"
+        base_list.append({"fin_prdt_cd": code, "kor_co_nm": rnd.choice(BANKS), "fin_prdt_nm": f"합성 대출 {i}"})
+        base = round(rnd.uniform(3.0, 4.5), 2)
+        spread = round(rnd.uniform(0.5, 4.0), 2)
+        for rate_type, avg in (("B", base), ("C", spread), ("A", base + spread)):
+            option_list.append(
+                {
+                    "fin_prdt_cd": code,
+                    "crdt_lend_rate_type": rate_type,
+                    "crdt_lend_rate_type_nm": {"A": "대출금리", "B": "기준금리", "C": "가산금리"}[rate_type],
+                    "crdt_grad_avg": str(round(avg, 2)),
+                    "lend_rate_min": str(round(avg - 0.5, 2)),
+                    "lend_rate_max": str(round(avg + 1.0, 2)),
+                    "lend_rate_avg": str(round(avg, 2)),
+                }
+            )
+    return {"baseList": base_list, "optionList": option_list}
+
+
+def welfare_inputs(n: int, seed: int = 13) -> List[Dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "household_size": rnd.randint(1, 5),
+            "monthly_income": rnd.randint(0, 6000000),
+            "total_assets": rnd.randint(0, 300000000),
+        }
+        for _ in range(n)
+    ]
+
+
+def chat_messages(n: int, seed: int = 17) -> List[Dict]:
+    rnd = random.Random(seed)
+    return [
+        {
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": "청년 월세 지원 자격이 궁금합니다. " * rnd.randint(1, 4),
+        }
+        for i in range(n)
+    ]
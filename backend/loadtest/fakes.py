@@ -0,0 +1,285 @@
+"""Local stand-ins for the external services the API depends on.
+
+하나의 프로세스/포트에서 세 가지 가짜 업스트림을 제공한다.
+
+- `/finlifeapi/{endpoint}.json`  금융감독원 '금융상품 한눈에' (savingProductsSearch, depositProductsSearch 등, pageNo 페이징)
+- `/welfare{WELFARE_API_LIST_PATH}` 한국사회보장정보원 목록 API (JSON 또는 XML)
+- `/welfare{WELFARE_API_DETAIL_PATH}` 같은 기관의 상세 API (servId 별 지원대상/선정기준/시도)
+- `/welfare-local{WELFARE_LOCAL_API_LIST_PATH}` 지자체복지서비스 목록 API (일부는 중앙부처 항목과 이름이 겹친다)
+- `/gemini/v1beta/models/{model}:generateContent`  Gemini REST generateContent
+
+Usage (backend 디렉터리에서):
+
+    python -m loadtest.fakes --port 18080 --latency-ms 80 --jitter-ms 40 --error-rate 0.01 --catalog-size 2000
+"""
+import argparse
+import asyncio
+import random
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+from benchmarks import synthetic
+
+FINLIFE_ENDPOINTS = [
+    "companySearch",
+    "depositProductsSearch",
+    "savingProductsSearch",
+    "creditLoanProductsSearch",
+    "mortgageLoanProductsSearch",
+    "rentHouseLoanProductsSearch",
+]
+
+
+class FakeConfig:
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 20.0,
+        error_rate: float = 0.0,
+        catalog_size: int = 1000,
+        page_size: int = 100,
+        welfare_format: str = "json",
+        welfare_list_path: str = "/getWlfareInfoList",
+        welfare_detail_path: str = "/getWlfareInfoDetail",
+        welfare_local_path: str = "/LcgvWelfarelist",
+        seed: int = 42,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.catalog_size = catalog_size
+        self.page_size = page_size
+        self.welfare_format = welfare_format
+        self.welfare_list_path = welfare_list_path
+        self.welfare_detail_path = welfare_detail_path
+        self.welfare_local_path = welfare_local_path
+        self.rnd = random.Random(seed)
+
+
+def _finlife_catalogs(size: int) -> Dict[str, Dict[str, List[Dict]]]:
+    # 상품군마다 size 개 상품이 되도록 옵션 수를 (상품당 옵션 수)배로 요청
+    catalogs = {}
+    for i, endpoint in enumerate(FINLIFE_ENDPOINTS):
+        if "Loan" in endpoint:
+            data = synthetic.finlife_loans(size * 3, seed=100 + i)
+        else:
+            data = synthetic.finlife_products(size * len(synthetic.TERMS), seed=100 + i)
+        if endpoint == "companySearch":
+            data = {"baseList": data["baseList"], "optionList": []}
+        catalogs[endpoint] = data
+    return catalogs
+
+
+def _welfare_items(size: int) -> List[Dict]:
+    items = []
+    for p in synthetic.welfare_programs(size, seed=200):
+        items.append(
+            {
+                "servId": p["id"],
+                "servNm": p["name"],
+                "jurMnofNm": p["provider"],
+                "servDgst": p["summary"],
+                "servDtlLink": p["url"],
+                "lifeArray": ",".join(p["categories"]),
+                "inqryCnt": "0",
+            }
+        )
+    return items
+
+
+def _local_welfare_items(size: int) -> List[Dict]:
+    """지자체 출처: 절반 크기, 열 개 중 하나는 중앙부처 항목과 같은 이름(중복 제거 확인용)"""
+    ctpv = ["서울특별시", "부산광역시", "경기도", "전라남도", "경상북도"]
+    items = []
+    for i, p in enumerate(synthetic.welfare_programs(max(1, size // 2), seed=201)):
+        items.append(
+            {
+                "servId": f"LCL-{i:06d}",
+                "servNm": f"합성 복지 프로그램 {i}" if i % 10 == 0 else f"지자체 {p['name']}",
+                "ctpvNm": ctpv[i % len(ctpv)],
+                "sggNm": "",
+                "bizChrDeptNm": "복지정책과",
+                "servDgst": p["summary"],
+                "servDtlLink": p["url"],
+                "intrsThemaNmArray": ",".join(p["categories"]),
+            }
+        )
+    return items
+
+
+def _welfare_details(size: int) -> Dict[str, Dict]:
+    """목록과 같은 합성 프로그램의 자격 정보를 상세 API 의 서술형 필드로 풀어 쓴다"""
+    region_names = dict(zip(synthetic.REGIONS, [
+        "서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시", "대전광역시", "울산광역시", "세종특별자치시",
+        "경기도", "강원도", "충청북도", "충청남도", "전라북도", "전라남도", "경상북도", "경상남도", "제주특별자치도",
+    ]))
+    details = {}
+    for p in synthetic.welfare_programs(size, seed=200):
+        eligible = p["eligible"]
+        if eligible["max_age"] >= 120:
+            age_text = f"만 {eligible['min_age']}세 이상" if eligible["min_age"] else "연령 제한 없음"
+        else:
+            age_text = f"만 {eligible['min_age']}세 ~ {eligible['max_age']}세"
+        jobs = ", ".join(eligible["jobs"]) if eligible["jobs"] else "누구나"
+        region = p["region_scope"][0] if p["region_scope"] else None
+        details[p["id"]] = {
+            "servId": p["id"],
+            "servNm": p["name"],
+            "tgtrDtlCn": f"{age_text} {jobs}",
+            "slctCritCn": "소득 기준 중위소득 100% 이하",
+            "alwServCn": p["summary"],
+            "lifeArray": ",".join(p["categories"]),
+            "ctpvNm": region_names[region] if region else "",
+        }
+    return details
+
+
+def _welfare_xml(items: List[Dict], total: int, page_no: int, num_rows: int) -> str:
+    parts = [
+        "<?xml version=\"1.0\" encoding=\"UTF-8\"?>",
+        "<response><header><resultCode>00</resultCode><resultMsg>NORMAL SERVICE.</resultMsg></header><body><items>",
+    ]
+    for item in items:
+        fields = "".join(f"<{k}>{escape(str(v))}</{k}>" for k, v in item.items())
+        parts.append(f"<item>{fields}</item>")
+    parts.append(
+        f"</items><numOfRows>{num_rows}</numOfRows><pageNo>{page_no}</pageNo><totalCount>{total}</totalCount></body></response>"
+    )
+    return "".join(parts)
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    app = FastAPI(title="Fake upstreams")
+    finlife = _finlife_catalogs(config.catalog_size)
+    welfare = _welfare_items(config.catalog_size)
+    welfare_details = _welfare_details(config.catalog_size)
+    welfare_local = _local_welfare_items(config.catalog_size)
+
+    async def simulate() -> None:
+        delay = config.latency_ms + config.rnd.uniform(0, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and config.rnd.random() < config.error_rate:
+            raise HTTPException(status_code=503, detail="injected upstream failure")
+
+    @app.get("/finlifeapi/{endpoint}.json")
+    async def finlife_api(endpoint: str, pageNo: int = 1, topFinGrpNo: str = "020000", auth: str = ""):
+        await simulate()
+        data = finlife.get(endpoint)
+        if data is None:
+            raise HTTPException(status_code=404, detail=f"unknown endpoint {endpoint}")
+        base_list = data["baseList"]
+        start = (pageNo - 1) * config.page_size
+        page = base_list[start:start + config.page_size]
+        codes = {b["fin_prdt_cd"] for b in page}
+        options = [o for o in data["optionList"] if o["fin_prdt_cd"] in codes]
+        total = len(base_list)
+        return {
+            "result": {
+                "prdt_div": "S",
+                # 실제 API는 total_count 를 쓴다. 클라이언트는 둘 다 읽지만 호환용으로 둘 다 채운다
+                "total_count": total,
+                "totalCount": total,
+                "max_page_no": max(1, -(-total // config.page_size)),
+                "now_page_no": pageNo,
+                "err_cd": "000",
+                "err_msg": "정상",
+                "baseList": page,
+                "optionList": options,
+            }
+        }
+
+    @app.get("/welfare" + config.welfare_list_path)
+    async def welfare_list(request: Request, pageNo: int = 1, numOfRows: int = 10):
+        await simulate()
+        start = (pageNo - 1) * numOfRows
+        page = welfare[start:start + numOfRows]
+        if config.welfare_format == "xml":
+            xml = _welfare_xml(page, len(welfare), pageNo, numOfRows)
+            return Response(content=xml, media_type="application/xml")
+        return JSONResponse(
+            {
+                "response": {
+                    "header": {"resultCode": "00", "resultMsg": "NORMAL SERVICE."},
+                    "body": {
+                        "items": page,
+                        "numOfRows": numOfRows,
+                        "pageNo": pageNo,
+                        "totalCount": len(welfare),
+                    },
+                }
+            }
+        )
+
+    @app.get("/welfare-local" + config.welfare_local_path)
+    async def welfare_local_list(pageNo: int = 1, numOfRows: int = 10, ctpvNm: str = ""):
+        await simulate()
+        matched = [w for w in welfare_local if not ctpvNm or w["ctpvNm"].startswith(ctpvNm)]
+        start = (pageNo - 1) * numOfRows
+        page = matched[start:start + numOfRows]
+        if config.welfare_format == "xml":
+            return Response(content=_welfare_xml(page, len(matched), pageNo, numOfRows), media_type="application/xml")
+        return {"response": {"header": {"resultCode": "00"}, "body": {"items": page, "totalCount": len(matched)}}}
+
+    @app.get("/welfare" + config.welfare_detail_path)
+    async def welfare_detail(servId: str = ""):
+        await simulate()
+        detail = welfare_details.get(servId)
+        if detail is None:
+            raise HTTPException(status_code=404, detail=f"unknown servId {servId}")
+        return {"response": {"header": {"resultCode": "00"}, "body": {"items": {"item": detail}}}}
+
+    @app.post("/gemini/v1beta/models/{model}:generateContent")
+    async def generate_content(model: str):
+        await simulate()
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": "가짜 모델 응답입니다. 추가 확인 필요."}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {"promptTokenCount": 10, "candidatesTokenCount": 10, "totalTokenCount": 20},
+        }
+
+    return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    add_fake_arguments(parser)
+    return parser
+
+
+def add_fake_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="base upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="uniform extra latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 per upstream call")
+    parser.add_argument("--catalog-size", type=int, default=1000, help="products per Finlife family / welfare programs")
+    parser.add_argument("--page-size", type=int, default=100, help="Finlife products per page")
+    parser.add_argument("--welfare-format", choices=["json", "xml"], default="json")
+
+
+def main() -> None:
+    import uvicorn
+
+    args = build_parser().parse_args()
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        catalog_size=args.catalog_size,
+        page_size=args.page_size,
+        welfare_format=args.welfare_format,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
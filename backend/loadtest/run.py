@@ -0,0 +1,235 @@
+"""End-to-end load test against local fake upstreams.
+
+가짜 업스트림(loadtest.fakes)과 API 서버(uvicorn)를 각각 하위 프로세스로 띄우고,
+라우트별로 동시성을 단계적으로 올리며 closed-loop 부하를 건다.
+임시 SQLite DB를 쓰므로 backend.db는 건드리지 않는다.
+
+Usage (backend 디렉터리에서):
+
+    python -m loadtest.run                                   # 기본: 4개 라우트 × 동시성 1,4,16,64 × 10초
+    python -m loadtest.run --routes finance,welfare --concurrency 8,32 --duration 5
+    python -m loadtest.run --latency-ms 200 --error-rate 0.05 --welfare-format xml --output loadtest.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.run import ASSET_FORM
+from .fakes import add_fake_arguments
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOADTEST_USER = {"user_id": "loadtest", "password": "loadtest-password"}
+
+# route name -> (method, path, json body)
+ROUTES: Dict[str, Tuple[str, str, Dict]] = {
+    "finance": ("POST", "/finance/recommendations", ASSET_FORM),
+    "welfare": (
+        "POST",
+        "/welfare/recommendations",
+        {"region_code": "11", "job_category": "직장인", "age": 29, "preferences": ["주거", "의료"]},
+    ),
+    "chat": ("POST", "/chat/reply", {"messages": [{"role": "user", "content": "청년 월세 지원 자격이 궁금해요."}]}),
+    "login": ("POST", "/auth/login", LOADTEST_USER),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+async def run_stage(base_url: str, route: str, concurrency: int, duration: float) -> Dict:
+    method, path, body = ROUTES[route]
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+
+        async def worker() -> None:
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    res = await client.request(method, path, json=body)
+                    statuses[res.status_code] += 1
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = sum(v for k, v in statuses.items() if isinstance(k, int) and k < 400)
+    return {
+        "route": route,
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "ok": ok,
+        "errors": len(latencies) - ok,
+        "status_counts": {str(k): v for k, v in statuses.items()},
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def start_fakes(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    cmd = [
+        sys.executable, "-m", "loadtest.fakes",
+        "--port", str(port),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--catalog-size", str(args.catalog_size),
+        "--page-size", str(args.page_size),
+        "--welfare-format", args.welfare_format,
+    ]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR)
+
+
+def app_env(fake_base: str, db_path: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "DATABASE_URL": f"sqlite:///{db_path}",
+            # 부하 발생기는 한 IP 에서 몰아 보내므로 클라이언트별 한도는 끈다
+            "RATE_LIMIT_ENABLED": "false",
+            "FSS_FINLIFE_API_KEY": "loadtest",
+            "FSS_FINLIFE_API_BASE": f"{fake_base}/finlifeapi",
+            "WELFARE_API_KEY": "loadtest",
+            "WELFARE_API_MOCK": "false",
+            "WELFARE_API_BASE": f"{fake_base}/welfare",
+            "WELFARE_LOCAL_API_BASE": f"{fake_base}/welfare-local",
+            "GEMINI_API_KEY": "loadtest",
+            "GEMINI_API_ENDPOINT": f"{fake_base}/gemini",
+        }
+    )
+    return env
+
+
+def start_app(args: argparse.Namespace, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    # run.sh와 같은 방식으로 테이블 생성 후 서버 기동
+    subprocess.run(
+        [sys.executable, "-c", "from app.db.models import Base; from app.db.db_conn import engine; Base.metadata.create_all(engine)"],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+    )
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(args.workers),
+        "--log-level", "warning",
+        "--no-access-log",
+    ]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+
+
+def print_table(stages: List[Dict]) -> None:
+    header = f"{'route':<9}{'conc':>6}{'reqs':>8}{'err':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+    print(header, file=sys.stderr)
+    print("-" * len(header), file=sys.stderr)
+    for s in stages:
+        print(
+            f"{s['route']:<9}{s['concurrency']:>6}{s['requests']:>8}{s['errors']:>6}{s['throughput_rps']:>10.1f}"
+            f"{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", default=",".join(ROUTES), help=f"comma separated subset of {','.join(ROUTES)}")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="comma separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per (route, concurrency) stage")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the API under test")
+    parser.add_argument("--output", default=None, help="write JSON report here (default: stdout)")
+    add_fake_arguments(parser)
+    args = parser.parse_args(argv)
+
+    routes = [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = [r for r in routes if r not in ROUTES]
+    if unknown:
+        parser.error(f"unknown routes: {unknown}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    fake_port, app_port = _free_port(), _free_port()
+    fake_base = f"http://127.0.0.1:{fake_port}"
+    app_base = f"http://127.0.0.1:{app_port}"
+
+    with tempfile.TemporaryDirectory(prefix="welfaren-loadtest-") as tmp:
+        procs: List[subprocess.Popen] = []
+        try:
+            procs.append(start_fakes(args, fake_port))
+            _wait_until_up(f"{fake_base}/docs")
+            procs.append(start_app(args, app_port, app_env(fake_base, os.path.join(tmp, "loadtest.db"))))
+            _wait_until_up(f"{app_base}/readyz")  # 워밍업이 끝난 뒤부터 측정
+            httpx.post(f"{app_base}/auth/register", json=LOADTEST_USER, timeout=30.0)
+
+            stages = []
+            for route in routes:
+                for level in levels:
+                    stages.append(asyncio.run(run_stage(app_base, route, level, args.duration)))
+                    print_table(stages[-1:])
+        finally:
+            for proc in reversed(procs):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+    print("", file=sys.stderr)
+    print_table(stages)
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "stages": stages,
+    }
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
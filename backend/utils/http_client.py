@@ -1,12 +1,207 @@
-import httpx
+"""Shared HTTP transport for every upstream client (Finlife, FSS, 복지 API).
+
+요청마다 클라이언트를 새로 만들면 매번 TCP/TLS 연결을 새로 맺는다. 여기서 앱 수명 동안 쓰는
+연결 풀을 하나씩 둔다.
+
+- async: 이벤트 루프별 httpx.AsyncClient (keep-alive 풀, h2 패키지가 있으면 HTTP/2)
+- sync:  requests.Session + HTTPAdapter (호스트별 풀 크기 HTTP_MAX_PER_HOST, 가득 차면 대기)
+- 타임아웃 기본값은 HTTP_CONNECT_TIMEOUT / HTTP_TIMEOUT 으로 통일하고, 호출 측에서 덮어쓸 수 있다.
+- GET 은 연결 오류/타임아웃과 502·503·504 에 대해 HTTP_RETRIES 번까지 지수 백오프로 재시도한다.
+  시간 예산이 정해진 호출은 retries=0 과 deadline 으로 재시도 없이 연결+응답 헤더까지의 총 시간을 묶는다.
+
+main.py 의 startup/shutdown 에서 startup()/shutdown() 을 불러 풀을 열고 닫는다.
+"""
 import asyncio
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Union
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.timeout import Timeout as Urllib3Timeout
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))  # read/write/pool seconds
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.2"))  # seconds, doubled per retry
+RETRY_STATUSES = (502, 503, 504)
+
+try:
+    import h2  # noqa: F401  (httpx 의 HTTP/2 지원은 h2 패키지가 있어야 켜진다)
+
+    HTTP2 = os.getenv("HTTP2", "true").lower() in ("1", "true", "yes")
+except ImportError:  # pragma: no cover - optional
+    HTTP2 = False
+
+Timeout = Union[float, httpx.Timeout, None]
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_host_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+_sessions: Dict[int, requests.Session] = {}  # 재시도 횟수별 (기본 HTTP_RETRIES, 예산이 있는 호출은 0)
+_session_lock = threading.Lock()
+
+
+def _timeout(value: Timeout) -> httpx.Timeout:
+    if isinstance(value, httpx.Timeout):
+        return value
+    read = HTTP_TIMEOUT if value is None else value
+    return httpx.Timeout(read, connect=min(HTTP_CONNECT_TIMEOUT, read))
+
+
+def async_client() -> httpx.AsyncClient:
+    """현재 이벤트 루프의 공유 AsyncClient (httpx 풀은 루프에 묶이므로 루프별로 하나)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=_timeout(None),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            http2=HTTP2,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _host_slot(url: str) -> asyncio.Semaphore:
+    # httpx 는 전체 연결 수만 제한하므로 호스트별 동시 요청 수는 여기서 제한한다
+    loop = asyncio.get_running_loop()
+    slots = _host_slots.setdefault(loop, {})
+    host = httpx.URL(url).host
+    slot = slots.get(host)
+    if slot is None:
+        slot = slots[host] = asyncio.Semaphore(HTTP_MAX_PER_HOST)
+    return slot
+
+
+def _backoff(attempt: int) -> float:
+    return HTTP_BACKOFF * (2 ** attempt) * (0.5 + random.random() / 2)
+
+
+async def get_async(
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Timeout = None,
+    retries: Optional[int] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """공유 풀로 GET. 연결 오류/타임아웃, 502·503·504 는 백오프 후 재시도 (마지막 응답/예외를 돌려준다)"""
+    retries = HTTP_RETRIES if retries is None else retries
+    client = async_client()
+    attempt = 0
+    while True:
+        try:
+            async with _host_slot(url):
+                response = await client.get(url, params=params, timeout=_timeout(timeout), **kwargs)
+        except httpx.TransportError:
+            if attempt >= retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            await response.aclose()
+        await asyncio.sleep(_backoff(attempt))
+        attempt += 1
+
+
+def sync_session(retries: Optional[int] = None) -> requests.Session:
+    """스레드 간에 공유하는 requests.Session (urllib3 풀은 호스트별 HTTP_MAX_PER_HOST 연결)"""
+    retries = HTTP_RETRIES if retries is None else retries
+    with _session_lock:
+        session = _sessions.get(retries)
+        if session is None:
+            retry = Retry(
+                total=retries,
+                connect=retries,
+                read=retries,
+                status=retries,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=frozenset({"GET", "HEAD"}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=max(1, HTTP_MAX_CONNECTIONS // max(1, HTTP_MAX_PER_HOST)),
+                pool_maxsize=HTTP_MAX_PER_HOST,
+                pool_block=True,
+                max_retries=retry,
+            )
+            session = _sessions[retries] = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+
+def get_sync(
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """공유 Session 으로 GET (재시도는 어댑터의 urllib3 Retry 가 한다).
+
+    deadline(time.monotonic 기준 시각)을 주면 연결부터 응답 헤더까지 그 시각을 넘기지 않는다.
+    stream=True 로 본문을 읽는 쪽은 청크 사이에서 같은 deadline 을 확인해야 한다.
+    """
+    read = HTTP_TIMEOUT if timeout is None else timeout
+    connect = min(HTTP_CONNECT_TIMEOUT, read)
+    if deadline is None:
+        limit: Any = (connect, read)
+    else:
+        total = max(0.001, deadline - time.monotonic())
+        limit = Urllib3Timeout(connect=min(connect, total), read=min(read, total), total=total)
+    return sync_session(retries).get(url, params=params, timeout=limit, **kwargs)
+
+
+async def startup() -> None:
+    """앱 시작 시 풀 생성 (첫 요청이 풀 생성 비용을 내지 않도록)"""
+    async_client()
+    sync_session()
+
+
+async def close_loop_client() -> None:
+    """현재 이벤트 루프의 클라이언트를 닫는다 (백그라운드 작업처럼 잠깐 쓰고 끝나는 루프용)"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.pop(loop, None)
+    _host_slots.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+async def shutdown() -> None:
+    for client in list(_async_clients.values()):
+        try:
+            await client.aclose()
+        except RuntimeError:  # 다른(이미 닫힌) 루프에서 만든 클라이언트
+            pass
+    _async_clients.clear()
+    _host_slots.clear()
+    with _session_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
 
 async def fetch_json(url: str, params: dict = None, timeout: int = 10):
     try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            res = await client.get(url, params=params)
-            res.raise_for_status()
-            return res.json()
+        res = await get_async(url, params=params, timeout=timeout)
+        res.raise_for_status()
+        return res.json()
     except httpx.HTTPStatusError as e:
         print(f"[HTTP ERROR] {e.response.status_code} - {url}")
         return None
@@ -14,14 +209,12 @@ async def fetch_json(url: str, params: dict = None, timeout: int = 10):
         print(f"[ERROR] fetch_json(): {e}")
         return None
 
+
 def fetch_sync(url: str, params: dict = None, timeout: int = 10):
-    import requests
     try:
-        res = requests.get(url, params=params, timeout=timeout)
+        res = get_sync(url, params=params, timeout=timeout)
         res.raise_for_status()
         return res.json()
     except Exception as e:
         print(f"[ERROR] fetch_sync(): {e}")
         return None
-
-
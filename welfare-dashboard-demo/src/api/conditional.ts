@@ -0,0 +1,28 @@
+// POST 응답을 ETag 와 함께 기억했다가 같은 요청은 If-None-Match 로 재검증한다.
+// 서버가 304 를 주면 본문 없이 기억해 둔 응답을 그대로 쓴다.
+const responses = new Map<string, { etag: string; data: unknown }>()
+const MAX_ENTRIES = 50
+
+export async function postJsonConditional<T>(url: string, body: string, init: RequestInit = {}): Promise<Response & { cachedJson?: T }> {
+  const key = `${url}\n${body}`
+  const cached = responses.get(key)
+  const headers = new Headers(init.headers)
+  if (cached) headers.set('If-None-Match', cached.etag)
+
+  const res = await fetch(url, { ...init, method: 'POST', headers, body })
+  if (res.status === 304 && cached) {
+    return Object.assign(new Response(null, { status: 200 }), { cachedJson: cached.data as T })
+  }
+  const etag = res.headers.get('ETag')
+  if (res.ok && etag) {
+    const data = await res.clone().json()
+    responses.delete(key)
+    responses.set(key, { etag, data })
+    if (responses.size > MAX_ENTRIES) responses.delete(responses.keys().next().value as string)
+  }
+  return res
+}
+
+export async function readJson<T>(res: Response & { cachedJson?: T }): Promise<T> {
+  return res.cachedJson !== undefined ? res.cachedJson : ((await res.json()) as T)
+}
@@ -1,4 +1,5 @@
 import type { AssetFormData } from '@/components/AssetInput'
+import { postJsonConditional, readJson } from './conditional'
 
 export type SavingCurrent = {
   product_name: string
@@ -50,14 +51,110 @@ export type SavingSwitchResponse = {
   }
 }
 
+export type DepositRecommendation = {
+  product_name: string
+  company_name?: string | null
+  fin_prdt_cd?: string | null
+  rate?: number | null
+  base_rate?: number | null
+  save_term?: number | null
+  interest?: number | null
+  description?: string | null
+  join_method?: string | null
+  join_member?: string | null
+  max_limit?: number | null
+  reasons?: string[]
+}
+
+export type DepositPlacementResponse = {
+  amount: number
+  target_term: number
+  best?: DepositRecommendation | null
+  alternatives: DepositRecommendation[]
+  summary: {
+    recommendation_count: number
+    expected_interest: number
+    decision: string
+  }
+}
+
+export type LoanRecommendation = {
+  product_name: string
+  company_name?: string | null
+  fin_prdt_cd?: string | null
+  rate?: number | null
+  rate_min?: number | null
+  rate_max?: number | null
+  rate_type?: string | null
+  repay_type?: string | null
+  interest?: number | null
+  interest_saving?: number | null
+  reasons?: string[]
+}
+
+export type LoanRefinanceResponse = {
+  lender?: string | null
+  purpose?: string | null
+  family: 'credit' | 'mortgage' | 'rent'
+  family_label: string
+  amount: number
+  annual_rate: number
+  remaining_months: number
+  current_interest: number
+  best?: LoanRecommendation | null
+  alternatives: LoanRecommendation[]
+  decision: string
+}
+
 export type FinanceSwitchResponse = {
   saving?: SavingSwitchResponse | null
+  deposit?: DepositPlacementResponse | null
+  loans?: LoanRefinanceResponse[]
 }
 
 const API_BASE = () => import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000'
 
 export async function fetchFinanceRecommendations(payload: AssetFormData, signal?: AbortSignal) {
-  const res = await fetch(`${API_BASE()}/finance/recommendations`, {
+  const res = await postJsonConditional<FinanceSwitchResponse>(`${API_BASE()}/finance/recommendations`, JSON.stringify(payload), {
+    headers: { 'Content-Type': 'application/json' },
+    signal,
+  })
+  if (!res.ok) {
+    const detail = await res.text()
+    throw new Error(detail || '추천 정보를 불러오지 못했습니다.')
+  }
+  return readJson<FinanceSwitchResponse>(res)
+}
+
+export type SweepAxis = {
+  start?: number
+  stop?: number
+  steps?: number
+  values?: number[]
+}
+
+export type FinanceSweepRequest = {
+  assets: AssetFormData
+  principal?: SweepAxis
+  monthsRemaining?: SweepAxis
+  penalty?: SweepAxis
+}
+
+export type FinanceSweepResponse = {
+  axes: { principal: number[]; months_remaining: number[]; penalty_rate: number[] }
+  // [principal, months_remaining, penalty_rate] row-major
+  shape: [number, number, number]
+  net_gain: number[]
+  match_score: number[]
+  best: number[] // products 인덱스, -1 = 후보 없음
+  switch: boolean[]
+  products: { fin_prdt_cd: string; company_name?: string | null; product_name?: string | null; rate: number; save_term: number }[]
+  catalog_version: string
+  elapsed_ms: number
+}
+
+export async function fetchFinanceSweep(payload: FinanceSweepRequest, signal?: AbortSignal) {
+  const res = await fetch(`${API_BASE()}/finance/recommendations/sweep`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify(payload),
@@ -65,7 +162,7 @@ export async function fetchFinanceRecommendations(payload: AssetFormData, signal
   })
   if (!res.ok) {
     const detail = await res.text()
-    throw new Error(detail || '추천 정보를 불러오지 못했습니다.')
+    throw new Error(detail || '시나리오 정보를 불러오지 못했습니다.')
   }
-  return res.json() as Promise<FinanceSwitchResponse>
+  return res.json() as Promise<FinanceSweepResponse>
 }
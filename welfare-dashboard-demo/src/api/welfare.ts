@@ -1,3 +1,5 @@
+import { postJsonConditional, readJson } from './conditional'
+
 export type RecommendationItem = {
   id: string
   name: string
@@ -74,13 +76,11 @@ export async function fetchRecommendations(): Promise<RecommendationItem[]> {
   try { profile = JSON.parse(localStorage.getItem('profileSelections') || '{}') } catch {}
   const payload = mapProfileToPayload(profile)
 
-  const res = await fetch(`${base}/welfare/recommendations`, {
-    method: 'POST',
+  const res = await postJsonConditional<any>(`${base}/welfare/recommendations`, JSON.stringify(payload), {
     headers: withAuth({ 'Content-Type': 'application/json' }),
-    body: JSON.stringify(payload)
   })
   if (!res.ok) throw new Error(`Failed: ${res.status}`)
-  const data = await res.json()
+  const data = await readJson<any>(res)
   return (data?.items || []) as RecommendationItem[]
 }
 
@@ -97,13 +97,11 @@ export async function fetchRecommendationsWithMeta(): Promise<{ items: Recommend
   try { profile = JSON.parse(localStorage.getItem('profileSelections') || '{}') } catch {}
   const payload = mapProfileToPayload(profile)
 
-  const res = await fetch(`${base}/welfare/recommendations`, {
-    method: 'POST',
+  const res = await postJsonConditional<any>(`${base}/welfare/recommendations`, JSON.stringify(payload), {
     headers: withAuth({ 'Content-Type': 'application/json' }),
-    body: JSON.stringify(payload)
   })
   if (!res.ok) throw new Error(`Failed: ${res.status}`)
-  const data = await res.json()
+  const data = await readJson<any>(res)
   return { items: (data?.items || []) as RecommendationItem[], meta: (data?.meta || null) as RecommendResponseMeta | null }
 }
 